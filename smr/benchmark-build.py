@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+
+"""Benchmark the time and memory needed to build the SMR models.
+
+Each combination of model, number of rings, number of axial subdivisions,
+tally mode and fuel composition is built in its own process with profiling
+enabled. The build time and peak memory of each combination are compared
+against a baseline: by default the best value over the last few runs in a
+JSON history file that included it, or else the run given a particular label.
+If any build failed or became slower or larger by more than the given
+threshold, the script exits with a nonzero status and, unless requested, the
+results are not added to the history, so they never become a baseline.
+
+"""
+
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+
+SCRIPTS = {
+    'core': 'build-core-fresh.py',
+    'assembly': 'build-assembly.py'
+}
+
+
+def config_name(model, rings, axial, tallies, fuel):
+    return '{} r={} a={} {} {}'.format(model, rings, axial, tallies, fuel)
+
+
+def run_build(model, rings, axial, tallies, fuel, jobs):
+    """Build a model in a separate process and return its measurements."""
+    script = Path(__file__).parent / SCRIPTS[model]
+    with tempfile.TemporaryDirectory(prefix='smr-benchmark-') as tmp:
+        profile = Path(tmp) / 'profile.json'
+        cmd = [sys.executable, str(script), '-r', str(rings), '-a', str(axial),
+               '-t', tallies, '-o', str(Path(tmp) / 'inputs'),
+               '-j', str(jobs), '--profile', str(profile)]
+        if fuel == 'depleted':
+            cmd.append('-d')
+
+        # Make sure that inputs are never taken from a cache
+        env = dict(os.environ)
+        env.pop('SMR_CACHE_DIR', None)
+
+        start = time.perf_counter()
+        subprocess.run(cmd, env=env, check=True, stdout=subprocess.DEVNULL)
+        elapsed = time.perf_counter() - start
+
+        with open(str(profile)) as fh:
+            report = json.load(fh)
+
+    total = report['phases']['total']
+    memory = [m for m in (total['max_rss'], total['children_max_rss'])
+              if m is not None]
+    result = OrderedDict([
+        ('build_time', total['wall_time']),
+        ('process_time', elapsed),
+        ('peak_memory', max(memory) if memory else None),
+    ])
+    for name in ('cells', 'materials', 'tally bins'):
+        result[name] = report['counts'].get(name)
+    result['phases'] = OrderedDict(
+        (name, p['wall_time']) for name, p in report['phases'].items())
+    return result
+
+
+def baseline_runs(history, window, label=None):
+    """Select the runs from the history to compare against.
+
+    Parameters
+    ----------
+    history : list of dict
+        Previous runs, oldest first
+    window : int
+        Number of most recent runs to select
+    label : str, optional
+        If given, select only the most recent run with this label
+
+    Returns
+    -------
+    list of dict
+        Selected runs
+
+    """
+    if label is not None:
+        runs = [run for run in history if run.get('label') == label]
+        if not runs:
+            raise ValueError('No run labeled "{}" in the history.'
+                             .format(label))
+        return runs[-1:]
+    return history[-window:] if window > 0 else []
+
+
+def compare(results, runs, threshold):
+    """Find builds that regressed relative to the best of some previous runs.
+
+    Each metric of a build is compared against its smallest value over the
+    given runs that included the build and did not fail. Builds that failed
+    are always reported.
+
+    Returns
+    -------
+    list of str
+        Description of each regression
+
+    """
+    regressions = []
+    for name, result in results.items():
+        if 'error' in result:
+            regressions.append('{}: build failed'.format(name))
+            continue
+
+        baselines = [run['results'][name] for run in runs
+                     if 'error' not in run['results'].get(name, {'error': 0})]
+        for metric in ('build_time', 'peak_memory'):
+            values = [b[metric] for b in baselines if b.get(metric)]
+            old = min(values) if values else None
+            new = result.get(metric)
+            if old and new and new > old*(1 + threshold):
+                regressions.append('{}: {} increased from {:.2f} to {:.2f} '
+                                   '({:+.0%})'.format(name, metric, old, new,
+                                                      new/old - 1))
+    return regressions
+
+
+# Define command-line options
+parser = argparse.ArgumentParser()
+parser.add_argument('--models', nargs='+', choices=list(SCRIPTS),
+                    default=list(SCRIPTS), help='Models to build')
+parser.add_argument('-r', '--rings', nargs='+', type=int, default=[1, 3, 10],
+                    help='Numbers of annular regions in fuel')
+parser.add_argument('-a', '--axial', nargs='+', type=int,
+                    default=[1, 49, 196],
+                    help='Numbers of axial subdivisions in fuel')
+parser.add_argument('-t', '--tallies', nargs='+', choices=('cell', 'mat'),
+                    default=['cell', 'mat'], help='Tally modes')
+parser.add_argument('--fuel', nargs='+', choices=('fresh', 'depleted'),
+                    default=['fresh', 'depleted'], help='Fuel compositions')
+parser.add_argument('-n', '--repeat', type=int, default=1,
+                    help='Number of times to build each model; the fastest '
+                    'build is recorded')
+parser.add_argument('-j', '--jobs', type=int, default=1,
+                    help='Number of processes used to export XML files')
+parser.add_argument('--history', type=Path, default=Path('benchmarks.json'),
+                    help='JSON file of results from previous runs')
+parser.add_argument('--threshold', type=float, default=0.1,
+                    help='Relative increase in build time or peak memory '
+                    'considered a regression')
+parser.add_argument('--label', default=None,
+                    help='Label identifying this run, e.g., a description of '
+                    'the change being tested')
+parser.add_argument('--window', type=int, default=5,
+                    help='Number of most recent runs whose best results are '
+                    'the baseline')
+parser.add_argument('--baseline', default=None, metavar='LABEL',
+                    help='Compare against the most recent run with this '
+                    'label instead')
+parser.add_argument('--no-save', action='store_true',
+                    help='Do not add the results of this run to the history')
+parser.add_argument('--save-regressions', action='store_true',
+                    help='Add the results to the history even if a build '
+                    'failed or regressed')
+args = parser.parse_args()
+
+if args.history.exists():
+    with open(str(args.history)) as fh:
+        history = json.load(fh)
+else:
+    history = []
+try:
+    runs = baseline_runs(history, args.window, args.baseline)
+except ValueError as e:
+    parser.error(str(e))
+
+# Build each combination of options
+results = OrderedDict()
+configs = itertools.product(args.models, args.rings, args.axial, args.tallies,
+                            args.fuel)
+for config in configs:
+    name = config_name(*config)
+    print('Building {}...'.format(name))
+    try:
+        builds = [run_build(*config, jobs=args.jobs)
+                  for _ in range(args.repeat)]
+    except subprocess.CalledProcessError as e:
+        print('  failed with exit status {}'.format(e.returncode))
+        results[name] = {'error': e.returncode}
+        continue
+    result = min(builds, key=lambda r: r['build_time'])
+    print('  {:.2f} s, {} MB'.format(result['build_time'],
+                                     result['peak_memory']))
+    results[name] = result
+
+# Determine the commit that was benchmarked, if any
+try:
+    commit = subprocess.run(
+        ['git', 'rev-parse', 'HEAD'], cwd=str(Path(__file__).parent),
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        universal_newlines=True, check=True).stdout.strip()
+except (OSError, subprocess.CalledProcessError):
+    commit = None
+
+regressions = compare(results, runs, args.threshold)
+
+if not args.no_save and (args.save_regressions or not regressions):
+    history.append(OrderedDict([
+        ('time', time.strftime('%Y-%m-%dT%H:%M:%S')),
+        ('commit', commit),
+        ('label', args.label),
+        ('results', results)
+    ]))
+    with open(str(args.history), 'w') as fh:
+        json.dump(history, fh, indent=2)
+
+if regressions:
+    print('Regressions exceeding {:.0%}:'.format(args.threshold))
+    for line in regressions:
+        print('  ' + line)
+    if not args.save_regressions:
+        print('Results were not added to the history (use '
+              '--save-regressions to add them)')
+    sys.exit(1)
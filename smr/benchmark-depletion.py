@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+"""Benchmark the depletion solver with synthetic reaction rates.
+
+Compositions of UO2 fuel with random enrichments are depleted over one time
+step with reaction rates drawn around typical one-group values for a PWR, so
+that the solver can be timed (and checked) without running transport. With
+``--check``, the compositions of the first few materials are compared with
+the matrix exponential computed by scipy.
+
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import scipy.linalg
+
+from smr.depletion import Chain, deplete, simple_chain
+
+
+# Typical one-group reaction rates per atom in 1/s in a PWR at full power
+RATES = {
+    ('I135', '(n,gamma)'): 2.4e-8,
+    ('Xe135', '(n,gamma)'): 4.0e-5,
+    ('Xe136', '(n,gamma)'): 8.0e-11,
+    ('Cs135', '(n,gamma)'): 2.4e-9,
+    ('Gd156', '(n,gamma)'): 6.0e-10,
+    ('Gd157', '(n,gamma)'): 2.0e-5,
+    ('U234', '(n,gamma)'): 6.0e-9,
+    ('U234', 'fission'): 1.5e-10,
+    ('U235', '(n,gamma)'): 2.7e-9,
+    ('U235', 'fission'): 1.2e-8,
+    ('U238', '(n,gamma)'): 2.7e-10,
+    ('U238', 'fission'): 3.0e-11,
+    ('Pu239', '(n,gamma)'): 1.6e-8,
+    ('Pu239', 'fission'): 3.0e-8,
+}
+
+
+def synthetic_problem(chain, num_materials, seed=1):
+    """Return fresh fuel compositions and reaction rates for many materials.
+
+    Returns
+    -------
+    numpy.ndarray
+        Atom density of each nuclide in atom/b-cm, indexed by material and
+        nuclide
+    numpy.ndarray
+        Reaction rate per atom in 1/s, indexed by material and reaction
+
+    """
+    rng = np.random.RandomState(seed)
+    enrichment = rng.uniform(0.016, 0.031, num_materials)
+    n0 = np.zeros((num_materials, len(chain)))
+    for name, fraction in (('U234', 0.008*enrichment), ('U235', enrichment),
+                           ('U238', 1. - 1.008*enrichment)):
+        if name in chain.index:
+            n0[:, chain.index[name]] = 0.0229*fraction
+
+    # Vary the flux (and hence all rates) of each material by up to a factor
+    # of two, and each rate by a further 10%
+    typical = np.array([RATES.get(rx, 0.) for rx in chain.reactions])
+    flux = rng.uniform(0.5, 1.5, (num_materials, 1))
+    rates = typical*flux*rng.uniform(0.9, 1.1, (num_materials, len(typical)))
+    return n0, rates
+
+
+# Define command-line options
+parser = argparse.ArgumentParser()
+parser.add_argument('-n', '--materials', type=int, default=100000,
+                    help='Number of materials to deplete')
+parser.add_argument('--chain', default=str(simple_chain),
+                    help='Depletion chain XML file')
+parser.add_argument('--dt', type=float, default=5.,
+                    help='Time step in days')
+parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                    help='Number of processes used to deplete materials')
+parser.add_argument('--batch-size', type=int, default=None,
+                    help='Number of materials solved together')
+parser.add_argument('--check', type=int, default=0, metavar='N',
+                    help='Compare the first N materials with scipy.linalg.expm')
+args = parser.parse_args()
+
+chain = Chain.from_xml(args.chain)
+n0, rates = synthetic_problem(chain, args.materials)
+dt = args.dt*24*60*60
+print('Depleting {} materials with {} nuclides ({} nonzeros per burnup '
+      'matrix)'.format(args.materials, len(chain), chain.nnz))
+
+start = time.perf_counter()
+n1 = deplete(chain, n0, rates, dt, args.jobs, args.batch_size)
+elapsed = time.perf_counter() - start
+print('{:.2f} s ({:.1f} us per material)'.format(
+    elapsed, 1e6*elapsed/args.materials))
+
+if args.check:
+    error = 0.
+    for i in range(min(args.check, args.materials)):
+        A = chain.burnup_matrix(rates[i]).toarray()
+        expected = scipy.linalg.expm(A*dt).dot(n0[i])
+        error = max(error, np.abs(n1[i] - expected).max()/expected.max())
+    print('Largest error relative to the largest density: {:.2e}'.format(
+        error))
@@ -1,18 +1,35 @@
 #!/usr/bin/env python3
 
 import argparse
+import atexit
 import copy
+import os
+import sys
 from pathlib import Path
 
 import numpy as np
 from tqdm import tqdm
 
 import openmc
-from smr.materials import materials
-from smr.surfaces import surfs, lattice_pitch, bottom_fuel_stack, top_active_core
-from smr.assemblies import assembly_universes
-from smr.plots import assembly_plots
-from smr import inlet_temperature
+from smr import core_average_temperature, system_pressure
+from smr.materials import boron_ppm, coolant_materials
+from smr.model import SMRModel
+from smr.settings import assembly_settings
+from smr.tallies import (depletion_tallies, merged_depletion_tallies,
+                        export_tally_map, count_bins)
+from smr.pins import fuel_lookup_cost
+from smr.instances import count_instances
+from smr.index import ModelIndex
+from smr.volumes import fuel_cell_volumes
+from smr.compositions import Compositions
+from smr.traversal import traverse, invalidate
+from smr.simplify import deduplicate, merge_surfaces, simplify_regions
+from smr.control_rods import bank_surfaces
+from smr.profiling import Profiler, phase
+from smr.cache import (BuildCache, BuildManifest, build_key, input_key,
+                       package_modules)
+from smr.export import (distribmat_ids, export_materials, export_geometry,
+                        export_parallel, patch_materials)
 
 
 # Define command-line options
@@ -27,8 +44,69 @@ parser.add_argument('-a', '--axial', type=int, default=196,
                     help='Number of axial subdivisions in fuel')
 parser.add_argument('-d', '--depleted', action='store_true',
                     help='Whether UO2 compositions should represent depleted fuel')
+parser.add_argument('--boron-ppm', type=float, default=boron_ppm,
+                    help='Concentration of boron in the coolant in ppm')
+parser.add_argument('--temperature', type=float,
+                    default=core_average_temperature,
+                    help='Coolant temperature in K')
+parser.add_argument('--pressure', type=float, default=system_pressure,
+                    help='System pressure in MPa')
+parser.add_argument('--axial-lattice', action='store_true',
+                    help='Subdivide fuel axially with a lattice of ring '
+                    'universes rather than a flat universe of cells')
+parser.add_argument('--tree-stacks', action='store_true',
+                    help='Build axial stacks as balanced binary trees of nested '
+                    'universes')
+parser.add_argument('--merge-surfaces', action='store_true',
+                    help='Replace coincident surfaces with a single surface '
+                    'before exporting')
+parser.add_argument('--surface-tolerance', type=float, default=1e-10,
+                    help='Largest difference in coefficients of surfaces that '
+                    'are merged')
+parser.add_argument('--deduplicate', action='store_true',
+                    help='Merge structurally identical universes before '
+                    'exporting')
+parser.add_argument('--simplify-regions', action='store_true',
+                    help='Remove half-spaces from cell regions that are implied '
+                    'by where each universe is used')
+parser.add_argument('--fixed-rods', action='store_true',
+                    help='Let the planes bounding control rod banks be merged '
+                    'and simplified like other surfaces. The banks can then no '
+                    'longer be moved in geometry.xml.')
+parser.add_argument('--merge-tallies', action='store_true',
+                    help='Combine the distribcell tallies of fuel cells sharing '
+                    'a universe (only used with distribcells)')
+parser.add_argument('-s', '--stream', action='store_true',
+                    help='Stream differentiated materials to XML rather than '
+                    'cloning them (only used with distribmats)')
+parser.add_argument('--compositions', action='store_true',
+                    help='Keep the compositions of streamed materials in one '
+                    'memory-mapped array (compositions.npy) and write them '
+                    'to materials.xml from it')
+parser.add_argument('-p', '--particles', type=int, default=10000,
+                    help='Number of particles per batch')
+parser.add_argument('-b', '--batches', type=int, default=200,
+                    help='Total number of batches')
+parser.add_argument('-i', '--inactive', type=int, default=100,
+                    help='Number of inactive batches')
 parser.add_argument('-o', '--output-dir', type=Path, default=None)
+parser.add_argument('-j', '--jobs', type=int, default=1,
+                    help='Number of processes used to export XML files')
+parser.add_argument('--cache-dir', type=Path,
+                    default=os.environ.get('SMR_CACHE_DIR'),
+                    help='Directory of cached inputs to reuse when nothing '
+                    'affecting them has changed')
+parser.add_argument('--cache-size', type=float, default=10.,
+                    help='Maximum size of the input cache in GB')
+parser.add_argument('--profile', nargs='?', const='', default=None,
+                    help='Write the time and memory used by each phase of the '
+                    'build to a JSON file (default: profile.json in the output '
+                    'directory)')
+parser.add_argument('--trace-memory', action='store_true',
+                    help='Trace memory allocations when profiling (slow)')
 args = parser.parse_args()
+if args.compositions and not args.stream:
+    parser.error('--compositions requires --stream')
 
 # Make directory for inputs
 if args.output_dir is None:
@@ -40,16 +118,100 @@ else:
     directory = args.output_dir
 directory.mkdir(exist_ok=True)
 
-# Define geometry with a single assembly
-assembly = assembly_universes(args.rings, args.axial, args.depleted)
-lattice_sides = openmc.model.get_rectangular_prism(lattice_pitch, lattice_pitch,
-                                                   boundary_type='reflective')
-main_cell = openmc.Cell(
-    fill=assembly['Assembly (3.1%) 16BA'],
-    region=lattice_sides & +surfs['lower bound'] & -surfs['upper bound']
-)
-root_univ = openmc.Universe(cells=[main_cell])
-geometry = openmc.Geometry(root_univ)
+# Measure the time and memory used by each phase of the build
+profiler = None
+if args.profile is not None:
+    profiler = Profiler(args.trace_memory)
+    profiler.start()
+
+    @atexit.register
+    def write_profile():
+        profiler.stop()
+        profiler.export(args.profile or directory / 'profile.json')
+
+# Determine the inputs that each file depends on. Settings do not depend on
+# the geometry, so changing only those doesn't require rebuilding it. Plots
+# color each differentiated fuel material and so depend on the geometry.
+# The boron concentration, temperature and pressure only change the
+# composition of the coolant, so builds differing only in them share the same
+# geometry and tallies.
+settings_args = ('multipole', 'particles', 'batches', 'inactive')
+build_args = ('output_dir', 'jobs', 'cache_dir', 'cache_size', 'profile',
+              'trace_memory')
+material_args = ('boron_ppm', 'temperature', 'pressure')
+settings_options = {k: getattr(args, k) for k in settings_args}
+geometry_options = {k: v for k, v in vars(args).items()
+                    if k not in settings_args + build_args + material_args}
+material_options = dict(geometry_options,
+                        **{k: getattr(args, k) for k in material_args})
+geometry_modules = [m for m in package_modules()
+                    if m not in ('cache', 'plots', 'profiling', 'settings',
+                                 'tallies')]
+keys = {
+    'materials.xml': input_key(material_options, geometry_modules, __file__),
+    'geometry.xml': input_key(geometry_options, geometry_modules, __file__),
+    'tallies.xml': input_key(geometry_options, geometry_modules + ['tallies'],
+                             __file__),
+    'plots.xml': input_key(geometry_options, geometry_modules + ['plots'],
+                           __file__),
+    'settings.xml': input_key(settings_options,
+                              ['__init__', 'surfaces', 'settings'], __file__),
+}
+merge = args.merge_tallies and args.tallies == 'cell'
+if merge:
+    keys['tally_map.json'] = keys['tallies.xml']
+
+# Compositions of the fuel are written along with materials.xml
+material_files = {'materials.xml'}
+if args.compositions:
+    material_files |= {'compositions.npy', 'compositions.json'}
+    for f in material_files:
+        keys[f] = keys['materials.xml']
+filenames = list(keys)
+manifest = BuildManifest(directory)
+
+# Reuse previously generated inputs if nothing affecting them has changed
+cache = None
+if args.cache_dir is not None:
+    cache = BuildCache(args.cache_dir, int(args.cache_size*1024**3))
+    options = {k: v for k, v in vars(args).items() if k not in build_args}
+    key = build_key(options, __file__)
+    with phase('cache_fetch'):
+        hit = cache.fetch(key, directory, filenames)
+    if hit:
+        manifest.update(keys)
+        print('Using cached inputs from {}'.format(args.cache_dir))
+        sys.exit()
+
+# Only regenerate files whose inputs have changed. Stale files are removed
+# first so that files hard linked from the cache are never modified in place.
+stale = manifest.stale(keys)
+if merge and stale & {'tallies.xml', 'tally_map.json'}:
+    stale |= {'tallies.xml', 'tally_map.json'}
+if stale & material_files:
+    stale |= material_files
+
+# If only the state of the coolant has changed, the coolant is replaced in the
+# existing materials.xml rather than regenerating it from the geometry. The
+# patched file is written anew, so a copy linked from the cache is untouched.
+# Compositions of the fuel do not depend on the coolant and are kept as is.
+patch = ('materials.xml' in stale and
+         not stale & {'geometry.xml', 'tallies.xml',
+                             'plots.xml'} and
+         all((directory / f).exists() for f in material_files))
+for f in stale:
+    if (directory / f).exists() and not (patch and f in material_files):
+        (directory / f).unlink()
+
+# Reuse individual files that another build (e.g., another variant of a
+# parameter sweep) generated from the same inputs
+if cache is not None and stale:
+    with phase('cache_fetch_files'):
+        fetched = cache.fetch_files({f: keys[f] for f in stale}, directory)
+    if fetched:
+        print('Using cached {}'.format(', '.join(sorted(fetched))))
+    stale -= fetched
+    patch = patch and 'materials.xml' in stale
 
 
 def clone(material):
@@ -59,90 +221,171 @@ def clone(material):
     return shared_mat
 
 
-#### "Differentiate" the geometry if using distribmats
-if args.tallies == 'mat':
-    # Count the number of instances for each cell and material
-    geometry.determine_paths(instances_only=True)
+# Functions that write each stale file, which are independent of one another
+writers = {}
+
+if patch:
+    model = SMRModel(args.rings, args.axial, args.depleted,
+                     boron_ppm=args.boron_ppm, temperature=args.temperature,
+                     pressure=args.pressure)
+    writers['materials.xml'] = lambda: patch_materials(
+        directory / 'materials.xml',
+        [model.mats[name] for name in coolant_materials])
+
+elif stale & {'materials.xml', 'geometry.xml', 'tallies.xml', 'plots.xml'}:
+    # Define geometry with a single assembly
+    with phase('assembly_geometry'):
+        model = SMRModel(args.rings, args.axial, args.depleted,
+                         args.axial_lattice, args.tree_stacks,
+                         boron_ppm=args.boron_ppm,
+                         temperature=args.temperature, pressure=args.pressure)
+        geometry = model.assembly_geometry('Assembly (3.1%) 16BA')
+
+    # Report the cost of locating a point within the subdivided fuel
+    if args.rings > 1 or args.axial > 1:
+        cost = fuel_lookup_cost(args.rings, args.axial, args.axial_lattice)
+        flat = fuel_lookup_cost(args.rings, args.axial)
+        print('Locating a point in the fuel searches up to {} cells ({} with '
+              'a flat fuel universe)'.format(cost, flat))
+        if profiler is not None:
+            profiler.count('fuel lookup cells', cost)
+
+    # Keep the planes bounding control rod banks so the banks can be moved
+    # later by patching geometry.xml (see smr.control_rods)
+    movable = [] if args.fixed_rods else bank_surfaces(model.surfs)
 
-    # Extract all cells filled by a fuel material
-    fuel_mats = {m for m in materials if 'UO2 Fuel' in m.name}
+    # Use a single surface for surfaces that coincide
+    if args.merge_surfaces:
+        with phase('merge_surfaces'):
+            removed = merge_surfaces(geometry, args.surface_tolerance,
+                                     exclude=movable)
+        print('Removed {} coincident surfaces'.format(removed))
 
-    for cell in tqdm(geometry.get_all_material_cells().values(),
-                     desc='Differentiating materials'):
-        if cell.fill in fuel_mats:
-            # Fill cell with list of "differentiated" materials
-            cell.fill = [clone(cell.fill) for i in range(cell.num_instances)]
+    # Merge universes that are identical apart from their names
+    if args.deduplicate:
+        with phase('deduplicate'):
+            removed = deduplicate(geometry, exclude=movable)
+        print('Removed {universes} universes, {cells} cells, {lattices} '
+              'lattices and {surfaces} surfaces duplicating others'.format(
+                  **removed))
 
-#### Create OpenMC "materials.xml" file
-print('Getting materials...')
-all_materials = geometry.get_all_materials()
-print('Creating materials collection...')
-materials = openmc.Materials(all_materials.values())
-print('Exporting materials to XML...')
-materials.export_to_xml(str(directory / 'materials.xml'))
+    # Remove half-spaces that the bounds of each universe already imply
+    if args.simplify_regions:
+        with phase('simplify_regions'):
+            removed = simplify_regions(geometry, exclude=movable)
+        print('Removed {} redundant half-spaces from cell regions'.format(
+            removed))
 
+    #### "Differentiate" the geometry if using distribmats
+    distribmats = None
+    compositions = None
+    if args.tallies == 'mat':
+        # Count the number of instances for each cell and material
+        with phase('count_instances'):
+            count_instances(geometry)
 
-#### Create OpenMC "geometry.xml" file
-geometry.export_to_xml(str(directory / 'geometry.xml'))
+        # Index the cells filled by a fuel material
+        with phase('index'):
+            index = ModelIndex(geometry)
+
+        # Volume of each instance of the fuel cells, so that no volume
+        # calculation is needed before depleting the differentiated materials
+        with phase('volumes'):
+            volumes = fuel_cell_volumes(index.get_fuel_cells(), args.rings,
+                                        args.axial)
+
+        with phase('differentiate'):
+            if args.stream:
+                # Reserve material IDs for each instance without creating
+                # materials
+                distribmats = distribmat_ids(
+                    geometry, index.get_materials('fuel'))
+            else:
+                for cell in tqdm(index.get_fuel_cells(),
+                                 desc='Differentiating materials'):
+                    # Fill cell with list of "differentiated" materials
+                    cell.fill.volume = volumes[cell]
+                    cell.fill = [clone(cell.fill)
+                                 for i in range(cell.num_instances)]
+
+                # Cells were re-filled, so cached traversals are out of date
+                invalidate(geometry)
+
+        # Keep the compositions of the streamed materials in one array
+        if distribmats and args.compositions:
+            with phase('compositions'):
+                compositions = Compositions.from_distribmats(
+                    distribmats, volumes, path=directory / 'compositions.npy')
+                compositions.flush()
+
+    if profiler is not None:
+        traversal = traverse(geometry)
+        profiler.count('universes', len(traversal.graph.universes))
+        profiler.count('cells', len(traversal.get_all_cells()))
+        profiler.count('materials', len(traversal.get_all_materials()))
+        if distribmats:
+            profiler.count('reserved material IDs', sum(
+                len(ids) for _, ids in distribmats.values()))
+
+    #### Create OpenMC "materials.xml" file
+    if 'materials.xml' in stale:
+        print('Getting materials...')
+        all_materials = traverse(geometry).get_all_materials()
+        if distribmats:
+            writers['materials.xml'] = lambda: export_materials(
+                directory / 'materials.xml', all_materials.values(), distribmats,
+                volumes, compositions)
+        else:
+            print('Creating materials collection...')
+            all_materials = openmc.Materials(all_materials.values())
+            writers['materials.xml'] = lambda: all_materials.export_to_xml(
+                str(directory / 'materials.xml'))
+
+    #### Create OpenMC "geometry.xml" file
+    if 'geometry.xml' in stale:
+        if distribmats:
+            writers['geometry.xml'] = lambda: export_geometry(
+                geometry, directory / 'geometry.xml', distribmats)
+        else:
+            writers['geometry.xml'] = lambda: geometry.export_to_xml(
+                str(directory / 'geometry.xml'))
+
+    ####  Create OpenMC "tallies.xml" file
+    if 'tallies.xml' in stale and merge:
+        def write_merged_tallies():
+            tallies, table = merged_depletion_tallies(geometry)
+            tallies.export_to_xml(str(directory / 'tallies.xml'))
+            export_tally_map(table, directory / 'tally_map.json')
+            if profiler is not None:
+                profiler.count('tally bins', count_bins(tallies, geometry))
+        writers['tallies.xml'] = write_merged_tallies
+    elif 'tallies.xml' in stale:
+        def write_tallies():
+            tallies = depletion_tallies(geometry, args.tallies, distribmats)
+            tallies.export_to_xml(str(directory / 'tallies.xml'))
+            if profiler is not None:
+                profiler.count('tally bins', count_bins(tallies, geometry))
+        writers['tallies.xml'] = write_tallies
+
+    # Create plots
+    if 'plots.xml' in stale:
+        writers['plots.xml'] = lambda: model.assembly_plots(
+            geometry.root_universe).export_to_xml(str(directory / 'plots.xml'))
 
 
 #### Create OpenMC "settings.xml" file
+if 'settings.xml' in stale:
+    writers['settings.xml'] = lambda: assembly_settings(
+        **settings_options).export_to_xml(str(directory / 'settings.xml'))
 
-# Construct uniform initial source distribution over fissionable zones
-lower_left = (-lattice_pitch/2, -lattice_pitch/2, bottom_fuel_stack)
-upper_right = (lattice_pitch/2, lattice_pitch/2, top_active_core)
-source = openmc.source.Source(space=openmc.stats.Box(lower_left, upper_right))
-source.space.only_fissionable = True
-
-settings = openmc.Settings()
-settings.batches = 200
-settings.inactive = 100
-settings.particles = 10000
-settings.output = {'tallies': False, 'summary': False}
-settings.source = source
-settings.sourcepoint_write = False
-settings.temperature = {
-    'default': inlet_temperature,
-    'method': 'interpolation',
-    'range': (300.0, 1500.0),
-}
-if args.multipole:
-    settings.temperature['multipole'] = True
-    settings.temperature['tolerance'] = 1000
-
-settings.export_to_xml(str(directory / 'settings.xml'))
-
-
-####  Create OpenMC "tallies.xml" file
-tallies = openmc.Tallies()
-
-# Extract all fuel materials
-materials = geometry.get_materials_by_name(name='Fuel', matching=False)
-
-# If using distribcells, create distribcell tally needed for depletion
-if args.tallies == 'cell':
-    # Extract all cells filled by a fuel material
-    fuel_cells = []
-    for cell in geometry.get_all_cells().values():
-        if cell.fill in materials:
-            tally = openmc.Tally(name='depletion tally')
-            tally.scores = ['(n,p)', '(n,a)', '(n,gamma)',
-                            'fission', '(n,2n)', '(n,3n)', '(n,4n)']
-            tally.nuclides = cell.fill.get_nuclides()
-            tally.filters.append(openmc.DistribcellFilter([cell]))
-            tallies.append(tally)
-
-# If using distribmats, create material tally needed for depletion
-elif args.tallies == 'mat':
-    tally = openmc.Tally(name='depletion tally')
-    tally.scores = ['(n,p)', '(n,a)', '(n,gamma)',
-                    'fission', '(n,2n)', '(n,3n)', '(n,4n)']
-    tally.nuclides = materials[0].get_nuclides()
-    tally.filters = [openmc.MaterialFilter(materials)]
-    tallies.append(tally)
-
-tallies.export_to_xml(str(directory / 'tallies.xml'))
-
-# Create plots
-plots = assembly_plots(main_cell.fill)
-plots.export_to_xml(str(directory / 'plots.xml'))
+print('Exporting inputs to XML...')
+with phase('export'):
+    export_parallel(writers, args.jobs)
+manifest.update(keys)
+
+# Save inputs so that an identical build can reuse them, and each newly
+# generated file so that builds sharing some of its inputs can
+if cache is not None:
+    with phase('cache_store'):
+        cache.store(key, directory, filenames)
+        cache.store_files({f: keys[f] for f in stale}, directory)
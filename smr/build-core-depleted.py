@@ -1,47 +1,136 @@
 #!/usr/bin/env python3
 
+import argparse
+import atexit
+import os
+import sys
+from pathlib import Path
+
 import numpy as np
 import opendeplete
 
 from smr.surfaces import lattice_pitch, bottom_fuel_stack, top_active_core
-from smr.core import geometry
+from smr.model import SMRModel
+from smr.instances import count_instances
+from smr.index import ModelIndex
+from smr.depletion import Chain, integrate, latest_checkpoint
+from smr.volumes import fuel_cell_volumes
+from smr.zones import SCHEMES, FuelInstances, zone_report
+from smr.profiling import Profiler, phase
+
+
+# Define command-line options
+parser = argparse.ArgumentParser()
+parser.add_argument('--profile', nargs='?', const='', default=None,
+                    help='Write the time and memory used by each phase of the '
+                    'build to a JSON file (default: profile.json in the output '
+                    'directory)')
+parser.add_argument('--trace-memory', action='store_true',
+                    help='Trace memory allocations when profiling (slow)')
+parser.add_argument('--zones', choices=SCHEMES, default=None,
+                    help='Group instances of the fuel into depletion zones '
+                    'that share a material rather than depleting every '
+                    'instance separately')
+parser.add_argument('-k', '--num-zones', type=int, default=None,
+                    help='Number of depletion zones (default for assembly '
+                    'zones: one per assembly)')
+parser.add_argument('--zone-report', nargs='+', type=int, metavar='K',
+                    help='Report the number of materials and the memory '
+                    'needed for each number of zones K and exit')
+parser.add_argument('--seed', type=int, default=1,
+                    help='Seed for k-means clustering of depletion zones')
+parser.add_argument('--chain', default=os.environ.get('OPENDEPLETE_CHAIN'),
+                    help='Depletion chain XML file (defaults to the '
+                    'OPENDEPLETE_CHAIN environment variable)')
+parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                    help='Number of processes used to deplete materials')
+parser.add_argument('--no-restart', action='store_true',
+                    help='Start from the first time step even if checkpoints '
+                    'of later steps exist')
+args = parser.parse_args()
+if args.zone_report and args.zones is None:
+    parser.error('--zone-report requires --zones')
+if args.chain is None:
+    parser.error('--chain is required unless OPENDEPLETE_CHAIN is set')
+
+directory = Path('core-depleted')
+
+# Measure the time and memory used by each phase of the build
+if args.profile is not None:
+    profiler = Profiler(args.trace_memory)
+    profiler.start()
 
+    @atexit.register
+    def write_profile():
+        profiler.stop()
+        directory.mkdir(exist_ok=True)
+        profiler.export(args.profile or directory / 'profile.json')
 
-# FIXME: Automatically extract info needed to calculate burnable cell volumes
-# Fuel rod geometric parameters
-radius = 0.39218
-height = 200.
+# Number of annular and axial subdivisions of the fuel
+num_rings = 10
+num_axial = 196
+
+# Height of the active fuel
+height = top_active_core - bottom_fuel_stack
+
+with phase('core_geometry'):
+    model = SMRModel(num_rings=num_rings, num_axial=num_axial, depleted=True)
+    geometry = model.core_geometry()
 
 # Count the number of instances for each cell and material
-geometry.determine_paths(instances_only=True)
+with phase('count_instances'):
+    count_instances(geometry)
 
 # Extract all cells filled by a fuel material
-fuel_cells = geometry.get_cells_by_name(
-    name='(1.6%) (0)', case_sensitive=True)
-fuel_cells.extend(geometry.get_cells_by_name(
-    name='(1.6%) grid (bottom) (0)', case_sensitive=True))
-fuel_cells.extend(geometry.get_cells_by_name(
-    name='(1.6%) grid (intermediate) (0)', case_sensitive=True))
-fuel_cells.extend(geometry.get_cells_by_name(
-    name='(2.4%) (0)', case_sensitive=True))
-fuel_cells.extend(geometry.get_cells_by_name(
-    name='(2.4%) grid (bottom) (0)', case_sensitive=True))
-fuel_cells.extend(geometry.get_cells_by_name(
-    name='(2.4%) grid (intermediate) (0)', case_sensitive=True))
-fuel_cells.extend(geometry.get_cells_by_name(
-    name='(3.1%) (0)', case_sensitive=True))
-fuel_cells.extend(geometry.get_cells_by_name(
-    name='(3.1%) grid (bottom) (0)', case_sensitive=True))
-fuel_cells.extend(geometry.get_cells_by_name(
-    name='(3.1%) grid (intermediate) (0)', case_sensitive=True))
+with phase('index'):
+    fuel_cells = ModelIndex(geometry).get_fuel_cells()
+
+# Determine the volume of each instance of the fuel cells analytically
+with phase('volumes'):
+    volumes = fuel_cell_volumes(fuel_cells, num_rings, num_axial)
+total = sum(volumes[cell]*cell.num_instances for cell in fuel_cells)
+print('Total volume of burnable fuel regions: {:.6g} cm^3'.format(total))
+
+# Locate each instance of the fuel cells to group them into zones
+if args.zones is not None:
+    with phase('fuel_instances'):
+        instances = FuelInstances(geometry, num_rings, num_axial)
+
+if args.zone_report:
+    nuclides = len(fuel_cells[0].fill.get_nuclides())
+    with phase('zone_report'):
+        rows = zone_report(instances, args.zones, args.zone_report, nuclides,
+                           args.seed)
+    print('{:>10} {:>10} {:>12} {:>14} {:>16}'.format(
+        'Zones', 'Materials', 'Tally bins', 'Tally memory', 'Material memory'))
+    for row in rows:
+        print('{zones:>10} {materials:>10} {tally_bins:>12} '
+              '{:>11.1f} MB {:>13.1f} MB'.format(
+                  row['tally_memory']/1024**2, row['material_memory']/1024**2,
+                  **row))
+    sys.exit()
 
 # Assign distribmats for each material
-for cell in fuel_cells:
-    cell.fill.volume = np.pi * radius**2 * height
-    cell.fill.depletable = True
-    cell.fill.temperature = 300.0
+with phase('differentiate'):
+    for cell in fuel_cells:
+        cell.fill.depletable = True
+        cell.fill.temperature = 300.0
 
-    cell.fill = [cell.fill.clone() for i in range(cell.num_instances)]
+    if args.zones is not None:
+        # Instances in the same zone share a material
+        zones = instances.zones(args.zones, args.num_zones, args.seed)
+        materials = instances.differentiate(zones)
+        print('Depleting {} materials in {} {} zones'.format(
+            len(materials), len(np.unique(zones)), args.zones))
+    else:
+        # Each instance gets its own material with the volume of the instance
+        for cell in fuel_cells:
+            clones = []
+            for i in range(cell.num_instances):
+                c = cell.fill.clone()
+                c.volume = volumes[cell]
+                clones.append(c)
+            cell.fill = clones
 
 # Create dt vector for 1 month with 5 day timesteps
 dt1 = 5*24*60*60  # 5 days
@@ -64,9 +153,51 @@ settings.entropy_dimension = [15, 15, 1]
 # MeV/second cm from CASMO
 settings.power = 2.337e15 * ((17.*17.*37.) / 1.5**2) * height
 settings.dt_vec = dt
-settings.output_dir = 'core-depleted'
+settings.output_dir = str(directory)
+settings.chain_file = args.chain
+
+with phase('operator'):
+    op = opendeplete.OpenMCOperator(geometry, settings)
+    chain = Chain.from_xml(args.chain)
+
+# Map the nuclides and reactions of the operator to those of the chain
+_, burn_nucs, _, _ = op.get_results_info()
+columns = [chain.index[nuc] for nuc in burn_nucs]
+rate_index = [(op.reaction_rates.nuc_to_ind.get(nuc),
+               op.reaction_rates.react_to_ind.get(rx))
+              for nuc, rx in chain.reactions]
+
+
+def transport(n):
+    """Run OpenMC and return k and the reaction rates of each material."""
+    k, rates, _ = op.eval([n[i, columns] for i in range(len(n))])
+    result = np.zeros((len(n), len(chain.reactions)))
+    for j, (nuc, rx) in enumerate(rate_index):
+        if nuc is not None and rx is not None:
+            result[:, j] = rates[:, nuc, rx]
+    return k, result
+
+
+def report(step, time, keff):
+    """Print the multiplication factors of a depletion step."""
+    print('Step {}: t = {:g} s, k = {}'.format(
+        step, time, ', '.join('{:.5f}'.format(k) for k in keff)))
+
 
-op = opendeplete.OpenMCOperator(geometry, settings)
+initial = op.initial_condition()
+n0 = np.zeros((len(initial), len(chain)))
+n0[:, columns] = initial
 
-# Perform simulation using the MCNPX/MCNP6 algorithm
-opendeplete.cecm(op)
+# Perform simulation using the CE/CM predictor-corrector algorithm, writing a
+# checkpoint after each step so that an interrupted run can be resumed
+with phase('depletion'):
+    cwd = os.getcwd()
+    os.chdir(str(directory))
+    try:
+        checkpoint = latest_checkpoint('checkpoints')
+        if checkpoint is not None and not args.no_restart:
+            print('Restarting from {}'.format(checkpoint))
+        integrate(transport, chain, n0, dt, 'checkpoints', args.jobs,
+                  restart=not args.no_restart, callback=report)
+    finally:
+        os.chdir(cwd)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+"""Write the inputs for a sequence of control rod positions.
+
+Starting from the inputs of a model that has already been built (e.g., by
+build-core-fresh.py), a directory is written for each position of the moving
+banks. Only geometry.xml differs between positions: it is copied with the
+planes bounding the moving banks shifted (see smr.control_rods), and every
+other input file is linked to the original.
+
+"""
+
+import argparse
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from smr.control_rods import aro_step, banks, patch_geometry
+
+
+def bank_steps(value):
+    bank, _, step = value.partition('=')
+    return bank, float(step)
+
+
+# Define command-line options
+parser = argparse.ArgumentParser(
+    description='Write the inputs for a sequence of control rod positions')
+parser.add_argument('-i', '--input-dir', type=Path, default=Path('core-fresh'),
+                    help='Directory containing the inputs of the model')
+parser.add_argument('--banks', nargs='+', choices=banks, default=['D'],
+                    help='Banks that are moved together')
+parser.add_argument('--steps', nargs=3, type=float,
+                    default=[0., aro_step, 8.],
+                    metavar=('FIRST', 'LAST', 'INCREMENT'),
+                    help='Positions of the moving banks in steps withdrawn')
+parser.add_argument('--fixed', nargs='+', type=bank_steps, default=[],
+                    metavar='BANK=STEP',
+                    help='Positions of other banks that are not at the '
+                    'position given in the input geometry')
+parser.add_argument('-o', '--output-dir', type=Path, default=None)
+args = parser.parse_args()
+
+if args.output_dir is None:
+    args.output_dir = Path('{}-rods'.format(args.input_dir.name))
+args.output_dir.mkdir(parents=True, exist_ok=True)
+
+first, last, increment = args.steps
+positions = np.arange(first, last + increment/2, increment)
+fixed = OrderedDict(args.fixed)
+
+inputs = [p for p in args.input_dir.glob('*.xml') if p.name != 'geometry.xml']
+sequence = []
+for step in positions:
+    steps = OrderedDict(fixed)
+    steps.update((b, float(step)) for b in args.banks)
+
+    directory = args.output_dir / 'step{:05.1f}'.format(step)
+    directory.mkdir(exist_ok=True)
+    heights = patch_geometry(args.input_dir / 'geometry.xml', steps,
+                             directory / 'geometry.xml')
+
+    # Link the input files that do not depend on the positions of the banks
+    for path in inputs:
+        link = directory / path.name
+        if link.is_symlink() or link.exists():
+            link.unlink()
+        link.symlink_to(os.path.relpath(str(path.resolve()), str(directory)))
+
+    sequence.append(OrderedDict([
+        ('directory', directory.name),
+        ('steps', steps),
+        ('heights', heights)
+    ]))
+    print('{}: {}'.format(directory, ', '.join(
+        'bank {} at step {:g}'.format(b, s) for b, s in steps.items())))
+
+with open(str(args.output_dir / 'sequence.json'), 'w') as fh:
+    json.dump(sequence, fh, indent=2)
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+
+"""Build the inputs for every combination of a grid of model parameters.
+
+Each variant is built by running build-core-fresh.py (or build-assembly.py)
+in its own process, optionally with several variants built at once. All
+variants share one input cache, so a file that does not depend on the
+parameters a variant differs in is only generated once. For example, variants
+that differ only in boron concentration share geometry.xml and tallies.xml,
+and all variants share settings.xml. Variants are built in two waves: first
+one boron concentration of each geometry, then the other concentrations, so
+that these find the geometry in the cache rather than generating it again.
+A manifest of the variants and the files generated for each is written to
+the output directory as each variant finishes. Running the sweep again skips
+variants that were already built, so an interrupted sweep picks up where it
+left off.
+
+Options not recognized by this script are passed on to every build, e.g.,
+``--stream`` or ``--particles 100000``.
+
+"""
+
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from smr.cache import BuildManifest
+from smr.materials import boron_ppm
+
+
+SCRIPTS = {
+    'core': 'build-core-fresh.py',
+    'assembly': 'build-assembly.py'
+}
+
+PARAMETERS = ('boron_ppm', 'model', 'rings', 'axial', 'tallies', 'fuel')
+
+
+def variant_name(params):
+    return '{model}-r{rings}-a{axial}-b{boron_ppm:g}-{tallies}-{fuel}'.format(
+        **params)
+
+
+def build_variant(params, directory, cache_dir, cache_size, jobs, extra):
+    """Build the inputs for one variant in a separate process.
+
+    Parameters
+    ----------
+    params : dict
+        Value of each parameter in :data:`PARAMETERS`
+    directory : pathlib.Path
+        Directory in which to write the inputs
+    cache_dir : pathlib.Path
+        Directory of the input cache shared by all variants
+    cache_size : float
+        Maximum size of the input cache in GB
+    jobs : int
+        Number of processes used to export XML files
+    extra : list of str
+        Additional command-line options for the build script
+
+    Returns
+    -------
+    int
+        Exit status of the build
+    float
+        Time in seconds taken by the build
+
+    """
+    script = Path(__file__).parent / SCRIPTS[params['model']]
+    cmd = [sys.executable, str(script),
+           '-r', str(params['rings']), '-a', str(params['axial']),
+           '--boron-ppm', str(params['boron_ppm']), '-t', params['tallies'],
+           '-o', str(directory), '-j', str(jobs),
+           '--cache-dir', str(cache_dir), '--cache-size', str(cache_size)]
+    if params['fuel'] == 'depleted':
+        cmd.append('-d')
+    cmd += extra
+
+    directory.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    with open(str(directory / 'build.log'), 'w') as log:
+        status = subprocess.run(cmd, stdout=log,
+                                stderr=subprocess.STDOUT).returncode
+    return status, time.perf_counter() - start
+
+
+def is_built(entry, directory, extra):
+    """Determine whether a variant was already built with the same options."""
+    if entry is None or entry['status'] != 'done' or entry['extra'] != extra:
+        return False
+    return all((directory / f).exists() for f in entry['files'])
+
+
+def save_manifest(path, manifest):
+    tmp = path.with_name(path.name + '.tmp')
+    with open(str(tmp), 'w') as fh:
+        json.dump(manifest, fh, indent=2)
+    os.replace(str(tmp), str(path))
+
+
+# Define command-line options
+parser = argparse.ArgumentParser(
+    description='Build the inputs for every combination of the given model '
+    'parameters. Unrecognized options are passed on to every build.')
+parser.add_argument('--models', nargs='+', choices=list(SCRIPTS),
+                    default=['core'], help='Models to build')
+parser.add_argument('-r', '--rings', nargs='+', type=int, default=[10],
+                    help='Numbers of annular regions in fuel')
+parser.add_argument('-a', '--axial', nargs='+', type=int, default=[196],
+                    help='Numbers of axial subdivisions in fuel')
+parser.add_argument('--boron-ppm', nargs='+', type=float, default=[boron_ppm],
+                    help='Concentrations of boron in the coolant in ppm')
+parser.add_argument('-t', '--tallies', nargs='+', choices=('cell', 'mat'),
+                    default=['mat'], help='Tally modes')
+parser.add_argument('--fuel', nargs='+', choices=('fresh', 'depleted'),
+                    default=['fresh'], help='Fuel compositions')
+parser.add_argument('-o', '--output-dir', type=Path, default=Path('sweep'),
+                    help='Directory in which a subdirectory is created for '
+                    'each variant')
+parser.add_argument('-j', '--jobs', type=int, default=1,
+                    help='Number of variants built at the same time. Each '
+                    'build of the full core needs several GB of memory.')
+parser.add_argument('--export-jobs', type=int, default=1,
+                    help='Number of processes used by each build to export '
+                    'XML files')
+parser.add_argument('--cache-dir', type=Path, default=None,
+                    help='Directory of the input cache shared by all variants '
+                    '(default: .cache in the output directory)')
+parser.add_argument('--cache-size', type=float, default=10.,
+                    help='Maximum size of the input cache in GB')
+parser.add_argument('--force', action='store_true',
+                    help='Rebuild variants that were already built')
+args, extra = parser.parse_known_args()
+
+args.output_dir.mkdir(parents=True, exist_ok=True)
+cache_dir = args.cache_dir or args.output_dir / '.cache'
+manifest_path = args.output_dir / 'sweep.json'
+if manifest_path.exists():
+    with open(str(manifest_path)) as fh:
+        manifest = json.load(fh, object_pairs_hook=OrderedDict)
+else:
+    manifest = OrderedDict()
+
+# Enumerate variants with the boron concentration varying slowest
+variants = OrderedDict()
+for values in itertools.product(args.boron_ppm, args.models, args.rings,
+                                args.axial, args.tallies, args.fuel):
+    params = OrderedDict(zip(PARAMETERS, values))
+    variants[variant_name(params)] = params
+
+pending = []
+for name, params in variants.items():
+    if not args.force and is_built(manifest.get(name),
+                                   args.output_dir / name, extra):
+        print('{} already built'.format(name))
+    else:
+        pending.append(name)
+
+# Variants differing only in boron concentration share their geometry. The
+# first concentration of each geometry is built before any of the others, so
+# that the others find the geometry in the cache once they start.
+first = OrderedDict()
+for name in pending:
+    geometry = tuple(value for key, value in variants[name].items()
+                     if key != 'boron_ppm')
+    first.setdefault(geometry, name)
+waves = [list(first.values()),
+         [name for name in pending if name not in first.values()]]
+
+# Build the variants of each wave in parallel, recording each as it finishes
+failed = []
+finished = 0
+with ThreadPoolExecutor(max(args.jobs, 1)) as executor:
+    for wave in waves:
+        futures = {}
+        for name in wave:
+            future = executor.submit(
+                build_variant, variants[name], args.output_dir / name,
+                cache_dir, args.cache_size, args.export_jobs, extra)
+            futures[future] = name
+
+        for future in as_completed(futures):
+            finished += 1
+            name = futures[future]
+            status, elapsed = future.result()
+            directory = args.output_dir / name
+            files = BuildManifest(directory).keys if status == 0 else {}
+
+            manifest[name] = OrderedDict([
+                ('parameters', variants[name]),
+                ('directory', name),
+                ('status', 'done' if status == 0 else 'failed'),
+                ('exit_status', status),
+                ('build_time', elapsed),
+                ('finished', time.strftime('%Y-%m-%dT%H:%M:%S')),
+                ('extra', extra),
+                ('files', files)
+            ])
+            save_manifest(manifest_path, manifest)
+
+            if status == 0:
+                print('[{}/{}] {} built in {:.1f} s'.format(
+                    finished, len(pending), name, elapsed))
+            else:
+                failed.append(name)
+                print('[{}/{}] {} failed with exit status {} (see {})'.format(
+                    finished, len(pending), name, status,
+                    directory / 'build.log'))
+
+if failed:
+    sys.exit(1)
@@ -4,16 +4,18 @@ import numpy as np
 
 import openmc
 
-from .materials import mats
-from .surfaces import surfs, pin_pitch
+from .materials import default_materials
+from .surfaces import default_surfaces, pin_pitch
 from .pins import pin_universes
+from .profiling import phase
+from .registry import LazyUniverses
 
 
-def make_assembly(name, universes):
+def make_assembly(name, universes, mats=None, surfs=None):
     """Instantiate an OpenMC Lattice for this fuel assembly.
 
     This method creates a 17x17 PWR lattice with axially spaced
-    sleeves defined in the global surfs dictionary.
+    sleeves defined in the surfs dictionary.
 
     Parameters
     ----------
@@ -21,12 +23,22 @@ def make_assembly(name, universes):
         The string name to assign to the Lattice
     universes: numpy.ndarray of openmc.Universe
         A 2D NumPy array of Universes to use for the Lattice
+    mats: dict, optional
+        Materials of the model. Defaults to
+        :func:`smr.materials.default_materials`.
+    surfs: dict, optional
+        Surfaces of the model. Defaults to
+        :func:`smr.surfaces.default_surfaces`.
 
     Returns
     -------
     universe: openmc.Universe
         A Universe with a Cell filled by the Lattice
     """
+    if mats is None:
+        mats = default_materials()
+    if surfs is None:
+        surfs = default_surfaces()
 
     # Instantiate the lattice
     lattice = openmc.RectLattice(name=name)
@@ -120,7 +132,8 @@ def make_assembly(name, universes):
     return universe
 
 
-def assembly_universes(num_rings, num_axial, depleted):
+def assembly_universes(num_rings, num_axial, depleted, axial_lattice=False,
+                       tree_stacks=False, mats=None, surfs=None):
     """Generate universes for SMR fuel assemblies.
 
     Parameters
@@ -131,32 +144,48 @@ def assembly_universes(num_rings, num_axial, depleted):
         Number of axial subdivisions in fuel
     depleted : bool
         Whether fuel should contain nuclides as though it were depleted
+    axial_lattice : bool
+        Whether to subdivide the fuel axially with a lattice (see
+        :func:`smr.pins.pin_universes`)
+    tree_stacks : bool
+        Whether to build axial stacks as balanced binary trees of nested
+        universes (see :func:`smr.pins.make_stack`)
+    mats : dict, optional
+        Materials of the model. Defaults to
+        :func:`smr.materials.default_materials`.
+    surfs : dict, optional
+        Surfaces of the model. Defaults to
+        :func:`smr.surfaces.default_surfaces`.
 
     Returns
     -------
-    dict
-        Dictionary mapping a universe name to a openmc.Universe object
+    smr.registry.LazyUniverses
+        Dictionary mapping a universe name to a openmc.Universe object. Each
+        assembly (and the pin universes it contains) is only built the first
+        time it is requested.
 
     """
-    pins = pin_universes(num_rings, num_axial, depleted)
+    with phase('pin_universes'):
+        pins = pin_universes(num_rings, num_axial, depleted, axial_lattice,
+                             tree_stacks, mats, surfs)
 
     # Create dictionary to store assembly universes
-    univs = {}
-
-    # commonly needed universes
-    gtu = pins['GT empty']
-    gti = pins['GT empty instr']
-    bas = pins['BA stack']
-    ins = pins['IT stack']
-    crA = pins['GT CR bank A']
-    crB = pins['GT CR bank B']
-    crC = pins['GT CR bank C']
-    crD = pins['GT CR bank D']
-    crSA = pins['GT CR bank SA']
-    crSB = pins['GT CR bank SB']
-    crSC = pins['GT CR bank SC']
-    crSD = pins['GT CR bank SD']
-    crSE = pins['GT CR bank SE']
+    univs = LazyUniverses()
+
+    # names of commonly needed pin universes
+    gtu = 'GT empty'
+    gti = 'GT empty instr'
+    bas = 'BA stack'
+    ins = 'IT stack'
+    crA = 'GT CR bank A'
+    crB = 'GT CR bank B'
+    crC = 'GT CR bank C'
+    crD = 'GT CR bank D'
+    crSA = 'GT CR bank SA'
+    crSB = 'GT CR bank SB'
+    crSC = 'GT CR bank SC'
+    crSD = 'GT CR bank SD'
+    crSE = 'GT CR bank SE'
 
 
     # Define the NumPy array indices for assembly locations where there
@@ -166,39 +195,57 @@ def assembly_universes(num_rings, num_axial, depleted):
     nonfuel_x = \
         np.array([5,8,11,3,13,2,5,8,11,14,2,5,8,11,14,2,5,8,11,14,3,13,5,8,11])
 
+    def add_assembly(key, enrichment, nonfuel, name=None):
+        """Register an assembly that is built when it is first requested.
+
+        Parameters
+        ----------
+        key : str
+            Key of the assembly universe in the dictionary
+        enrichment : str
+            Enrichment of the fuel pins, e.g., '3.1'
+        nonfuel : list of str
+            Names of the pin universes at each of the nonfuel locations
+        name : str, optional
+            Name of the lattice if different from the key
+
+        """
+        def build():
+            universes = np.empty((17,17), dtype=openmc.Universe)
+            universes[:,:] = pins['Fuel ({}%) stack'.format(enrichment)]
+            universes[nonfuel_y, nonfuel_x] = [pins[p] for p in nonfuel]
+            return make_assembly(name or key, universes, mats, surfs)
+        univs.register(key, build)
+
 
     #### 1.6% ENRICHED ASSEMBLIES
 
     for cent, comment in [(gti, ''), (ins, ' instr')]:
 
         # NO BURNABLE ABSORBERS
-        universes = np.empty((17,17), dtype=openmc.Universe)
-        universes[:,:] = pins['Fuel (1.6%) stack']
-        universes[nonfuel_y, nonfuel_x] = [    gtu,   gtu,   gtu,
-                                             gtu,              gtu,
-                                           gtu, gtu,  gtu,  gtu, gtu,
-                                           gtu, gtu,  cent, gtu, gtu,
-                                           gtu, gtu,  gtu,  gtu, gtu,
-                                             gtu,              gtu,
-                                               gtu,   gtu,   gtu     ]
-        univs['Assembly (1.6%)' + comment] = \
-            make_assembly('Assembly (1.6%) no BAs' + comment, universes)
+        nonfuel = [    gtu,   gtu,   gtu,
+                     gtu,              gtu,
+                   gtu, gtu,  gtu,  gtu, gtu,
+                   gtu, gtu,  cent, gtu, gtu,
+                   gtu, gtu,  gtu,  gtu, gtu,
+                     gtu,              gtu,
+                       gtu,   gtu,   gtu     ]
+        add_assembly('Assembly (1.6%)' + comment, '1.6', nonfuel,
+                     name='Assembly (1.6%) no BAs' + comment)
 
         # WITH EACH CONTROL ROD BANK
         for bank, comment2 in [(crA, 'A'), (crB, 'B'), (crC, 'C'), (crD, 'D'),
                      (crSB, 'SB'), (crSC, 'SC'), (crSD, 'SD'), (crSE, 'SE')]:
 
-            universes = np.empty((17,17), dtype=openmc.Universe)
-            universes[:,:] = pins['Fuel (1.6%) stack']
-            universes[nonfuel_y, nonfuel_x] = [    bank,    bank,   bank,
-                                                 bank,                 bank,
-                                               bank, bank,  bank,  bank, bank,
-                                               bank, bank,  cent,  bank, bank,
-                                               bank, bank,  bank,  bank, bank,
-                                                 bank,                 bank,
-                                                   bank,    bank,   bank     ]
-            univs['Assembly (1.6%) CR {}'.format(comment2) + comment] = \
-                make_assembly('Assembly (1.6%) CR {}'.format(comment2) + comment, universes)
+            nonfuel = [    bank,    bank,   bank,
+                         bank,                 bank,
+                       bank, bank,  bank,  bank, bank,
+                       bank, bank,  cent,  bank, bank,
+                       bank, bank,  bank,  bank, bank,
+                         bank,                 bank,
+                           bank,    bank,   bank     ]
+            add_assembly('Assembly (1.6%) CR {}'.format(comment2) + comment,
+                         '1.6', nonfuel)
 
 
     #### 2.4% ENRICHED ASSEMBLIES
@@ -206,56 +253,44 @@ def assembly_universes(num_rings, num_axial, depleted):
     for cent, comment in [(gti, ''), (ins, ' instr')]:
 
         # NO BURNABLE ABSORBERS
-        universes = np.empty((17,17), dtype=openmc.Universe)
-        universes[:,:] = pins['Fuel (2.4%) stack']
-        universes[nonfuel_y, nonfuel_x] = [    gtu,   gtu,   gtu,
-                                             gtu,              gtu,
-                                           gtu, gtu,  gtu,  gtu, gtu,
-                                           gtu, gtu,  cent, gtu, gtu,
-                                           gtu, gtu,  gtu,  gtu, gtu,
-                                             gtu,              gtu,
-                                               gtu,   gtu,   gtu     ]
-        univs['Assembly (2.4%) no BAs' + comment] = \
-            make_assembly('Assembly (2.4%) no BAs' + comment, universes)
+        nonfuel = [    gtu,   gtu,   gtu,
+                     gtu,              gtu,
+                   gtu, gtu,  gtu,  gtu, gtu,
+                   gtu, gtu,  cent, gtu, gtu,
+                   gtu, gtu,  gtu,  gtu, gtu,
+                     gtu,              gtu,
+                       gtu,   gtu,   gtu     ]
+        add_assembly('Assembly (2.4%) no BAs' + comment, '2.4', nonfuel)
 
         # WITH CONTROL ROD D BANK
-        universes = np.empty((17,17), dtype=openmc.Universe)
-        universes[:,:] = pins['Fuel (2.4%) stack']
-        universes[nonfuel_y, nonfuel_x] = [    crD,   crD,   crD,
-                                             crD,              crD,
-                                           crD, crD,  crD,  crD, crD,
-                                           crD, crD,  cent, crD, crD,
-                                           crD, crD,  crD,  crD, crD,
-                                             crD,              crD,
-                                               crD,   crD,   crD     ]
-        univs['Assembly (2.4%) CR D' + comment] = \
-            make_assembly('Assembly (2.4%) CR D' + comment, universes)
+        nonfuel = [    crD,   crD,   crD,
+                     crD,              crD,
+                   crD, crD,  crD,  crD, crD,
+                   crD, crD,  cent, crD, crD,
+                   crD, crD,  crD,  crD, crD,
+                     crD,              crD,
+                       crD,   crD,   crD     ]
+        add_assembly('Assembly (2.4%) CR D' + comment, '2.4', nonfuel)
 
         # WITH 12 BURNABLE ABSORBERS
-        universes = np.empty((17,17), dtype=openmc.Universe)
-        universes[:,:] = pins['Fuel (2.4%) stack']
-        universes[nonfuel_y, nonfuel_x] = [    bas,   gtu,   bas,
-                                             bas,              bas,
-                                           bas, gtu,  gtu,  gtu, bas,
-                                           gtu, gtu,  cent, gtu, gtu,
-                                           bas, gtu,  gtu,  gtu, bas,
-                                             bas,              bas,
-                                               bas,   gtu,   bas     ]
-        univs['Assembly (2.4%) 12BA' + comment] = \
-            make_assembly('Assembly (2.4%) 12BA' + comment, universes)
+        nonfuel = [    bas,   gtu,   bas,
+                     bas,              bas,
+                   bas, gtu,  gtu,  gtu, bas,
+                   gtu, gtu,  cent, gtu, gtu,
+                   bas, gtu,  gtu,  gtu, bas,
+                     bas,              bas,
+                       bas,   gtu,   bas     ]
+        add_assembly('Assembly (2.4%) 12BA' + comment, '2.4', nonfuel)
 
         # WITH 16 BURNABLE ABSORBERS
-        universes = np.empty((17,17), dtype=openmc.Universe)
-        universes[:,:] = pins['Fuel (2.4%) stack']
-        universes[nonfuel_y, nonfuel_x] = [    bas,   bas,   bas,
-                                             bas,              bas,
-                                           bas, gtu,  gtu,  gtu, bas,
-                                           bas, gtu,  cent, gtu, bas,
-                                           bas, gtu,  gtu,  gtu, bas,
-                                             bas,              bas,
-                                               bas,   bas,   bas     ]
-        univs['Assembly (2.4%) 16BA' + comment] = \
-            make_assembly('Assembly (2.4%) 16BA' + comment, universes)
+        nonfuel = [    bas,   bas,   bas,
+                     bas,              bas,
+                   bas, gtu,  gtu,  gtu, bas,
+                   bas, gtu,  cent, gtu, bas,
+                   bas, gtu,  gtu,  gtu, bas,
+                     bas,              bas,
+                       bas,   bas,   bas     ]
+        add_assembly('Assembly (2.4%) 16BA' + comment, '2.4', nonfuel)
 
 
     #### 3.1% ENRICHED ASSEMBLIES
@@ -263,159 +298,124 @@ def assembly_universes(num_rings, num_axial, depleted):
     for cent, comment in [(gti, ''), (ins, ' instr')]:
 
         # NO BURNABLE ABSORBERS
-        universes = np.empty((17,17), dtype=openmc.Universe)
-        universes[:,:] = pins['Fuel (3.1%) stack']
-        universes[nonfuel_y, nonfuel_x] = [    gtu,   gtu,   gtu,
-                                             gtu,              gtu,
-                                           gtu, gtu,  gtu,  gtu, gtu,
-                                           gtu, gtu,  cent, gtu, gtu,
-                                           gtu, gtu,  gtu,  gtu, gtu,
-                                             gtu,              gtu,
-                                               gtu,   gtu,   gtu     ]
-        univs['Assembly (3.1%)' + comment] = \
-            make_assembly('Assembly (3.1%) no BAs' + comment, universes)
+        nonfuel = [    gtu,   gtu,   gtu,
+                     gtu,              gtu,
+                   gtu, gtu,  gtu,  gtu, gtu,
+                   gtu, gtu,  cent, gtu, gtu,
+                   gtu, gtu,  gtu,  gtu, gtu,
+                     gtu,              gtu,
+                       gtu,   gtu,   gtu     ]
+        add_assembly('Assembly (3.1%)' + comment, '3.1', nonfuel,
+                     name='Assembly (3.1%) no BAs' + comment)
 
         # WITH CONTROL ROD SA BANK
-        universes = np.empty((17,17), dtype=openmc.Universe)
-        universes[:,:] = pins['Fuel (3.1%) stack']
-        universes[nonfuel_y, nonfuel_x] = [     crSA,    crSA,   crSA,
-                                              crSA,                crSA,
-                                           crSA,  crSA,  crSA,  crSA,  crSA,
-                                           crSA,  crSA,  cent,  crSA,  crSA,
-                                           crSA,  crSA,  crSA,  crSA,  crSA,
-                                              crSA,                crSA,
-                                                crSA,    crSA,   crSA     ]
-        univs['Assembly (3.1%) CR SA' + comment] = \
-            make_assembly('Assembly (3.1%) CR SA' + comment, universes)
+        nonfuel = [     crSA,    crSA,   crSA,
+                      crSA,                crSA,
+                   crSA,  crSA,  crSA,  crSA,  crSA,
+                   crSA,  crSA,  cent,  crSA,  crSA,
+                   crSA,  crSA,  crSA,  crSA,  crSA,
+                      crSA,                crSA,
+                        crSA,    crSA,   crSA     ]
+        add_assembly('Assembly (3.1%) CR SA' + comment, '3.1', nonfuel)
 
         # WITH 20 BURNABLE ABSORBERS
-        universes = np.empty((17,17), dtype=openmc.Universe)
-        universes[:,:] = pins['Fuel (3.1%) stack']
-        universes[nonfuel_y, nonfuel_x] = [    bas,   bas,   bas,
-                                             bas,              bas,
-                                           bas, bas,  gtu,  bas, bas,
-                                           bas, gtu,  cent, gtu, bas,
-                                           bas, bas,  gtu,  bas, bas,
-                                             bas,              bas,
-                                               bas,   bas,   bas     ]
-        univs['Assembly (3.1%) 20BA' + comment] = \
-            make_assembly('Assembly (3.1%) 20BA' + comment, universes)
+        nonfuel = [    bas,   bas,   bas,
+                     bas,              bas,
+                   bas, bas,  gtu,  bas, bas,
+                   bas, gtu,  cent, gtu, bas,
+                   bas, bas,  gtu,  bas, bas,
+                     bas,              bas,
+                       bas,   bas,   bas     ]
+        add_assembly('Assembly (3.1%) 20BA' + comment, '3.1', nonfuel)
 
         # WITH 16 BURNABLE ABSORBERS
-        universes = np.empty((17,17), dtype=openmc.Universe)
-        universes[:,:] = pins['Fuel (3.1%) stack']
-        universes[nonfuel_y, nonfuel_x] = [    bas,   bas,   bas,
-                                             bas,              bas,
-                                           bas, gtu,  gtu,  gtu, bas,
-                                           bas, gtu,  cent, gtu, bas,
-                                           bas, gtu,  gtu,  gtu, bas,
-                                             bas,              bas,
-                                               bas,   bas,   bas     ]
-        univs['Assembly (3.1%) 16BA' + comment] = \
-            make_assembly('Assembly (3.1%) 16BA' + comment, universes)
+        nonfuel = [    bas,   bas,   bas,
+                     bas,              bas,
+                   bas, gtu,  gtu,  gtu, bas,
+                   bas, gtu,  cent, gtu, bas,
+                   bas, gtu,  gtu,  gtu, bas,
+                     bas,              bas,
+                       bas,   bas,   bas     ]
+        add_assembly('Assembly (3.1%) 16BA' + comment, '3.1', nonfuel)
 
         # WITH 15 BURNABLE ABSORBERS NW
-        universes = np.empty((17,17), dtype=openmc.Universe)
-        universes[:,:] = pins['Fuel (3.1%) stack']
-        universes[nonfuel_y, nonfuel_x] = [    gtu,   gtu,   gtu,
-                                             gtu,              gtu,
-                                           gtu, bas,  bas,  bas, bas,
-                                           gtu, bas,  cent, bas, bas,
-                                           gtu, bas,  bas,  bas, bas,
-                                             gtu,              bas,
-                                               bas,   bas,   bas     ]
-        univs['Assembly (3.1%) 15BANW' + comment] = \
-            make_assembly('Assembly (3.1%) 15BANW' + comment, universes)
+        nonfuel = [    gtu,   gtu,   gtu,
+                     gtu,              gtu,
+                   gtu, bas,  bas,  bas, bas,
+                   gtu, bas,  cent, bas, bas,
+                   gtu, bas,  bas,  bas, bas,
+                     gtu,              bas,
+                       bas,   bas,   bas     ]
+        add_assembly('Assembly (3.1%) 15BANW' + comment, '3.1', nonfuel)
 
         # WITH 15 BURNABLE ABSORBERS NE
-        universes = np.empty((17,17), dtype=openmc.Universe)
-        universes[:,:] = pins['Fuel (3.1%) stack']
-        universes[nonfuel_y, nonfuel_x] = [    gtu,   gtu,   gtu,
-                                             gtu,              gtu,
-                                           bas, bas,  bas,  bas, gtu,
-                                           bas, bas,  cent, bas, gtu,
-                                           bas, bas,  bas,  bas, gtu,
-                                             bas,              gtu,
-                                               bas,   bas,   bas     ]
-        univs['Assembly (3.1%) 15BANE' + comment] = \
-            make_assembly('Assembly (3.1%) 15BANE' + comment, universes)
+        nonfuel = [    gtu,   gtu,   gtu,
+                     gtu,              gtu,
+                   bas, bas,  bas,  bas, gtu,
+                   bas, bas,  cent, bas, gtu,
+                   bas, bas,  bas,  bas, gtu,
+                     bas,              gtu,
+                       bas,   bas,   bas     ]
+        add_assembly('Assembly (3.1%) 15BANE' + comment, '3.1', nonfuel)
 
         # WITH 15 BURNABLE ABSORBERS SW
-        universes = np.empty((17,17), dtype=openmc.Universe)
-        universes[:,:] = pins['Fuel (3.1%) stack']
-        universes[nonfuel_y, nonfuel_x] = [    bas,   bas,   bas,
-                                             gtu,              bas,
-                                           gtu, bas,  bas,  bas, bas,
-                                           gtu, bas,  cent, bas, bas,
-                                           gtu, bas,  bas,  bas, bas,
-                                             gtu,              gtu,
-                                               gtu,   gtu,   gtu     ]
-        univs['Assembly (3.1%) 15BASW' + comment] = \
-            make_assembly('Assembly (3.1%) 15BASW' + comment, universes)
+        nonfuel = [    bas,   bas,   bas,
+                     gtu,              bas,
+                   gtu, bas,  bas,  bas, bas,
+                   gtu, bas,  cent, bas, bas,
+                   gtu, bas,  bas,  bas, bas,
+                     gtu,              gtu,
+                       gtu,   gtu,   gtu     ]
+        add_assembly('Assembly (3.1%) 15BASW' + comment, '3.1', nonfuel)
 
         # WITH 15 BURNABLE ABSORBERS SE
-        universes = np.empty((17,17), dtype=openmc.Universe)
-        universes[:,:] = pins['Fuel (3.1%) stack']
-        universes[nonfuel_y, nonfuel_x] = [    bas,   bas,   bas,
-                                             bas,              gtu,
-                                           bas, bas,  bas,  bas, gtu,
-                                           bas, bas,  cent, bas, gtu,
-                                           bas, bas,  bas,  bas, gtu,
-                                             gtu,              gtu,
-                                               gtu,   gtu,   gtu     ]
-        univs['Assembly (3.1%) 15BASE' + comment] = \
-            make_assembly('Assembly (3.1%) 15BASE' + comment, universes)
+        nonfuel = [    bas,   bas,   bas,
+                     bas,              gtu,
+                   bas, bas,  bas,  bas, gtu,
+                   bas, bas,  cent, bas, gtu,
+                   bas, bas,  bas,  bas, gtu,
+                     gtu,              gtu,
+                       gtu,   gtu,   gtu     ]
+        add_assembly('Assembly (3.1%) 15BASE' + comment, '3.1', nonfuel)
 
         # WITH 6 BURNABLE ABSORBERS N
-        universes = np.empty((17,17), dtype=openmc.Universe)
-        universes[:,:] = pins['Fuel (3.1%) stack']
-        universes[nonfuel_y, nonfuel_x] = [    gtu,   gtu,   gtu,
-                                             gtu,              gtu,
-                                           gtu, gtu,  gtu,  gtu, gtu,
-                                           gtu, gtu,  cent, gtu, gtu,
-                                           bas, gtu,  gtu,  gtu, bas,
-                                             bas,              bas,
-                                               bas,   gtu,   bas     ]
-        univs['Assembly (3.1%) 6BAN' + comment] = \
-            make_assembly('Assembly (3.1%) 6BAN' + comment, universes)
+        nonfuel = [    gtu,   gtu,   gtu,
+                     gtu,              gtu,
+                   gtu, gtu,  gtu,  gtu, gtu,
+                   gtu, gtu,  cent, gtu, gtu,
+                   bas, gtu,  gtu,  gtu, bas,
+                     bas,              bas,
+                       bas,   gtu,   bas     ]
+        add_assembly('Assembly (3.1%) 6BAN' + comment, '3.1', nonfuel)
 
         # WITH 6 BURNABLE ABSORBERS S
-        universes = np.empty((17,17), dtype=openmc.Universe)
-        universes[:,:] = pins['Fuel (3.1%) stack']
-        universes[nonfuel_y, nonfuel_x] = [    bas,   gtu,   bas,
-                                             bas,              bas,
-                                           bas, gtu,  gtu,  gtu, bas,
-                                           gtu, gtu,  cent, gtu, gtu,
-                                           gtu, gtu,  gtu,  gtu, gtu,
-                                             gtu,              gtu,
-                                               gtu,   gtu,   gtu     ]
-        univs['Assembly (3.1%) 6BAS' + comment] = \
-            make_assembly('Assembly (3.1%) 6BAS' + comment, universes)
+        nonfuel = [    bas,   gtu,   bas,
+                     bas,              bas,
+                   bas, gtu,  gtu,  gtu, bas,
+                   gtu, gtu,  cent, gtu, gtu,
+                   gtu, gtu,  gtu,  gtu, gtu,
+                     gtu,              gtu,
+                       gtu,   gtu,   gtu     ]
+        add_assembly('Assembly (3.1%) 6BAS' + comment, '3.1', nonfuel)
 
         # WITH 6 BURNABLE ABSORBERS W
-        universes = np.empty((17,17), dtype=openmc.Universe)
-        universes[:,:] = pins['Fuel (3.1%) stack']
-        universes[nonfuel_y, nonfuel_x] = [    gtu,   gtu,   bas,
-                                             gtu,              bas,
-                                           gtu, gtu,  gtu,  gtu, bas,
-                                           gtu, gtu,  cent, gtu, gtu,
-                                           gtu, gtu,  gtu,  gtu, bas,
-                                             gtu,              bas,
-                                               gtu,   gtu,   bas     ]
-        univs['Assembly (3.1%) 6BAW' + comment] = \
-            make_assembly('Assembly (3.1%) 6BAW' + comment, universes)
+        nonfuel = [    gtu,   gtu,   bas,
+                     gtu,              bas,
+                   gtu, gtu,  gtu,  gtu, bas,
+                   gtu, gtu,  cent, gtu, gtu,
+                   gtu, gtu,  gtu,  gtu, bas,
+                     gtu,              bas,
+                       gtu,   gtu,   bas     ]
+        add_assembly('Assembly (3.1%) 6BAW' + comment, '3.1', nonfuel)
 
         # WITH 6 BURNABLE ABSORBERS E
-        universes = np.empty((17,17), dtype=openmc.Universe)
-        universes[:,:] = pins['Fuel (3.1%) stack']
-        universes[nonfuel_y, nonfuel_x] = [    bas,   gtu,   gtu,
-                                             bas,              gtu,
-                                           bas, gtu,  gtu,  gtu, gtu,
-                                           gtu, gtu,  cent, gtu, gtu,
-                                           bas, gtu,  gtu,  gtu, gtu,
-                                             bas,              gtu,
-                                               bas,   gtu,   gtu     ]
-        univs['Assembly (3.1%) 6BAE' + comment] = \
-            make_assembly('Assembly (3.1%) 6BAE' + comment, universes)
+        nonfuel = [    bas,   gtu,   gtu,
+                     bas,              gtu,
+                   bas, gtu,  gtu,  gtu, gtu,
+                   gtu, gtu,  cent, gtu, gtu,
+                   bas, gtu,  gtu,  gtu, gtu,
+                     bas,              gtu,
+                       bas,   gtu,   gtu     ]
+        add_assembly('Assembly (3.1%) 6BAE' + comment, '3.1', nonfuel)
 
     return univs
@@ -0,0 +1,383 @@
+"""Content-addressed cache of generated model input files.
+
+Generating the XML input files for the full core takes minutes, but the
+output only depends on the options passed to a build script, the source of
+the smr package and the version of the OpenMC Python API. Files are stored
+under a key computed from a hash of all three so that a repeat build can
+simply link the previously generated files into place.
+
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import openmc
+
+
+_PACKAGE_DIR = Path(__file__).parent
+
+
+def source_digest(*paths):
+    """Compute a hash of the smr package source and any additional files.
+
+    Parameters
+    ----------
+    *paths : str or pathlib.Path
+        Additional files (e.g., the build script itself) to include
+
+    Returns
+    -------
+    str
+        Hexadecimal SHA-256 digest
+
+    """
+    sha = hashlib.sha256()
+    files = sorted(p for p in _PACKAGE_DIR.rglob('*')
+                   if p.is_file() and '__pycache__' not in p.parts)
+    for p in files:
+        sha.update(str(p.relative_to(_PACKAGE_DIR)).encode())
+        sha.update(p.read_bytes())
+    for p in paths:
+        p = Path(p)
+        sha.update(p.name.encode())
+        sha.update(p.read_bytes())
+    return sha.hexdigest()
+
+
+def build_key(options, *paths):
+    """Compute the cache key for a build.
+
+    Parameters
+    ----------
+    options : dict
+        Options that affect the generated files, e.g., parsed command-line
+        arguments
+    *paths : str or pathlib.Path
+        Additional source files that affect the generated files
+
+    Returns
+    -------
+    str
+        Hexadecimal SHA-256 digest identifying the build
+
+    """
+    sha = hashlib.sha256()
+    sha.update(json.dumps(options, sort_keys=True, default=str).encode())
+    sha.update(source_digest(*paths).encode())
+    sha.update(openmc.__version__.encode())
+    return sha.hexdigest()
+
+
+def package_modules():
+    """Return the names of all modules in the smr package.
+
+    Returns
+    -------
+    list of str
+        Module names, e.g., 'materials' for smr.materials
+
+    """
+    return sorted(p.stem for p in _PACKAGE_DIR.glob('*.py'))
+
+
+def input_key(options, modules, *paths):
+    """Compute the key of a single generated file from its inputs.
+
+    Unlike :func:`build_key`, which depends on the entire package, only the
+    given modules of the smr package are hashed so that a file is considered
+    out of date only when something it actually depends on has changed.
+
+    Parameters
+    ----------
+    options : dict
+        Options that affect the file
+    modules : iterable of str
+        Names of the smr modules the file depends on
+    *paths : str or pathlib.Path
+        Additional source files that affect the file
+
+    Returns
+    -------
+    str
+        Hexadecimal SHA-256 digest identifying the inputs of the file
+
+    """
+    sha = hashlib.sha256()
+    sha.update(json.dumps(options, sort_keys=True, default=str).encode())
+    for name in sorted(modules):
+        sha.update(name.encode())
+        sha.update((_PACKAGE_DIR / (name + '.py')).read_bytes())
+    for p in paths:
+        p = Path(p)
+        sha.update(p.name.encode())
+        sha.update(p.read_bytes())
+    sha.update(openmc.__version__.encode())
+    return sha.hexdigest()
+
+
+def _group_by_key(keys):
+    groups = {}
+    for filename, key in sorted(keys.items()):
+        groups.setdefault(key, []).append(filename)
+    return groups
+
+
+class BuildManifest:
+    """Record of the inputs each generated file in a directory was built from.
+
+    Parameters
+    ----------
+    directory : str or pathlib.Path
+        Directory containing generated files
+
+    Attributes
+    ----------
+    keys : dict
+        Dictionary mapping a filename to the key of the inputs it was last
+        generated from
+
+    """
+
+    filename = '.smr-build.json'
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        try:
+            with open(str(self.directory / self.filename)) as fh:
+                self.keys = json.load(fh)
+        except (OSError, ValueError):
+            self.keys = {}
+
+    def stale(self, keys):
+        """Determine which files need to be regenerated.
+
+        Parameters
+        ----------
+        keys : dict
+            Dictionary mapping a filename to the key of its current inputs as
+            returned by :func:`input_key`
+
+        Returns
+        -------
+        set of str
+            Files that are missing or were generated from different inputs
+
+        """
+        return {f for f, key in keys.items()
+                if self.keys.get(f) != key or not (self.directory / f).exists()}
+
+    def update(self, keys):
+        """Record the inputs of newly generated files and save the manifest.
+
+        Parameters
+        ----------
+        keys : dict
+            Dictionary mapping a filename to the key of its inputs
+
+        """
+        self.keys.update(keys)
+        path = self.directory / self.filename
+        tmp = path.with_name(path.name + '.tmp')
+        with open(str(tmp), 'w') as fh:
+            json.dump(self.keys, fh, indent=2, sort_keys=True)
+        os.replace(str(tmp), str(path))
+
+
+class BuildCache:
+    """Directory of previously generated input files indexed by build key.
+
+    Each entry is a directory containing the files from one build. The
+    modification time of an entry records when it was last used so that the
+    least recently used entries can be evicted when the cache grows beyond
+    its size limit.
+
+    Parameters
+    ----------
+    directory : str or pathlib.Path
+        Directory in which cached files are stored
+    max_size : int, optional
+        Maximum total size of the cache in bytes. If not given, the cache is
+        allowed to grow without bound.
+    link : bool
+        Whether to hard link cached files into place rather than copying them.
+        Linked files share storage with the cache and so must not be modified
+        in place.
+
+    """
+
+    def __init__(self, directory, max_size=None, link=True):
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.link = link
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _entry(self, key):
+        return self.directory / key[:2] / key
+
+    def fetch(self, key, directory, filenames):
+        """Place cached files for a build in a directory.
+
+        Parameters
+        ----------
+        key : str
+            Build key as returned by :func:`build_key`
+        directory : str or pathlib.Path
+            Directory in which to place the files
+        filenames : iterable of str
+            Names of the files that make up the build
+
+        Returns
+        -------
+        bool
+            Whether all of the files were found in the cache
+
+        """
+        entry = self._entry(key)
+        filenames = list(filenames)
+        if not all((entry / f).is_file() for f in filenames):
+            return False
+
+        directory = Path(directory)
+        for f in filenames:
+            dst = directory / f
+            if dst.exists() or dst.is_symlink():
+                dst.unlink()
+            if self.link:
+                try:
+                    os.link(str(entry / f), str(dst))
+                    continue
+                except OSError:
+                    pass
+            shutil.copyfile(str(entry / f), str(dst))
+
+        # Mark entry as most recently used
+        os.utime(str(entry))
+        return True
+
+    def store(self, key, directory, filenames):
+        """Add the files from a build to the cache.
+
+        Parameters
+        ----------
+        key : str
+            Build key as returned by :func:`build_key`
+        directory : str or pathlib.Path
+            Directory containing the generated files
+        filenames : iterable of str
+            Names of the files that make up the build
+
+        """
+        entry = self._entry(key)
+        if entry.exists():
+            os.utime(str(entry))
+            return
+        entry.parent.mkdir(exist_ok=True)
+
+        # Copy into a temporary directory first so that a partially written
+        # entry is never visible to other processes
+        tmp = Path(tempfile.mkdtemp(dir=str(self.directory), prefix='.tmp-'))
+        try:
+            for f in filenames:
+                shutil.copyfile(str(Path(directory) / f), str(tmp / f))
+            os.rename(str(tmp), str(entry))
+        except OSError:
+            shutil.rmtree(str(tmp), ignore_errors=True)
+            if not entry.exists():
+                raise
+
+        self.evict(keep=entry)
+
+    def fetch_files(self, keys, directory):
+        """Place individually cached files in a directory.
+
+        Unlike :meth:`fetch`, which requires every file of a build, each file
+        is looked up under the key of its own inputs so that files can be
+        shared between builds with different options, e.g., the variants of a
+        parameter sweep. Files with the same key are fetched together or not
+        at all.
+
+        Parameters
+        ----------
+        keys : dict
+            Dictionary mapping a filename to the key of its inputs as returned
+            by :func:`input_key`
+        directory : str or pathlib.Path
+            Directory in which to place the files
+
+        Returns
+        -------
+        set of str
+            Names of the files that were found in the cache
+
+        """
+        fetched = set()
+        for key, filenames in _group_by_key(keys).items():
+            if self.fetch(key, directory, filenames):
+                fetched.update(filenames)
+        return fetched
+
+    def store_files(self, keys, directory):
+        """Add individual files to the cache under the keys of their inputs.
+
+        Parameters
+        ----------
+        keys : dict
+            Dictionary mapping a filename to the key of its inputs as returned
+            by :func:`input_key`
+        directory : str or pathlib.Path
+            Directory containing the files
+
+        """
+        for key, filenames in _group_by_key(keys).items():
+            self.store(key, directory, filenames)
+
+    def entries(self):
+        """Return the cached entries from least to most recently used.
+
+        Returns
+        -------
+        list of tuple
+            (last use time, size in bytes, path) for each entry
+
+        """
+        entries = []
+        for entry in self.directory.glob('??/*'):
+            if entry.is_dir():
+                size = sum(p.stat().st_size for p in entry.iterdir())
+                entries.append((entry.stat().st_mtime, size, entry))
+        entries.sort()
+        return entries
+
+    def evict(self, keep=None):
+        """Remove least recently used entries until the size limit is met.
+
+        Parameters
+        ----------
+        keep : pathlib.Path, optional
+            Entry that should not be removed, e.g., one that was just stored
+
+        Returns
+        -------
+        int
+            Number of entries removed
+
+        """
+        if self.max_size is None:
+            return 0
+
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, entry in entries:
+            if total <= self.max_size:
+                break
+            if entry == keep:
+                continue
+            shutil.rmtree(str(entry), ignore_errors=True)
+            total -= size
+            removed += 1
+        return removed
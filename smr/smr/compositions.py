@@ -0,0 +1,343 @@
+"""Store the compositions of differentiated materials as one array.
+
+Each differentiated fuel material would otherwise be an openmc.Material
+carrying its own list of (for depleted fuel, several hundred) nuclides. Here
+the atom densities of all of them are kept in a single float64 array indexed
+by material and nuclide, with one list of nuclides shared by every material.
+The array may be memory-mapped from a file in the NumPy binary format, so
+that it need not fit in memory and can be reopened without parsing. Rows can
+be ordered so that the materials of each group (e.g., each assembly) are
+contiguous, making the compositions of a group a view of the array rather
+than a copy. XML and HDF5 representations are only generated when written.
+
+"""
+
+import json
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+from openmc.clean_xml import clean_indentation
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+from .export import _ID_MARKER, _VOLUME_MARKER
+
+
+class Compositions:
+    """Atom densities of many materials over a shared list of nuclides.
+
+    Parameters
+    ----------
+    nuclides : iterable of str
+        Names of the nuclides in every material
+    num_materials : int
+        Number of materials
+    path : str or pathlib.Path, optional
+        File in which to store the densities as a memory-mapped array. The
+        material IDs, volumes and groups are stored alongside it in a JSON
+        file of the same name with a ``.json`` suffix when :meth:`flush` is
+        called. If not given, the densities are held in memory.
+
+    Attributes
+    ----------
+    nuclides : list of str
+        Names of the nuclides, indexing the columns of :attr:`densities`
+    index : dict
+        Dictionary mapping the name of each nuclide to its column
+    densities : numpy.ndarray
+        Atom density of each nuclide in atom/b-cm, indexed by material and
+        nuclide
+    ids : numpy.ndarray
+        ID of each material
+    volumes : numpy.ndarray
+        Volume of each material in cm^3, or NaN if unknown
+    templates : list of openmc.Material
+        Materials the rows were created from, which give the name,
+        temperature and depletability of each material
+    template : numpy.ndarray
+        Index in :attr:`templates` of the template of each material
+    groups : collections.OrderedDict
+        Dictionary mapping the name of a group of materials to the slice of
+        rows they occupy
+    path : pathlib.Path or None
+        File the densities are memory-mapped from
+
+    """
+
+    def __init__(self, nuclides, num_materials, path=None):
+        self.nuclides = list(nuclides)
+        self.index = {nuc: i for i, nuc in enumerate(self.nuclides)}
+        shape = (int(num_materials), len(self.nuclides))
+        if path is None:
+            self.path = None
+            self.densities = np.zeros(shape)
+        else:
+            self.path = Path(path)
+            self.densities = np.lib.format.open_memmap(
+                str(self.path), 'w+', np.float64, shape)
+        self.ids = np.zeros(num_materials, dtype=np.int64)
+        self.volumes = np.full(num_materials, np.nan)
+        self.templates = []
+        self.template = np.zeros(num_materials, dtype=np.int32)
+        self.groups = OrderedDict()
+
+    def __len__(self):
+        return len(self.densities)
+
+    def __getitem__(self, group):
+        """Return the densities of the materials in a group as a view."""
+        return self.densities[self.groups[group]]
+
+    @classmethod
+    def from_distribmats(cls, distribmats, volumes=None, groups=None,
+                         path=None):
+        """Create the compositions of the instances of differentiated cells.
+
+        Every instance of a cell starts with the composition of the material
+        filling it. Materials given by elements are expanded into nuclides.
+
+        Parameters
+        ----------
+        distribmats : dict
+            Dictionary as returned by :func:`smr.export.distribmat_ids`
+        volumes : dict, optional
+            Dictionary mapping a differentiated openmc.Cell to the volume of
+            each of its instances in cm^3, given either as a single value or as
+            a sequence with one value per instance
+        groups : dict, optional
+            Dictionary mapping a differentiated openmc.Cell to the name of the
+            group of each of its instances. Rows are ordered by group, so each
+            group occupies a contiguous slice.
+        path : str or pathlib.Path, optional
+            File in which to store the densities as a memory-mapped array
+
+        Returns
+        -------
+        Compositions
+            Compositions of all instances
+
+        """
+        if volumes is None:
+            volumes = {}
+
+        # Union of the nuclides of every template, in order of appearance
+        templates = OrderedDict()
+        nuclides = OrderedDict()
+        for mat, _ in distribmats.values():
+            if mat not in templates:
+                templates[mat] = mat.get_nuclide_atom_densities()
+                nuclides.update((nuc, None) for nuc in templates[mat])
+
+        cells = list(distribmats)
+        counts = [len(distribmats[cell][1]) for cell in cells]
+        offsets = np.concatenate(([0], np.cumsum(counts))).astype(int)
+
+        # Position of each instance once rows are ordered by group
+        if groups is not None:
+            labels = np.concatenate([
+                np.asarray(groups[cell]) for cell in cells])
+            names, inverse = np.unique(labels, return_inverse=True)
+            order = np.argsort(inverse.ravel(), kind='stable')
+            rows = np.empty_like(order)
+            rows[order] = np.arange(len(order))
+            bounds = np.searchsorted(inverse.ravel()[order],
+                                     np.arange(len(names) + 1))
+        else:
+            rows = np.arange(offsets[-1])
+
+        comp = cls(nuclides, offsets[-1], path)
+        comp.templates = list(templates)
+        template_index = {mat: i for i, mat in enumerate(comp.templates)}
+        for i, cell in enumerate(cells):
+            mat, ids = distribmats[cell]
+            r = rows[offsets[i]:offsets[i + 1]]
+            vector = np.zeros(len(comp.nuclides))
+            for nuc, (_, density) in templates[mat].items():
+                vector[comp.index[nuc]] = density
+            comp.densities[r] = vector
+            comp.ids[r] = np.asarray(ids)
+            comp.template[r] = template_index[mat]
+            if cell in volumes:
+                comp.volumes[r] = volumes[cell]
+
+        if groups is not None:
+            for j, name in enumerate(names.tolist()):
+                comp.groups[name] = slice(int(bounds[j]), int(bounds[j + 1]))
+        return comp
+
+    def set_densities(self, nuclides, values, rows=slice(None)):
+        """Set the densities of some nuclides in some materials.
+
+        Parameters
+        ----------
+        nuclides : iterable of str
+            Names of the nuclides
+        values : numpy.ndarray
+            Atom densities in atom/b-cm, broadcast to the shape (number of
+            materials in ``rows``, number of nuclides)
+        rows : slice, numpy.ndarray or list, optional
+            Materials to update, given either as an index of the rows of
+            :attr:`densities` or as the name of a group
+
+        """
+        if not isinstance(rows, (slice, np.ndarray, list)):
+            rows = self.groups[rows]
+        columns = [self.index[nuc] for nuc in nuclides]
+        if isinstance(rows, slice):
+            self.densities[rows, columns] = values
+        else:
+            # Assign through the rows one column at a time, since indexing
+            # both axes with arrays would pair the rows with the columns
+            values = np.broadcast_to(values, (len(rows), len(columns)))
+            for j, column in enumerate(columns):
+                self.densities[rows, column] = values[:, j]
+
+    def flush(self):
+        """Write memory-mapped densities and the shared index to disk."""
+        if self.path is None:
+            return
+        self.densities.flush()
+        index = OrderedDict([
+            ('nuclides', self.nuclides),
+            ('ids', self.ids.tolist()),
+            ('volumes', [None if np.isnan(v) else v
+                         for v in self.volumes.tolist()]),
+            ('templates', [mat.name for mat in self.templates]),
+            ('template', self.template.tolist()),
+            ('groups', OrderedDict(
+                (str(name), [s.start, s.stop])
+                for name, s in self.groups.items()))
+        ])
+        with open(str(self.path.with_suffix('.json')), 'w') as fh:
+            json.dump(index, fh)
+
+    @classmethod
+    def open(cls, path, mode='r'):
+        """Open compositions stored with :meth:`flush`.
+
+        Templates are not stored, so only their names are available (as
+        :attr:`templates`), and compositions opened this way cannot be written
+        to XML. Group names are read back as strings.
+
+        Parameters
+        ----------
+        path : str or pathlib.Path
+            File of the memory-mapped densities
+        mode : {'r', 'r+', 'c'}
+            Mode in which to memory-map the densities (see :func:`numpy.load`)
+
+        Returns
+        -------
+        Compositions
+            Stored compositions
+
+        """
+        path = Path(path)
+        with open(str(path.with_suffix('.json'))) as fh:
+            index = json.load(fh, object_pairs_hook=OrderedDict)
+
+        comp = cls.__new__(cls)
+        comp.path = path
+        comp.nuclides = index['nuclides']
+        comp.index = {nuc: i for i, nuc in enumerate(comp.nuclides)}
+        comp.densities = np.load(str(path), mmap_mode=mode)
+        comp.ids = np.array(index['ids'], dtype=np.int64)
+        comp.volumes = np.array([np.nan if v is None else v
+                                 for v in index['volumes']])
+        comp.templates = index['templates']
+        comp.template = np.array(index['template'], dtype=np.int32)
+        comp.groups = OrderedDict((name, slice(*bounds))
+                                  for name, bounds in index['groups'].items())
+        return comp
+
+    def export_hdf5(self, path, chunk_rows=4096):
+        """Write the compositions to an HDF5 file.
+
+        The densities are copied in blocks of rows so that memory-mapped
+        densities are never read into memory all at once.
+
+        Parameters
+        ----------
+        path : str or pathlib.Path
+            Path of the HDF5 file to write
+        chunk_rows : int
+            Number of rows in each chunk of the densities dataset
+
+        """
+        if h5py is None:
+            raise ImportError('h5py is required to write compositions to '
+                              'HDF5.')
+        chunks = (min(chunk_rows, max(len(self), 1)), len(self.nuclides))
+        with h5py.File(str(path), 'w') as f:
+            f.create_dataset('nuclides', data=np.array(
+                self.nuclides, dtype='S'))
+            f.create_dataset('ids', data=self.ids)
+            f.create_dataset('volumes', data=self.volumes)
+            f.create_dataset('template', data=self.template)
+            names = [getattr(m, 'name', m) for m in self.templates]
+            f.create_dataset('templates', data=np.array(names, dtype='S'))
+            dset = f.create_dataset('densities', self.densities.shape,
+                                    np.float64, chunks=chunks)
+            for start in range(0, len(self), chunks[0]):
+                stop = start + chunks[0]
+                dset[start:stop] = self.densities[start:stop]
+            groups = f.create_group('groups')
+            for name, s in self.groups.items():
+                groups.attrs[str(name)] = (s.start, s.stop)
+
+    def _xml_templates(self, volume):
+        """Render the start of a material element for each template."""
+        rendered = []
+        for mat in self.templates:
+            element = mat.to_xml_element()
+            for child in list(element):
+                if child.tag in ('density', 'nuclide', 'element'):
+                    element.remove(child)
+            element.set('id', _ID_MARKER)
+            if volume:
+                element.set('volume', _VOLUME_MARKER)
+            elif 'volume' in element.attrib:
+                del element.attrib['volume']
+            ET.SubElement(element, 'density', units='sum')
+            clean_indentation(element, level=1)
+            element.tail = None
+
+            text = ET.tostring(element, encoding='unicode')
+            text = text[:text.rindex('</material>')].rstrip(' ')
+            text = text.replace('{', '{{').replace('}', '}}')
+            text = text.replace(_ID_MARKER, '{id}')
+            text = text.replace(_VOLUME_MARKER, '{volume}')
+            rendered.append('  ' + text)
+        return rendered
+
+    def write_xml(self, fh):
+        """Write a material element for each material to an open file.
+
+        Only the nuclides with a nonzero density in the current row of
+        :attr:`densities` are written for each material, so a material does
+        not list the nuclides of templates other than its own. The densities
+        are read one row at a time.
+
+        Parameters
+        ----------
+        fh : file-like object
+            Text file positioned inside the ``<materials>`` element
+
+        """
+        headers = {False: self._xml_templates(False),
+                   True: self._xml_templates(True)}
+        lines = ['    <nuclide ao="{{}}" name="{}" />\n'.format(nuc)
+                 for nuc in self.nuclides]
+        for i in range(len(self)):
+            volume = float(self.volumes[i])
+            header = headers[not np.isnan(volume)][self.template[i]]
+            fh.write(header.format(id=self.ids[i], volume=volume))
+            row = self.densities[i]
+            for j in np.flatnonzero(row).tolist():
+                fh.write(lines[j].format(float(row[j])))
+            fh.write('  </material>\n')
@@ -0,0 +1,188 @@
+"""Positions of the control rod banks.
+
+The bottom and top of the control rods in each bank are bounded by a pair of
+z-planes (see :mod:`smr.surfaces`), which are the only surfaces that depend on
+the position of the bank. Rather than rebuilding the geometry for every
+position, the coefficients of these planes can be rewritten in memory before
+the geometry is exported, or directly in an existing geometry.xml file. The
+latter only works if the planes were kept apart from coincident surfaces when
+the geometry was simplified, i.e., if they were passed as ``exclude`` to the
+functions in :mod:`smr.simplify`.
+
+"""
+
+import os
+import re
+
+import numpy as np
+
+from .surfaces import bank_bot, step0H, step102H, step248H, step_width
+
+
+banks = ('A', 'B', 'C', 'D', 'SA', 'SB', 'SC', 'SD', 'SE')
+
+# Number of steps at which the control banks are fully withdrawn. Above step
+# 102, each step raises the rods by step_width, and the planes of the control
+# banks in smr.surfaces are placed at this position.
+aro_step = 102 + int(round((bank_bot - step102H)/step_width))
+
+# Height of the bottom of the rods at tabulated steps for the control banks
+# and for the shutdown banks, which smr.surfaces places at step248H when fully
+# withdrawn. Heights in between are interpolated linearly.
+_STEP_HEIGHTS = {
+    'control': ([0., 102., aro_step], [step0H, step102H, bank_bot]),
+    'shutdown': ([0., aro_step], [step0H, step248H])
+}
+
+
+def bank_surfaces(surfs, names=banks):
+    """Return the planes bounding the control rods of each bank.
+
+    Parameters
+    ----------
+    surfs : dict
+        Dictionary mapping a short name to each openmc.Surface, as returned by
+        :func:`smr.surfaces.make_surfaces`
+    names : iterable of str
+        Names of the banks
+
+    Returns
+    -------
+    list of openmc.ZPlane
+        Bottom and top plane of each bank
+
+    """
+    return [surfs['bank{} {}'.format(b, side)]
+            for b in names for side in ('bot', 'top')]
+
+
+def bank_bottom(step, bank='A'):
+    """Return the height of the bottom of the control rods in a bank.
+
+    Parameters
+    ----------
+    step : float
+        Number of steps the bank is withdrawn, from 0 (fully inserted, resting
+        on the dashpot) to :data:`aro_step` (all rods out, where the planes
+        of the bank are placed by :func:`smr.surfaces.make_surfaces`)
+    bank : str
+        Name of the bank
+
+    Returns
+    -------
+    float
+        Height of the bottom of the control rods in cm
+
+    """
+    _check_banks([bank])
+    if not 0 <= step <= aro_step:
+        raise ValueError('Control rod step {} is outside [0, {}].'.format(
+            step, aro_step))
+    steps, heights = _STEP_HEIGHTS[
+        'shutdown' if bank.startswith('S') else 'control']
+    return float(np.interp(step, steps, heights))
+
+
+def _check_banks(steps):
+    unknown = set(steps) - set(banks)
+    if unknown:
+        raise ValueError('Unknown control rod bank(s): {}'.format(
+            ', '.join(sorted(unknown))))
+
+
+def set_bank_positions(surfs, steps):
+    """Move control rod banks by changing the planes that bound them.
+
+    The length of the control rods, i.e., the distance between the bottom and
+    top plane of a bank, is preserved.
+
+    Parameters
+    ----------
+    surfs : dict
+        Dictionary mapping a short name to each openmc.Surface, as returned by
+        :func:`smr.surfaces.make_surfaces`
+    steps : dict
+        Dictionary mapping the name of a bank to the number of steps it is
+        withdrawn. Banks not given are left where they are.
+
+    """
+    _check_banks(steps)
+    for b, step in steps.items():
+        bottom = surfs['bank{} bot'.format(b)]
+        top = surfs['bank{} top'.format(b)]
+        length = top.z0 - bottom.z0
+        bottom.z0 = bank_bottom(step, b)
+        top.z0 = bottom.z0 + length
+
+
+_SURFACE = re.compile(r'<surface\b[^>]*\bname="CR bank (\w+) (bottom|top)"')
+_COEFFS = re.compile(r'\bcoeffs="([^"]*)"')
+
+
+def patch_geometry(path, steps, output=None):
+    """Move control rod banks in an existing geometry.xml file.
+
+    Only the ``coeffs`` attribute of the planes bounding each bank that is
+    moved is rewritten; every other line of the file is copied unchanged, so
+    the IDs of all surfaces, cells and universes stay the same. The file is
+    streamed line by line rather than parsed as a whole.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        Path of the geometry.xml file to read
+    steps : dict
+        Dictionary mapping the name of a bank to the number of steps it is
+        withdrawn. Banks not given are left where they are.
+    output : str or pathlib.Path, optional
+        Path of the geometry.xml file to write. Defaults to overwriting
+        ``path``.
+
+    Returns
+    -------
+    dict
+        Dictionary mapping the name of each bank moved to the heights of the
+        bottom and top of its control rods
+
+    """
+    _check_banks(steps)
+    path = str(path)
+    output = path if output is None else str(output)
+
+    # Find the current position of the planes of each bank
+    planes = {}
+    with open(path, encoding='utf-8') as fh:
+        for line in fh:
+            match = _SURFACE.search(line)
+            if match is not None and match.group(1) in steps:
+                key = match.groups()
+                if key in planes:
+                    raise ValueError('More than one surface is named "CR bank '
+                                     '{} {}" in {}.'.format(*key, path))
+                planes[key] = float(_COEFFS.search(line).group(1))
+
+    heights = {}
+    for b, step in steps.items():
+        if (b, 'bottom') not in planes or (b, 'top') not in planes:
+            raise ValueError(
+                'The planes bounding control rod bank {} are not in {}. '
+                'Either the bank is not used in the model or its planes were '
+                'merged with coincident surfaces when the geometry was '
+                'simplified.'.format(b, path))
+        bottom = bank_bottom(step, b)
+        length = planes[b, 'top'] - planes[b, 'bottom']
+        heights[b] = (bottom, bottom + length)
+
+    # Rewrite the coefficients of the planes that move
+    tmp = output + '.tmp'
+    with open(path, encoding='utf-8') as fin, \
+         open(tmp, 'w', encoding='utf-8') as fout:
+        for line in fin:
+            match = _SURFACE.search(line)
+            if match is not None and match.group(1) in heights:
+                z0 = heights[match.group(1)][match.group(2) == 'top']
+                line = _COEFFS.sub('coeffs="{}"'.format(z0), line, count=1)
+            fout.write(line)
+    os.replace(tmp, output)
+
+    return heights
@@ -4,13 +4,15 @@ import numpy as np
 
 import openmc
 
-from .materials import mats
-from .surfaces import surfs, lattice_pitch
+from .materials import default_materials
+from .surfaces import default_surfaces, lattice_pitch
 from .reflector import reflector_universes
 from .assemblies import assembly_universes
+from .profiling import phase
 
 
-def core_geometry(num_rings, num_axial, depleted):
+def core_geometry(num_rings, num_axial, depleted, axial_lattice=False,
+                  tree_stacks=False, mats=None, surfs=None):
     """Generate full core SMR geometry.
 
     Parameters
@@ -21,6 +23,18 @@ def core_geometry(num_rings, num_axial, depleted):
         Number of axial subdivisions in fuel
     depleted : bool
         Whether fuel should contain nuclides as though it were depleted
+    axial_lattice : bool
+        Whether to subdivide the fuel axially with a lattice (see
+        :func:`smr.pins.pin_universes`)
+    tree_stacks : bool
+        Whether to build axial stacks as balanced binary trees of nested
+        universes (see :func:`smr.pins.make_stack`)
+    mats : dict, optional
+        Materials of the model. Defaults to
+        :func:`smr.materials.default_materials`.
+    surfs : dict, optional
+        Surfaces of the model. Defaults to
+        :func:`smr.surfaces.default_surfaces`.
 
     Returns
     -------
@@ -28,8 +42,16 @@ def core_geometry(num_rings, num_axial, depleted):
         SMR full core geometry
 
     """
-    assembly = assembly_universes(num_rings, num_axial, depleted)
-    reflector = reflector_universes()
+    if mats is None:
+        mats = default_materials()
+    if surfs is None:
+        surfs = default_surfaces()
+
+    with phase('assembly_universes'):
+        assembly = assembly_universes(num_rings, num_axial, depleted,
+                                      axial_lattice, tree_stacks, mats, surfs)
+    with phase('reflector_universes'):
+        reflector = reflector_universes(mats)
 
     # Construct main core lattice
     core = openmc.RectLattice(name='Main core')
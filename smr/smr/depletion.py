@@ -0,0 +1,645 @@
+"""Deplete the compositions of many materials at once.
+
+The burnup matrix of every material depleted with the same chain has the
+same sparsity pattern; only the reaction rates, which multiply fixed
+transmutation coefficients, differ between materials. :class:`Chain` builds
+the pattern and coefficients once, so that the burnup matrices of a batch of
+materials are formed with a single sparse matrix product. Compositions are
+then advanced over a time step with the order 16 Chebyshev rational
+approximation method (CRAM), solving all materials in a batch together.
+Batches are distributed over a pool of worker processes by :func:`deplete`.
+
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from math import log
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+
+from .profiling import phase
+
+
+# Simplified chain shipped with the package for testing without transport
+simple_chain = Path(__file__).parent / 'data' / 'chain_simple.xml'
+
+# Chains with at most this many nuclides are solved as batches of dense
+# matrices; larger chains are solved one sparse matrix at a time
+dense_limit = 256
+
+# Coefficients of the incomplete partial fraction form of CRAM of order 16
+# from M. Pusa, "Higher-Order Chebyshev Rational Approximation Method and
+# Application to Burnup Equations," Nucl. Sci. Eng., 182, 297-318 (2016)
+_CRAM16_ALPHA = np.array([
+    +5.464930576870210e+3 - 3.797983575308356e+4j,
+    +9.045112476907548e+1 - 1.115537522430261e+3j,
+    +2.344818070467641e+2 - 4.228020157070496e+2j,
+    +9.453304067358312e+1 - 2.951294291446048e+2j,
+    +7.283792954673409e+2 - 1.205646080220011e+5j,
+    +3.648229059594851e+1 - 1.155509621409682e+2j,
+    +2.547321630156819e+1 - 2.639500283021502e+1j,
+    +2.394538338734709e+1 - 5.650522971778156e+0j])
+_CRAM16_THETA = np.array([
+    +3.509103608414918 + 8.436198985884374j,
+    +5.948152268951177 + 3.587457362018322j,
+    -5.264971343442647 + 16.22022147316793j,
+    +1.419375897185666 + 10.92536348449672j,
+    +6.416177699099435 + 1.194122393370139j,
+    +4.993174737717997 + 5.996881713603942j,
+    -1.413928462488886 + 13.49772569889275j,
+    -10.84391707869699 + 19.27744616718165j])
+_CRAM16_ALPHA0 = 2.124853710495224e-16
+
+# Time step being solved by worker processes, inherited when the pool is
+# forked
+_STEP = {}
+
+
+class Chain:
+    """Depletion chain and the structure of its burnup matrix.
+
+    The burnup matrix of a material is the sum of a decay matrix and, for
+    each reaction in the chain, the rate of the reaction (per atom of its
+    parent) times a matrix of transmutation coefficients. Each coefficient
+    matrix removes the parent and adds its targets (or fission products)
+    with their branching ratios (or yields).
+
+    Parameters
+    ----------
+    nuclides : list of str
+        Names of the nuclides in the chain
+    decays : list of tuple
+        Decay constant in 1/s of each radioactive nuclide, given as tuples of
+        the name of the parent, its decay constant and a list of (target,
+        branching ratio) pairs
+    reactions : list of tuple
+        Reactions whose rates are given for each material, as tuples of the
+        name of the parent, the reaction type and a list of (target, branching
+        ratio or fission yield) pairs
+
+    Attributes
+    ----------
+    nuclides : list of str
+        Names of the nuclides in the chain, indexing the compositions of
+        materials
+    index : dict
+        Dictionary mapping the name of each nuclide to its index
+    reactions : list of tuple
+        (parent, reaction type) of each reaction, indexing the reaction rates
+        of materials
+    indptr : numpy.ndarray
+        Index pointers of the compressed sparse row pattern shared by the
+        burnup matrices of all materials
+    indices : numpy.ndarray
+        Column indices of the sparse pattern
+
+    """
+
+    def __init__(self, nuclides, decays, reactions):
+        self.nuclides = list(nuclides)
+        self.index = {name: i for i, name in enumerate(self.nuclides)}
+        self.reactions = [(parent, rx) for parent, rx, _ in reactions]
+
+        # Entries of the decay matrix and of each coefficient matrix, as
+        # (channel, row, column, value) with channel -1 for decay
+        entries = []
+
+        def add(channel, parent, rate, targets):
+            i = self.index[parent]
+            entries.append((channel, i, i, -rate))
+            for target, fraction in targets:
+                if target in self.index:
+                    entries.append((channel, self.index[target], i,
+                                    rate*fraction))
+
+        for parent, rate, targets in decays:
+            add(-1, parent, rate, targets)
+        for channel, (parent, _, targets) in enumerate(reactions):
+            add(channel, parent, 1., targets)
+
+        channels, rows, cols, values = (np.array(x) for x in zip(*entries))
+        n = len(self.nuclides)
+
+        # Union of the nonzeros of all matrices (including the whole
+        # diagonal), with each entry numbered by its position in the pattern
+        diag = np.arange(n)
+        pattern = sp.csr_matrix(
+            (np.ones(len(rows) + n), (np.r_[rows, diag], np.r_[cols, diag])),
+            shape=(n, n))
+        pattern.sum_duplicates()
+        pattern.sort_indices()
+        self.indptr = pattern.indptr
+        self.indices = pattern.indices
+        pattern.data = np.arange(pattern.nnz, dtype=float)
+        position = np.asarray(pattern[rows, cols]).ravel().astype(int)
+
+        decay = channels < 0
+        self._decay_data = np.zeros(pattern.nnz)
+        np.add.at(self._decay_data, position[decay], values[decay])
+        self._reaction_data = sp.csr_matrix(
+            (values[~decay], (channels[~decay], position[~decay])),
+            shape=(len(self.reactions), pattern.nnz))
+
+    def __len__(self):
+        return len(self.nuclides)
+
+    @property
+    def nnz(self):
+        return len(self.indices)
+
+    @classmethod
+    def from_xml(cls, path=simple_chain, energy=0.0253):
+        """Read a depletion chain in the OpenMC XML format.
+
+        Parameters
+        ----------
+        path : str or pathlib.Path
+            Path of the chain file. Defaults to the simplified chain shipped
+            with this package.
+        energy : float
+            Incident neutron energy in eV; the fission yields tabulated
+            closest to it are used
+
+        Returns
+        -------
+        Chain
+            Depletion chain
+
+        """
+        root = ET.parse(str(path)).getroot()
+        elements = {elem.get('name'): elem for elem in root.iter('nuclide')}
+        nuclides = []
+        decays = []
+        reactions = []
+        for elem in root.iter('nuclide'):
+            name = elem.get('name')
+            nuclides.append(name)
+
+            if elem.get('half_life') is not None:
+                targets = [(d.get('target'), float(d.get('branching_ratio')))
+                           for d in elem.iter('decay')]
+                decays.append((name, log(2.)/float(elem.get('half_life')),
+                               targets))
+
+            for rx in elem.iter('reaction'):
+                kind = rx.get('type')
+                if kind == 'fission':
+                    targets = _fission_yields(elem, energy, elements)
+                elif rx.get('target') is not None:
+                    targets = [(rx.get('target'),
+                                float(rx.get('branching_ratio', 1.)))]
+                else:
+                    targets = []
+                reactions.append((name, kind, targets))
+
+        return cls(nuclides, decays, reactions)
+
+    def burnup_data(self, rates):
+        """Form the burnup matrices of a batch of materials.
+
+        Parameters
+        ----------
+        rates : numpy.ndarray
+            Rate of each reaction in :attr:`reactions` per atom of its parent
+            in 1/s, indexed by material and reaction
+
+        Returns
+        -------
+        numpy.ndarray
+            Nonzero values of the burnup matrix of each material in the sparse
+            pattern given by :attr:`indptr` and :attr:`indices`, indexed by
+            material and nonzero
+
+        """
+        rates = np.atleast_2d(rates)
+        return self._decay_data + self._reaction_data.T.dot(rates.T).T
+
+    def burnup_matrix(self, rates):
+        """Return the burnup matrix of one material.
+
+        Parameters
+        ----------
+        rates : numpy.ndarray
+            Rate of each reaction in :attr:`reactions` per atom of its parent
+            in 1/s
+
+        Returns
+        -------
+        scipy.sparse.csr_matrix
+            Burnup matrix in 1/s
+
+        """
+        data = self.burnup_data(rates)[0]
+        return sp.csr_matrix((data, self.indices, self.indptr),
+                             shape=(len(self), len(self)))
+
+
+def _fission_yields(elem, energy, elements):
+    """Return the fission products and yields tabulated nearest an energy."""
+    # Yields may be shared with another nuclide
+    yields = elem.find('neutron_fission_yields')
+    if yields is not None and yields.get('parent') is not None:
+        elem = elements[yields.get('parent')]
+
+    tables = list(elem.iter('fission_yields'))
+    if not tables:
+        raise ValueError('No fission yields are given for {}.'.format(
+            elem.get('name')))
+    table = min(tables, key=lambda t: abs(float(t.get('energy')) - energy))
+    products = table.find('products').text.split()
+    data = [float(x) for x in table.find('data').text.split()]
+    return list(zip(products, data))
+
+
+def cram(chain, data, n0, dt):
+    """Advance the compositions of a batch of materials over a time step.
+
+    The matrix exponential is approximated with CRAM of order 16 in
+    incomplete partial fraction form. For chains of at most
+    :data:`dense_limit` nuclides, each of the eight linear systems is solved
+    for all materials at once as a stack of dense matrices; larger chains are
+    solved with a sparse LU factorization for each material.
+
+    Parameters
+    ----------
+    chain : Chain
+        Depletion chain
+    data : numpy.ndarray
+        Nonzero values of the burnup matrix of each material in 1/s, as
+        returned by :meth:`Chain.burnup_data`
+    n0 : numpy.ndarray
+        Number of atoms (or atom density) of each nuclide at the beginning
+        of the step, indexed by material and nuclide
+    dt : float
+        Time step in s
+
+    Returns
+    -------
+    numpy.ndarray
+        Number of atoms (or atom density) of each nuclide at the end of the
+        step, indexed by material and nuclide
+
+    """
+    n = len(chain)
+    y = np.array(n0, dtype=float, ndmin=2)
+    if n <= dense_limit:
+        rows = np.repeat(np.arange(n), np.diff(chain.indptr))
+        diag = np.arange(n)
+        A = np.zeros((len(y), n, n), dtype=complex)
+        A[:, rows, chain.indices] = data*dt
+        A_diag = A[:, diag, diag]
+        for alpha, theta in zip(_CRAM16_ALPHA, _CRAM16_THETA):
+            A[:, diag, diag] = A_diag - theta
+            x = np.linalg.solve(A, y[..., np.newaxis])[..., 0]
+            y += 2*(alpha*x).real
+    else:
+        identity = sp.identity(n, format='csc')
+        for k in range(len(y)):
+            A = sp.csr_matrix((data[k]*dt, chain.indices, chain.indptr),
+                              shape=(n, n)).tocsc()
+            for alpha, theta in zip(_CRAM16_ALPHA, _CRAM16_THETA):
+                x = splu(A - theta*identity).solve(y[k].astype(complex))
+                y[k] += 2*(alpha*x).real
+    return y*_CRAM16_ALPHA0
+
+
+def _solve_batch(start, stop):
+    """Deplete one batch of the materials of the step being solved."""
+    chain = _STEP['chain']
+    data = chain.burnup_data(_STEP['rates'][start:stop])
+    return cram(chain, data, _STEP['n0'][start:stop], _STEP['dt'])
+
+
+def deplete(chain, n0, rates, dt, jobs=1, batch_size=None, out=None):
+    """Advance the compositions of any number of materials over a time step.
+
+    Materials are solved in batches, each of which forms its burnup matrices
+    and solves them at once with :func:`cram`. Worker processes are forked
+    after the compositions and rates are set aside so that they are inherited
+    by each worker rather than pickled and sent to it; only the bounds of each
+    batch are passed to the pool, and only its result is returned.
+
+    Parameters
+    ----------
+    chain : Chain
+        Depletion chain
+    n0 : numpy.ndarray
+        Number of atoms (or atom density) of each nuclide in
+        :attr:`Chain.nuclides` at the beginning of the step, indexed by
+        material and nuclide
+    rates : numpy.ndarray
+        Rate of each reaction in :attr:`Chain.reactions` per atom of its
+        parent in 1/s, indexed by material and reaction
+    dt : float
+        Time step in s
+    jobs : int
+        Number of worker processes. If 1, or if processes cannot be forked on
+        this platform, batches are solved serially.
+    batch_size : int, optional
+        Number of materials solved together. Defaults to a size that keeps
+        the dense matrices of a batch to about 64 MB.
+    out : numpy.ndarray, optional
+        Array in which to store the compositions at the end of the step, e.g.,
+        a memory-mapped array. May be ``n0`` itself.
+
+    Returns
+    -------
+    numpy.ndarray
+        Number of atoms (or atom density) of each nuclide at the end of the
+        step, indexed by material and nuclide
+
+    """
+    n0 = np.asarray(n0)
+    rates = np.asarray(rates)
+    if n0.shape[1] != len(chain) or rates.shape[1] != len(chain.reactions):
+        raise ValueError(
+            'Compositions must be given for {} nuclides and rates for {} '
+            'reactions.'.format(len(chain), len(chain.reactions)))
+    if len(n0) != len(rates):
+        raise ValueError('Compositions are given for {} materials but rates '
+                         'for {}.'.format(len(n0), len(rates)))
+    if out is None:
+        out = np.empty(n0.shape)
+    if batch_size is None:
+        batch_size = max(1, 2**26 // (16*len(chain)**2))
+    bounds = [(i, min(i + batch_size, len(n0)))
+              for i in range(0, len(n0), batch_size)]
+
+    _STEP.update(chain=chain, n0=n0, rates=rates, dt=dt)
+    try:
+        with phase('deplete'):
+            if jobs <= 1 or len(bounds) <= 1 or \
+                    'fork' not in multiprocessing.get_all_start_methods():
+                for start, stop in bounds:
+                    out[start:stop] = _solve_batch(start, stop)
+            else:
+                context = multiprocessing.get_context('fork')
+                with ProcessPoolExecutor(min(jobs, len(bounds)),
+                                         context) as pool:
+                    futures = OrderedDict(
+                        ((start, stop), pool.submit(_solve_batch, start, stop))
+                        for start, stop in bounds)
+                    for (start, stop), future in futures.items():
+                        out[start:stop] = future.result()
+    finally:
+        _STEP.clear()
+    return out
+
+
+def run_fingerprint(n0, timesteps):
+    """Compute a hash identifying the initial state and time steps of a run.
+
+    Parameters
+    ----------
+    n0 : numpy.ndarray
+        Compositions at the beginning of the first step, indexed by material
+        and nuclide
+    timesteps : iterable of float
+        Length of each step in s
+
+    Returns
+    -------
+    str
+        Hexadecimal SHA-256 digest
+
+    """
+    sha = hashlib.sha256()
+    sha.update(np.asarray(list(timesteps), dtype=np.float64).tobytes())
+    n0 = np.asarray(n0)
+    sha.update(str(n0.shape).encode())
+    # Hash a block of rows at a time so a memory-mapped array is not copied
+    for start in range(0, len(n0), 65536):
+        block = np.ascontiguousarray(n0[start:start + 65536], np.float64)
+        sha.update(block.tobytes())
+    return sha.hexdigest()
+
+
+def save_checkpoint(directory, step, time, compositions, keff, rates, chain,
+                    fingerprint=None):
+    """Write the state of a depletion calculation at the beginning of a step.
+
+    The checkpoint is written to a temporary directory that is renamed into
+    place once it is complete, so a checkpoint that exists is never partial.
+    Arrays are stored in the NumPy binary format so that they can be loaded
+    (or memory-mapped) without parsing.
+
+    Parameters
+    ----------
+    directory : pathlib.Path
+        Directory containing the checkpoint of each step
+    step : int
+        Index of the step
+    time : float
+        Time at the beginning of the step in s
+    compositions : numpy.ndarray
+        Number of atoms (or atom density) of each nuclide, indexed by material
+        and nuclide
+    keff : list of float
+        Multiplication factor from each transport solve in the step
+    rates : numpy.ndarray
+        Reaction rates from each transport solve in the step, indexed by
+        solve, material and reaction
+    chain : Chain
+        Depletion chain
+    fingerprint : str, optional
+        Fingerprint of the run, as returned by :func:`run_fingerprint`
+
+    Returns
+    -------
+    pathlib.Path
+        Directory of the checkpoint
+
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / 'step{:04d}'.format(step)
+    tmp = Path(tempfile.mkdtemp(dir=str(directory), prefix='.tmp-'))
+    try:
+        np.save(str(tmp / 'compositions.npy'), compositions)
+        np.save(str(tmp / 'rates.npy'), rates)
+        with open(str(tmp / 'step.json'), 'w') as fh:
+            json.dump(OrderedDict([
+                ('step', step),
+                ('time', time),
+                ('keff', [float(k) for k in keff]),
+                ('nuclides', chain.nuclides),
+                ('reactions', chain.reactions),
+                ('fingerprint', fingerprint)
+            ]), fh, indent=2)
+        if path.exists():
+            shutil.rmtree(str(path))
+        os.rename(str(tmp), str(path))
+    except BaseException:
+        shutil.rmtree(str(tmp), ignore_errors=True)
+        raise
+    return path
+
+
+def load_checkpoint(path, chain=None, fingerprint=None, mmap_mode='r'):
+    """Read a checkpoint written by :func:`save_checkpoint`.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        Directory of the checkpoint
+    chain : Chain, optional
+        Depletion chain the checkpoint must have been written with
+    fingerprint : str, optional
+        Fingerprint of the run the checkpoint must belong to, as returned by
+        :func:`run_fingerprint`
+    mmap_mode : {None, 'r', 'r+', 'c'}
+        Mode in which the arrays are memory-mapped (see :func:`numpy.load`)
+
+    Returns
+    -------
+    dict
+        Step index, time, multiplication factors, compositions and reaction
+        rates of the checkpoint
+
+    """
+    with open(str(path / 'step.json')) as fh:
+        state = json.load(fh)
+    if chain is not None and (
+            state['nuclides'] != chain.nuclides or
+            [tuple(rx) for rx in state['reactions']] != chain.reactions):
+        raise ValueError('Checkpoint {} was written with a different '
+                         'depletion chain.'.format(path))
+    if fingerprint is not None and state.get('fingerprint') != fingerprint:
+        raise ValueError('Checkpoint {} belongs to a run with different '
+                         'initial compositions or time steps.'.format(path))
+    state['compositions'] = np.load(str(path / 'compositions.npy'), mmap_mode)
+    state['rates'] = np.load(str(path / 'rates.npy'), mmap_mode)
+    return state
+
+
+def _checkpoints(directory):
+    return sorted(Path(directory).glob('step[0-9][0-9][0-9][0-9]'))
+
+
+def latest_checkpoint(directory):
+    """Return the directory of the checkpoint of the latest step, if any."""
+    paths = _checkpoints(directory)
+    return paths[-1] if paths else None
+
+
+def remove_checkpoints(directory):
+    """Remove the checkpoints of every step in a directory."""
+    for path in _checkpoints(directory):
+        shutil.rmtree(str(path))
+
+
+def integrate(transport, chain, n0, timesteps, directory, jobs=1,
+              restart=True, callback=None):
+    """Deplete materials over a sequence of steps with checkpoints.
+
+    Each step uses the CE/CM predictor-corrector scheme: the reaction rates
+    from a transport solve at the beginning of the step are used to deplete
+    to its midpoint, and the rates from a transport solve at the midpoint are
+    used to deplete over the whole step. A final transport solve is made at
+    the end of the last step.
+
+    Once both transport solves of a step are done, its compositions, reaction
+    rates and multiplication factors are written to a checkpoint (see
+    :func:`save_checkpoint`). When restarting, the latest checkpoint is
+    loaded and the calculation continues from it: earlier steps are not
+    repeated, and the step of the checkpoint itself only needs to be
+    depleted again from the saved rates, without any transport. Checkpoints
+    record a fingerprint of the initial compositions and time steps (see
+    :func:`run_fingerprint`), and one from a different run is rejected.
+
+    Parameters
+    ----------
+    transport : callable
+        Function taking the compositions of all materials (indexed by
+        material and nuclide) and returning the multiplication factor and the
+        reaction rates per atom in 1/s (indexed by material and reaction in
+        :attr:`Chain.reactions`)
+    chain : Chain
+        Depletion chain
+    n0 : numpy.ndarray
+        Number of atoms (or atom density) of each nuclide at the beginning of
+        the first step, indexed by material and nuclide
+    timesteps : iterable of float
+        Length of each step in s
+    directory : pathlib.Path
+        Directory in which checkpoints are written
+    jobs : int
+        Number of processes used to deplete materials
+    restart : bool
+        Whether to continue from the latest checkpoint in ``directory``. If
+        False, existing checkpoints are removed before the first step.
+    callback : callable, optional
+        Function called at the end of the transport solves of each step with
+        the index of the step, its time in s, and the list of multiplication
+        factors of its transport solves. For the step restarted from a
+        checkpoint, the factors saved in the checkpoint are passed.
+
+    Returns
+    -------
+    numpy.ndarray
+        Compositions at the end of the last step
+
+    """
+    directory = Path(directory)
+    timesteps = list(timesteps)
+    times = np.r_[0., np.cumsum(timesteps)]
+
+    first = 0
+    n = np.asarray(n0)
+    fingerprint = run_fingerprint(n, timesteps)
+    if not restart:
+        remove_checkpoints(directory)
+    checkpoint = latest_checkpoint(directory)
+    if checkpoint is not None:
+        state = load_checkpoint(checkpoint, chain, fingerprint)
+        first = state['step']
+        if first > len(timesteps) or \
+                not np.isclose(state['time'], times[first]):
+            raise ValueError(
+                'Checkpoint {} at {} s does not match the time steps being '
+                'run.'.format(checkpoint, state['time']))
+        if len(state['compositions']) != len(n):
+            raise ValueError(
+                'Checkpoint {} has {} materials rather than {}.'.format(
+                    checkpoint, len(state['compositions']), len(n)))
+        n = state['compositions']
+
+    for i in range(first, len(timesteps) + 1):
+        with phase('step{}'.format(i)):
+            if checkpoint is not None and i == first:
+                keff = state['keff']
+                rates = state['rates']
+            else:
+                with phase('transport'):
+                    k, rates_bos = transport(n)
+                keff = [k]
+                rates = [rates_bos]
+                if i < len(timesteps):
+                    with phase('predictor'):
+                        n_mid = deplete(chain, n, rates_bos, timesteps[i]/2,
+                                        jobs)
+                    with phase('transport_midpoint'):
+                        k, rates_mid = transport(n_mid)
+                    keff.append(k)
+                    rates.append(rates_mid)
+                    del n_mid
+                rates = np.array(rates)
+                with phase('checkpoint'):
+                    save_checkpoint(directory, i, times[i], n, keff, rates,
+                                    chain, fingerprint)
+            if callback is not None:
+                callback(i, times[i], keff)
+
+            if i < len(timesteps):
+                with phase('corrector'):
+                    n = deplete(chain, n, rates[-1], timesteps[i], jobs)
+    return np.asarray(n)
@@ -0,0 +1,309 @@
+"""Write OpenMC XML input files for very large models."""
+
+import multiprocessing
+import os
+import re
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from numbers import Real
+
+from openmc.clean_xml import clean_indentation
+
+from .profiling import get_profiler, phase
+from .traversal import traverse
+
+
+_ID_MARKER = '\0id\0'
+_VOLUME_MARKER = '\0volume\0'
+
+# Writers to be run by worker processes, inherited when the pool is forked
+_WRITERS = {}
+
+
+def distribmat_ids(geometry, fuel_mats, start_id=None):
+    """Reserve a block of material IDs for each cell that will be differentiated.
+
+    Rather than cloning a material for every instance of a cell, each cell
+    filled with one of the given materials is assigned a contiguous range of
+    material IDs, one per instance. The cells themselves are left untouched.
+    Cell instances must already have been counted.
+
+    Parameters
+    ----------
+    geometry : openmc.Geometry
+        Geometry containing the cells to differentiate
+    fuel_mats : iterable of openmc.Material
+        Materials whose cells should be differentiated
+    start_id : int, optional
+        First material ID to assign. Defaults to one more than the largest ID
+        of any material in the geometry.
+
+    Returns
+    -------
+    dict
+        Dictionary mapping each differentiated openmc.Cell to a tuple of the
+        material it is filled with and the range of material IDs assigned to
+        its instances
+
+    """
+    fuel_mats = set(fuel_mats)
+    traversal = traverse(geometry)
+    if start_id is None:
+        start_id = max(traversal.get_all_materials()) + 1
+
+    distribmats = {}
+    for cell in traversal.get_all_material_cells().values():
+        if cell.fill in fuel_mats:
+            ids = range(start_id, start_id + cell.num_instances)
+            distribmats[cell] = (cell.fill, ids)
+            start_id = ids.stop
+    return distribmats
+
+
+def _material_template(material, volume=False):
+    """Render a material as a format string with placeholders for id/volume."""
+    element = material.to_xml_element()
+    element.set('id', _ID_MARKER)
+    if volume:
+        element.set('volume', _VOLUME_MARKER)
+    clean_indentation(element, level=1)
+    element.tail = None
+
+    text = ET.tostring(element, encoding='unicode')
+    text = text.replace('{', '{{').replace('}', '}}')
+    text = text.replace(_ID_MARKER, '{id}').replace(_VOLUME_MARKER, '{volume}')
+    return '  ' + text + '\n'
+
+
+def export_materials(path, materials, distribmats=None, volumes=None,
+                     compositions=None):
+    """Write a materials.xml file one material at a time.
+
+    Materials are serialized and written to the file individually so that the
+    full XML tree is never held in memory. Differentiated materials given by
+    `distribmats` are never instantiated as openmc.Material objects; instead,
+    the composition of the material they are derived from is rendered once
+    and each instance is written from that template with only its ID (and
+    optionally volume) changed.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        Path of the materials.xml file to write
+    materials : iterable of openmc.Material
+        Materials to write as-is. Materials that fill a differentiated cell
+        are skipped since they are replaced by their instances.
+    distribmats : dict, optional
+        Dictionary as returned by :func:`distribmat_ids`
+    volumes : dict, optional
+        Dictionary mapping a differentiated openmc.Cell to the volume of each
+        of its instances in cm^3, given either as a single value or as a
+        sequence with one value per instance
+    compositions : smr.compositions.Compositions, optional
+        Compositions of the instances of the differentiated cells. If given,
+        each instance is written with its own composition from the array
+        rather than from the composition of the material it is derived from,
+        and `distribmats` and `volumes` are only used to skip the materials
+        it replaces.
+
+    """
+    if distribmats is None:
+        distribmats = {}
+    if volumes is None:
+        volumes = {}
+    templates = {mat for mat, _ in distribmats.values()}
+    if compositions is not None:
+        templates.update(compositions.templates)
+        distribmats = {}
+
+    with open(str(path), 'w', encoding='utf-8') as fh:
+        fh.write("<?xml version='1.0' encoding='utf-8'?>\n")
+        fh.write('<materials>\n')
+
+        for mat in materials:
+            if mat in templates:
+                continue
+            element = mat.to_xml_element()
+            clean_indentation(element, level=1)
+            element.tail = None
+            fh.write('  ' + ET.tostring(element, encoding='unicode') + '\n')
+
+        for cell, (mat, ids) in distribmats.items():
+            volume = volumes.get(cell)
+            template = _material_template(mat, volume is not None)
+            if volume is None or isinstance(volume, Real):
+                for uid in ids:
+                    fh.write(template.format(id=uid, volume=volume))
+            else:
+                for uid, vol in zip(ids, volume):
+                    fh.write(template.format(id=uid, volume=vol))
+
+        if compositions is not None:
+            compositions.write_xml(fh)
+
+        fh.write('</materials>\n')
+
+
+_MATERIAL = re.compile(r'<material\b[^>]*\bname="([^"]*)"')
+_ATTRIBUTE = r'\b{}="([^"]*)"'
+
+
+def patch_materials(path, materials, output=None):
+    """Replace the compositions of some materials in an existing materials.xml.
+
+    Each given material replaces every material of the same name in the file.
+    The ID and volume of each replaced entry are kept, so the file stays
+    consistent with the geometry.xml and tallies.xml it was written with.
+    All other entries are copied line by line without being parsed.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        Path of the materials.xml file to read
+    materials : iterable of openmc.Material
+        Materials to replace, identified by their names
+    output : str or pathlib.Path, optional
+        Path of the materials.xml file to write. Defaults to overwriting
+        ``path``.
+
+    Returns
+    -------
+    int
+        Number of entries replaced
+
+    """
+    materials = {mat.name: mat for mat in materials}
+    templates = {}
+    path = str(path)
+    output = path if output is None else str(output)
+
+    replaced = set()
+    count = 0
+    tmp = output + '.tmp'
+    with open(path, encoding='utf-8') as fin, \
+         open(tmp, 'w', encoding='utf-8') as fout:
+        lines = iter(fin)
+        for line in lines:
+            match = _MATERIAL.search(line)
+            if match is None or match.group(1) not in materials:
+                fout.write(line)
+                continue
+
+            # Skip the rest of the entry being replaced
+            name = match.group(1)
+            start = line
+            if not line.rstrip().endswith('/>') and '</material>' not in line:
+                for line in lines:
+                    if '</material>' in line:
+                        break
+
+            uid = re.search(_ATTRIBUTE.format('id'), start).group(1)
+            volume = re.search(_ATTRIBUTE.format('volume'), start)
+            has_volume = volume is not None
+            if (name, has_volume) not in templates:
+                templates[name, has_volume] = _material_template(
+                    materials[name], has_volume)
+            fout.write(templates[name, has_volume].format(
+                id=uid, volume=volume.group(1) if has_volume else None))
+            replaced.add(name)
+            count += 1
+
+    missing = set(materials) - replaced
+    if missing:
+        os.remove(tmp)
+        raise ValueError('No material named {} in {}.'.format(
+            ', '.join('"{}"'.format(n) for n in sorted(missing)), path))
+    os.replace(tmp, output)
+    return count
+
+
+def export_geometry(geometry, path, distribmats=None):
+    """Write a geometry.xml file for a geometry with reserved distribmat IDs.
+
+    The geometry is exported normally and the ``material`` attribute of each
+    differentiated cell is then rewritten, line by line, to list the IDs
+    reserved for its instances. The rewritten file is streamed to a temporary
+    file that replaces the exported one.
+
+    Parameters
+    ----------
+    geometry : openmc.Geometry
+        Geometry to export
+    path : str or pathlib.Path
+        Path of the geometry.xml file to write
+    distribmats : dict, optional
+        Dictionary as returned by :func:`distribmat_ids`
+
+    """
+    path = str(path)
+    geometry.export_to_xml(path)
+    if not distribmats:
+        return
+
+    fills = {str(cell.id): ' '.join(map(str, ids))
+             for cell, (_, ids) in distribmats.items()}
+    cell_id = re.compile(r'<cell\b[^>]*\bid="(\d+)"')
+    material = re.compile(r'\bmaterial="[^"]*"')
+
+    tmp = path + '.tmp'
+    with open(path, encoding='utf-8') as fin, \
+         open(tmp, 'w', encoding='utf-8') as fout:
+        for line in fin:
+            match = cell_id.search(line)
+            if match is not None and match.group(1) in fills:
+                fill = 'material="{}"'.format(fills[match.group(1)])
+                line = material.sub(fill, line, count=1)
+            fout.write(line)
+    os.replace(tmp, path)
+
+
+def _run_writer(name):
+    with phase(name):
+        _WRITERS[name]()
+
+    # Send the measurements of the writer back to the parent process
+    profiler = get_profiler()
+    if profiler is not None:
+        path, record = next(reversed(profiler.phases.items()))
+        return path, record, profiler.counts
+
+
+def export_parallel(writers, jobs=1):
+    """Write independent input files concurrently in a process pool.
+
+    Worker processes are forked after the writers have been registered so
+    that the objects being exported (most importantly, the geometry) are
+    inherited by each worker rather than pickled and sent to it. Only the
+    name of each writer is passed to the pool. Each writer produces exactly
+    the same file it would if it were run serially.
+
+    Parameters
+    ----------
+    writers : dict
+        Dictionary mapping a name (e.g., the filename) to a callable taking no
+        arguments that writes the file
+    jobs : int
+        Number of worker processes. If 1, or if processes cannot be forked on
+        this platform, the writers are run serially.
+
+    """
+    if jobs <= 1 or len(writers) <= 1 or \
+            'fork' not in multiprocessing.get_all_start_methods():
+        for name, write in writers.items():
+            with phase(name):
+                write()
+        return
+
+    _WRITERS.update(writers)
+    try:
+        context = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(min(jobs, len(writers)), context) as pool:
+            futures = [pool.submit(_run_writer, name) for name in writers]
+            for future in futures:
+                result = future.result()
+                if result is not None:
+                    path, record, counts = result
+                    get_profiler().phases[path] = record
+                    get_profiler().counts.update(counts)
+    finally:
+        _WRITERS.clear()
@@ -0,0 +1,150 @@
+"""Index the cells and materials of a built geometry for fast lookups.
+
+Queries such as "which cells are filled with fuel" are otherwise answered by
+traversing the entire geometry and comparing every cell against a list of
+materials. The index is built in a single pass over the universes of the
+geometry, after which each query is a dictionary lookup.
+
+"""
+
+import re
+from collections import defaultdict
+
+import openmc
+
+from .traversal import traverse
+
+
+# Role of each non-fuel material in the model, by material name
+_ROLES = {
+    'Borated Water': 'coolant',
+    'Helium': 'gas',
+    'Air': 'gas',
+    'Zircaloy-4': 'cladding',
+    'M5': 'cladding',
+    'Inconel': 'structural',
+    'SS302': 'structural',
+    'SS304': 'structural',
+    'Carbon Steel': 'structural',
+    'Ag-In-Cd': 'absorber',
+    'Borosilicate Glass': 'absorber',
+}
+
+_FUEL_NAME = re.compile(r'^([\d.]+%) Enr\. UO2 Fuel')
+_GRID_NAME = re.compile(r'grid \((bottom|intermediate)\)')
+
+
+def material_role(material):
+    """Determine the role a material plays in the model from its name.
+
+    Parameters
+    ----------
+    material : openmc.Material
+        Material to classify
+
+    Returns
+    -------
+    str
+        One of 'fuel', 'coolant', 'gas', 'cladding', 'structural', 'absorber'
+        or 'other'
+
+    """
+    if _FUEL_NAME.match(material.name):
+        return 'fuel'
+    return _ROLES.get(material.name, 'other')
+
+
+class ModelIndex:
+    """Index of the cells and materials in a geometry.
+
+    Parameters
+    ----------
+    geometry : openmc.Geometry
+        Geometry to index
+
+    Attributes
+    ----------
+    cells_by_fill : dict
+        Dictionary mapping a material, universe or lattice to the list of
+        cells that it fills. Each material of a differentiated cell maps to
+        that cell.
+    materials_by_role : dict
+        Dictionary mapping a role (see :func:`material_role`) to the list of
+        materials with that role
+    fuel_cells : dict
+        Dictionary mapping a tuple of the enrichment (e.g., '3.1%') and grid
+        type ('bottom', 'intermediate' or None) to the cells filled with fuel
+        of that enrichment. The grid type is taken from the name of the cell
+        or, failing that, the universe containing it.
+
+    """
+
+    def __init__(self, geometry):
+        self.cells_by_fill = defaultdict(list)
+        self.materials_by_role = defaultdict(list)
+        self.fuel_cells = defaultdict(list)
+        self._fuel = set()
+
+        seen = set()
+        graph = traverse(geometry).graph
+        for cell, univ in sorted(graph.owner.items(), key=lambda x: x[0].id):
+            fill = cell.fill
+            fills = fill if isinstance(fill, list) else [fill]
+            for f in fills:
+                if f is None:
+                    continue
+                self.cells_by_fill[f].append(cell)
+                if isinstance(f, openmc.Material) and f not in seen:
+                    seen.add(f)
+                    self.materials_by_role[material_role(f)].append(f)
+
+            mat = fills[0]
+            if isinstance(mat, openmc.Material):
+                match = _FUEL_NAME.match(mat.name)
+                if match is not None:
+                    grid = (_GRID_NAME.search(cell.name) or
+                            _GRID_NAME.search(univ.name))
+                    key = (match.group(1), grid.group(1) if grid else None)
+                    self.fuel_cells[key].append(cell)
+                    self._fuel.add(cell)
+
+        for mats in self.materials_by_role.values():
+            mats.sort(key=lambda m: m.id)
+
+    def is_fuel(self, cell):
+        """Return whether a cell is filled with fuel."""
+        return cell in self._fuel
+
+    def get_fuel_cells(self, enrichment='any', grid='any'):
+        """Return cells filled with fuel.
+
+        Parameters
+        ----------
+        enrichment : str
+            Enrichment of the fuel, e.g., '3.1%', or 'any'
+        grid : str or None
+            Type of spacer grid around the fuel ('bottom', 'intermediate' or
+            None for no grid), or 'any'
+
+        Returns
+        -------
+        list of openmc.Cell
+            Cells filled with the requested fuel, sorted by ID
+
+        """
+        if enrichment != 'any' and grid != 'any':
+            return list(self.fuel_cells.get((enrichment, grid), []))
+
+        cells = [c for (enr, g), cells in self.fuel_cells.items()
+                 if enrichment in ('any', enr) and grid in ('any', g)
+                 for c in cells]
+        cells.sort(key=lambda c: c.id)
+        return cells
+
+    def get_cells_by_fill(self, fill):
+        """Return the cells filled by a material, universe or lattice."""
+        return list(self.cells_by_fill.get(fill, []))
+
+    def get_materials(self, role):
+        """Return the materials with a given role, sorted by ID."""
+        return list(self.materials_by_role.get(role, []))
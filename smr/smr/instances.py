@@ -0,0 +1,59 @@
+"""Count cell and material instances directly from the universe graph.
+
+OpenMC's Geometry.determine_paths() enumerates every path from the root
+universe down to each cell, which for the full core means walking every pin
+of every assembly and every fuel region within each pin. The number of
+instances of a cell only depends on how many times the universe containing it
+is used, so it can be computed by visiting each universe, cell and lattice
+once and memoizing the multiplicity of each universe (see
+:class:`smr.traversal.UniverseGraph`).
+
+"""
+
+from collections import defaultdict
+
+import openmc
+
+from .traversal import traverse
+
+
+def count_instances(geometry):
+    """Count the number of instances of each cell and material.
+
+    This is a drop-in replacement for
+    ``geometry.determine_paths(instances_only=True)`` that sets the same
+    ``num_instances`` attribute on each openmc.Cell and openmc.Material but
+    whose cost scales with the number of universes and lattice positions
+    rather than the number of paths through the geometry.
+
+    Parameters
+    ----------
+    geometry : openmc.Geometry
+        Geometry whose cells and materials should be counted
+
+    Returns
+    -------
+    UniverseGraph
+        Graph of the geometry with memoized instance counts
+
+    """
+    graph = traverse(geometry).graph
+
+    materials = defaultdict(int)
+    for cell in graph.owner:
+        n = graph.instances(cell)
+        cell._num_instances = n
+
+        fill = cell.fill
+        if isinstance(fill, openmc.Material):
+            materials[fill] += n
+        elif isinstance(fill, list) and fill:
+            # Each differentiated material fills one instance
+            for mat in fill:
+                if mat is not None:
+                    materials[mat] += n // len(fill)
+
+    for mat, n in materials.items():
+        mat._num_instances = n
+
+    return graph
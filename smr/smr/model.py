@@ -0,0 +1,200 @@
+"""Builder for variants of the SMR model.
+
+Each :class:`SMRModel` creates its own materials and surfaces rather than
+sharing those of :mod:`smr.materials` and :mod:`smr.surfaces`, so variants of
+the model with different parameters (e.g., boron concentrations) can be built
+one after another in the same process or in separate worker processes.
+
+"""
+
+import warnings
+
+import openmc
+from openmc.mixin import IDWarning
+
+from . import core_average_temperature, system_pressure
+from .assemblies import assembly_universes
+from .core import core_geometry
+from .materials import boron_ppm, make_materials
+from .plots import assembly_plots, core_plots
+from .surfaces import make_surfaces, lattice_pitch
+from .traversal import invalidate, traverse
+
+
+def renumber(geometry):
+    """Number the objects of a geometry consecutively from one.
+
+    Materials, surfaces, cells and universes (with lattices, which share
+    their IDs) are each numbered in the order they were created. Only the
+    objects of the geometry are changed; the counters OpenMC uses to assign
+    IDs to new objects are not, so objects created afterwards (e.g., clones
+    of materials when differentiating them, or tallies) still get IDs that
+    depend on everything created before them in the process. The cached
+    traversal of the geometry, which is keyed by ID, is discarded.
+
+    Parameters
+    ----------
+    geometry : openmc.Geometry
+        Geometry to renumber
+
+    Returns
+    -------
+    openmc.Geometry
+        The same geometry
+
+    """
+    traversal = traverse(geometry)
+    cells = list(traversal.get_all_cells().values())
+    surfaces = {}
+    for cell in cells:
+        if cell.region is not None:
+            surfaces.update(cell.region.get_surfaces())
+    groups = [
+        list(traversal.get_all_materials().values()),
+        list(surfaces.values()),
+        cells,
+        traversal.graph.universes + list(traversal.graph.lattice_cells)
+    ]
+
+    # IDs given here may also be used by objects of other models
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', IDWarning)
+        for objects in groups:
+            for i, obj in enumerate(sorted(objects, key=lambda o: o.id)):
+                obj.id = i + 1
+    invalidate(geometry)
+    return geometry
+
+
+class SMRModel:
+    """SMR model owning its materials and surfaces.
+
+    OpenMC assigns IDs to materials, surfaces, cells and universes from
+    counters shared by the whole process, so objects of models that are alive
+    at the same time never share an ID. Geometries built by a model are
+    renumbered from one (see :func:`renumber`), so the IDs of the objects in
+    a geometry do not depend on what was built before it. Objects created
+    after the geometry is built, such as differentiated materials and
+    tallies, are still numbered by OpenMC's counters.
+
+    Parameters
+    ----------
+    num_rings : int
+        Number of annual regions in fuel
+    num_axial : int
+        Number of axial subdivisions in fuel
+    depleted : bool
+        Whether fuel should contain nuclides as though it were depleted
+    axial_lattice : bool
+        Whether to subdivide the fuel axially with a lattice (see
+        :func:`smr.pins.pin_universes`)
+    tree_stacks : bool
+        Whether to build axial stacks as balanced binary trees of nested
+        universes (see :func:`smr.pins.make_stack`)
+    boron_ppm : float
+        Concentration of boron in the coolant in ppm by weight
+    temperature : float
+        Coolant temperature in K used to determine the density of water
+    pressure : float
+        System pressure in MPa used to determine the density of water
+
+    Attributes
+    ----------
+    mats : dict
+        Dictionary mapping a short name to each openmc.Material of the model
+    surfs : dict
+        Dictionary mapping a short name to each openmc.Surface of the model
+
+    """
+
+    def __init__(self, num_rings=10, num_axial=196, depleted=False,
+                 axial_lattice=False, tree_stacks=False, boron_ppm=boron_ppm,
+                 temperature=core_average_temperature,
+                 pressure=system_pressure):
+        self.num_rings = num_rings
+        self.num_axial = num_axial
+        self.depleted = depleted
+        self.axial_lattice = axial_lattice
+        self.tree_stacks = tree_stacks
+        self.boron_ppm = boron_ppm
+        self.temperature = temperature
+        self.pressure = pressure
+
+        self.mats = make_materials(boron_ppm, temperature, pressure)
+        self.surfs = make_surfaces()
+        self._assemblies = None
+
+    @property
+    def assemblies(self):
+        """Assembly universes of the model, built when first requested"""
+        if self._assemblies is None:
+            self._assemblies = assembly_universes(
+                self.num_rings, self.num_axial, self.depleted,
+                self.axial_lattice, self.tree_stacks, self.mats, self.surfs)
+        return self._assemblies
+
+    def core_geometry(self):
+        """Build the full core geometry.
+
+        Returns
+        -------
+        openmc.Geometry
+            SMR full core geometry
+
+        """
+        return renumber(core_geometry(
+            self.num_rings, self.num_axial, self.depleted, self.axial_lattice,
+            self.tree_stacks, self.mats, self.surfs))
+
+    def assembly_geometry(self, name='Assembly (3.1%) 16BA'):
+        """Build the geometry of a single assembly with reflective sides.
+
+        Parameters
+        ----------
+        name : str
+            Name of the assembly universe (see
+            :func:`smr.assemblies.assembly_universes`)
+
+        Returns
+        -------
+        openmc.Geometry
+            Single assembly geometry
+
+        """
+        lattice_sides = openmc.model.get_rectangular_prism(
+            lattice_pitch, lattice_pitch, boundary_type='reflective')
+        main_cell = openmc.Cell(
+            fill=self.assemblies[name],
+            region=(lattice_sides & +self.surfs['lower bound'] &
+                    -self.surfs['upper bound'])
+        )
+        root_univ = openmc.Universe(cells=[main_cell])
+        return renumber(openmc.Geometry(root_univ))
+
+    def core_plots(self):
+        """Create plots of the full core.
+
+        Returns
+        -------
+        openmc.Plots
+            Radial and axial slices of the core
+
+        """
+        return core_plots(self.mats)
+
+    def assembly_plots(self, universe):
+        """Create plots of a single assembly.
+
+        Parameters
+        ----------
+        universe : openmc.Universe
+            Universe containing the assembly, whose fuel materials are each
+            given their own color
+
+        Returns
+        -------
+        openmc.Plots
+            Plots of a fuel pin and the assembly
+
+        """
+        return assembly_plots(universe, self.mats)
@@ -1,16 +1,18 @@
 """Instantiate pin cell Cells and Universes for core model."""
 
-from math import sqrt
-
+from functools import partial
 import numpy as np
 import openmc
 from openmc.model import subdivide
 
-from .materials import mats
-from .surfaces import surfs, pellet_OR, bottom_fuel_stack, top_active_core
+from .materials import default_materials
+from .registry import LazyUniverses
+from .surfaces import (default_surfaces, pin_pitch, bottom_fuel_stack,
+                       top_active_core)
+from .volumes import fuel_axial_planes, fuel_ring_radii
 
 
-def make_pin(name, surfaces, materials, grid=None):
+def make_pin(name, surfaces, materials, grid=None, mats=None, surfs=None):
     """Construct a pin cell Universes with radially layered Cells.
 
     Parameters
@@ -26,6 +28,12 @@ def make_pin(name, surfaces, materials, grid=None):
     grid: str, optional
         The type of grid spacer to wrap around the pin cell universe.
         Accepted types include 'bottom' and 'intermediate'.
+    mats: dict, optional
+        Materials of the model, used for the grid spacer. Defaults to
+        :func:`smr.materials.default_materials`.
+    surfs: dict, optional
+        Surfaces of the model, used for the grid spacer. Defaults to
+        :func:`smr.surfaces.default_surfaces`.
 
     Returns
     -------
@@ -55,6 +63,11 @@ def make_pin(name, surfaces, materials, grid=None):
 
     # Add spacer grid cells if specified
     if grid:
+        if mats is None:
+            mats = default_materials()
+        if surfs is None:
+            surfs = default_surfaces()
+
         cell.region &= surfs['rod grid box']
 
         cell_name = name + ' (grid)'
@@ -70,7 +83,31 @@ def make_pin(name, surfaces, materials, grid=None):
     return universe
 
 
-def make_stack(name, surfaces, universes):
+def _add_stack_tree(universe, name, surfaces, universes, lo, hi,
+                    cell_name='{} ({})'):
+    """Add cells for axial segments lo, ..., hi - 1 of a stack to a universe.
+
+    The segments are split in half at a z-plane. Each half that contains more
+    than one segment is filled with a universe that splits it again, so that
+    the segment containing a point is found after testing O(log N) surfaces.
+
+    """
+    mid = (lo + hi) // 2
+    halves = [(lo, mid, -surfaces[mid - 1]), (mid, hi, +surfaces[mid - 1])]
+    for start, stop, region in halves:
+        if stop - start == 1:
+            cell = openmc.Cell(name=cell_name.format(name, start),
+                               fill=universes[start], region=region)
+        else:
+            sub_name = '{} [{}:{}]'.format(name, start, stop)
+            fill = openmc.Universe(name=sub_name)
+            _add_stack_tree(fill, name, surfaces, universes, start, stop,
+                            cell_name)
+            cell = openmc.Cell(name=sub_name, fill=fill, region=region)
+        universe.add_cell(cell)
+
+
+def make_stack(name, surfaces, universes, tree=False):
     """Construct a Universe of axially stacked pin cell Universes.
 
     Parameters
@@ -83,6 +120,11 @@ def make_stack(name, surfaces, universes):
     universes: Iterable of openmc.Universe
         The Universes used within each axial layer. This collection
         must be one unit longer than the collection of surfaces.
+    tree: bool, optional
+        Whether to arrange the axial layers as a balanced binary tree of
+        nested universes split at the axial surfaces rather than as one cell
+        per layer. The geometry is the same either way, but a point is
+        located after checking O(log N) rather than O(N) surfaces.
 
     Returns
     -------
@@ -92,6 +134,11 @@ def make_stack(name, surfaces, universes):
 
     universe = openmc.Universe(name=name)
 
+    if tree and len(surfaces) > 0:
+        _add_stack_tree(universe, name, list(surfaces), list(universes),
+                        0, len(surfaces) + 1)
+        return universe
+
     # Create cells for each axial segment
     for i, (univ, region) in enumerate(zip(universes, subdivide(surfaces))):
         cell_name = '{} ({})'.format(name, i)
@@ -101,7 +148,8 @@ def make_stack(name, surfaces, universes):
     return universe
 
 
-def make_pin_stack(name, zsurfaces, universes, boundary, fuel_fill):
+def make_pin_stack(name, zsurfaces, universes, boundary, fuel_fill,
+                   tree=False):
     """Construct a Universe of axially stacked universes with a single inner fuel
     pin universe.
 
@@ -118,8 +166,11 @@ def make_pin_stack(name, zsurfaces, universes, boundary, fuel_fill):
     boundary : openmc.Surface
         Boundary between the fuel pin itself and everything outside (gap, clad,
         moderator)
-    fuel_fill : openmc.Universe or openmc.Material
-        Universe or material for (possibly subdivided) fuel
+    fuel_fill : openmc.Universe, openmc.Lattice, or openmc.Material
+        Universe, lattice or material for (possibly subdivided) fuel
+    tree : bool, optional
+        Whether to arrange the axial layers outside the fuel as a balanced
+        binary tree of nested universes (see :func:`make_stack`)
 
     Returns
     -------
@@ -130,10 +181,18 @@ def make_pin_stack(name, zsurfaces, universes, boundary, fuel_fill):
 
     universe = openmc.Universe(name=name)
 
-    for i, (univ, r) in enumerate(zip(universes, subdivide(zsurfaces))):
-        cell_name = '{} (o{})'.format(name, i)
-        cell = openmc.Cell(name=cell_name, fill=univ, region=r & +boundary)
+    if tree and len(zsurfaces) > 0:
+        outside = openmc.Universe(name='{} (o)'.format(name))
+        _add_stack_tree(outside, name, list(zsurfaces), list(universes),
+                        0, len(zsurfaces) + 1, cell_name='{} (o{})')
+        cell = openmc.Cell(name='{} (o)'.format(name), fill=outside,
+                           region=+boundary)
         universe.add_cell(cell)
+    else:
+        for i, (univ, r) in enumerate(zip(universes, subdivide(zsurfaces))):
+            cell_name = '{} (o{})'.format(name, i)
+            cell = openmc.Cell(name=cell_name, fill=univ, region=r & +boundary)
+            universe.add_cell(cell)
 
     cell_name = '{} (i)'.format(name)
     cell = openmc.Cell(name=cell_name, fill=fuel_fill, region=-boundary)
@@ -142,7 +201,38 @@ def make_pin_stack(name, zsurfaces, universes, boundary, fuel_fill):
     return universe
 
 
-def pin_universes(num_rings=10, num_axial=196, depleted=False):
+def fuel_lookup_cost(num_rings, num_axial, axial_lattice=False):
+    """Determine the number of cells searched to locate a point in the fuel.
+
+    In a flat universe of subdivided fuel, OpenMC tests each cell in turn
+    until it finds the one containing the point. With an axial lattice, the
+    axial slice is found directly from the lattice indices and only the cells
+    of a single ring universe are searched.
+
+    Parameters
+    ----------
+    num_rings : int
+        Number of annual regions in fuel
+    num_axial : int
+        Number of axial subdivisions in fuel
+    axial_lattice : bool
+        Whether the fuel is subdivided axially with a lattice
+
+    Returns
+    -------
+    int
+        Maximum number of cells tested to find the fuel region containing a
+        point
+
+    """
+    if axial_lattice:
+        return num_rings
+    return num_rings*num_axial
+
+
+def pin_universes(num_rings=10, num_axial=196, depleted=False,
+                  axial_lattice=False, tree_stacks=False, mats=None,
+                  surfs=None):
     """Generate universes for SMR fuel pins.
 
     Parameters
@@ -153,17 +243,36 @@ def pin_universes(num_rings=10, num_axial=196, depleted=False):
         Number of axial subdivisions in fuel
     depleted : bool
         Whether fuel should contain nuclides as though it were depleted
+    axial_lattice : bool
+        Whether to subdivide the fuel axially with a 1x1xN lattice of
+        identical ring universes rather than with one cell per axial and
+        radial region in a single universe (see :func:`fuel_lookup_cost`)
+    tree_stacks : bool
+        Whether to build axial stacks as balanced binary trees of nested
+        universes (see :func:`make_stack`)
+    mats : dict, optional
+        Materials of the model. Defaults to
+        :func:`smr.materials.default_materials`.
+    surfs : dict, optional
+        Surfaces of the model. Defaults to
+        :func:`smr.surfaces.default_surfaces`.
 
     Returns
     -------
-    dict
+    smr.registry.LazyUniverses
         Dictionary mapping a universe name to a openmc.Universe object
 
     """
+    if mats is None:
+        mats = default_materials()
+    if surfs is None:
+        surfs = default_surfaces()
+
     fuel = 'depleted' if depleted else 'fresh'
 
-    # Create dictionary to store pin universes
-    univs = {}
+    # Create dictionary to store pin universes. The control rod bank, burnable
+    # absorber and fuel stacks are only built when first requested.
+    univs = LazyUniverses()
 
     # Dummy water cell
     cell = openmc.Cell(name='water pin', fill=mats['H2O'])
@@ -178,11 +287,13 @@ def pin_universes(num_rings=10, num_axial=196, depleted=False):
     univs['GT empty grid (bottom)'] = make_pin(
         'GT empty grid (bottom)',
         [surfs['GT IR'], surfs['GT OR']],
-        [mats['H2O'], mats['Zr'], mats['H2O']], grid='bottom')
+        [mats['H2O'], mats['Zr'], mats['H2O']], grid='bottom',
+        mats=mats, surfs=surfs)
     univs['GT empty grid (intermediate)'] = make_pin(
         'GT empty grid (intermediate)',
         [surfs['GT IR'], surfs['GT OR']],
-        [mats['H2O'], mats['Zr'], mats['H2O']], grid='intermediate')
+        [mats['H2O'], mats['Zr'], mats['H2O']], grid='intermediate',
+        mats=mats, surfs=surfs)
     univs['GT empty nozzle'] = make_pin(
         'GT empty nozzle',
         [surfs['GT IR'], surfs['GT OR']],
@@ -195,11 +306,13 @@ def pin_universes(num_rings=10, num_axial=196, depleted=False):
     univs['GTd empty grid (bottom)'] = make_pin(
         'GT empty at dashpot grid (bottom)',
         [surfs['GT dashpot IR'], surfs['GT dashpot OR']],
-        [mats['H2O'], mats['Zr'], mats['H2O']], grid='bottom')
+        [mats['H2O'], mats['Zr'], mats['H2O']], grid='bottom',
+        mats=mats, surfs=surfs)
     univs['GTd empty grid (intermediate)'] = make_pin(
         'GT empty at dashpot grid (intermediate)',
         [surfs['GT dashpot IR'], surfs['GT dashpot OR']],
-        [mats['H2O'], mats['Zr'], mats['H2O']], grid='intermediate')
+        [mats['H2O'], mats['Zr'], mats['H2O']], grid='intermediate',
+        mats=mats, surfs=surfs)
     univs['GTd empty nozzle'] = make_pin(
         'GT empty nozzle',
         [surfs['GT dashpot IR'], surfs['GT dashpot OR']],
@@ -252,7 +365,8 @@ def pin_universes(num_rings=10, num_axial=196, depleted=False):
                    univs['GT empty'],
                    univs['GT empty'],
                    univs['water pin'],
-                   univs['water pin']])
+                   univs['water pin']],
+        tree=tree_stacks)
 
     univs['GT empty instr'] = make_stack(
         'GT empty instr', surfaces=stack_surfs,
@@ -276,7 +390,8 @@ def pin_universes(num_rings=10, num_axial=196, depleted=False):
                    univs['GT empty'],
                    univs['GT empty'],
                    univs['water pin'],
-                   univs['water pin']])
+                   univs['water pin']],
+        tree=tree_stacks)
 
 
     # Instrument tube pin cell
@@ -288,12 +403,12 @@ def pin_universes(num_rings=10, num_axial=196, depleted=False):
         'IT grid (bottom)',
         [surfs['IT IR'], surfs['IT OR'], surfs['GT IR'], surfs['GT OR']],
         [mats['Air'], mats['Zr'], mats['H2O'], mats['Zr'], mats['H2O']],
-        grid='bottom')
+        grid='bottom', mats=mats, surfs=surfs)
     univs['IT grid (intermediate)'] = make_pin(
         'IT grid (intermediate)',
         [surfs['IT IR'], surfs['IT OR'], surfs['GT IR'], surfs['GT OR']],
         [mats['Air'], mats['Zr'], mats['H2O'], mats['Zr'], mats['H2O']],
-        grid='intermediate')
+        grid='intermediate', mats=mats, surfs=surfs)
 
     univs['IT nozzle'] = make_pin(
         'IT nozzle',
@@ -329,7 +444,8 @@ def pin_universes(num_rings=10, num_axial=196, depleted=False):
                    univs['IT'],
                    univs['IT'],
                    univs['IT dashpot'],
-                   univs['water pin']])
+                   univs['water pin']],
+        tree=tree_stacks)
 
     # Control rod pin cells
     univs['CR'] = make_pin(
@@ -340,12 +456,12 @@ def pin_universes(num_rings=10, num_axial=196, depleted=False):
         'CR grid (bottom)',
         [surfs['CP OR'], surfs['CR IR'], surfs['GT IR'], surfs['GT OR']],
         [mats['AIC'], mats['Air'], mats['SS'], mats['H2O'], mats['Zr'], mats['H2O']],
-        grid='bottom')
+        grid='bottom', mats=mats, surfs=surfs)
     univs['CR grid (intermediate)'] = make_pin(
         'CR grid (intermediate)',
         [surfs['CP OR'], surfs['CR IR'], surfs['GT IR'], surfs['GT OR']],
         [mats['AIC'], mats['Air'], mats['SS'], mats['H2O'], mats['Zr'], mats['H2O']],
-        grid='intermediate')
+        grid='intermediate', mats=mats, surfs=surfs)
     univs['CR nozzle'] = make_pin(
         'CR nozzle',
         [surfs['CP OR'], surfs['CR IR'], surfs['CR OR']],
@@ -359,12 +475,12 @@ def pin_universes(num_rings=10, num_axial=196, depleted=False):
         'CR blank grid (bottom)',
         [surfs['CP OR'], surfs['CR IR'], surfs['CR OR'], surfs['GT IR'], surfs['GT OR']],
         [mats['SS'], mats['Air'], mats['SS'], mats['H2O'], mats['Zr'], mats['H2O']],
-        grid='bottom')
+        grid='bottom', mats=mats, surfs=surfs)
     univs['CR blank grid (intermediate)'] = make_pin(
         'CR blank grid (intermediate)',
         [surfs['CP OR'], surfs['CR IR'], surfs['CR OR'], surfs['GT IR'], surfs['GT OR']],
         [mats['SS'], mats['Air'], mats['SS'], mats['H2O'], mats['Zr'], mats['H2O']],
-        grid='intermediate')
+        grid='intermediate', mats=mats, surfs=surfs)
     univs['CR blank nozzle'] = make_pin(
         'CR blank nozzle',
         [surfs['CP OR'], surfs['CR IR'], surfs['CR OR']],
@@ -380,7 +496,7 @@ def pin_universes(num_rings=10, num_axial=196, depleted=False):
 
     # Stack all axial pieces of control rod tubes together for each bank
 
-    for b in ['A', 'B', 'C', 'D', 'SA', 'SB', 'SC', 'SD', 'SE']:
+    def control_rod_bank(b):
         # no grid, no nozzle
         univs['GT CR bank {} dummy'.format(b)] = make_stack(
             'GT CR bank {} dummy'.format(b),
@@ -392,7 +508,8 @@ def pin_universes(num_rings=10, num_axial=196, depleted=False):
                        univs['GTd empty'],
                        univs['GT empty'],
                        univs['CR'],
-                       univs['CR blank']])
+                       univs['CR blank']],
+            tree=tree_stacks)
 
         # bottom grid
         univs['GT CR bank {} dummy grid (bottom)'.format(b)] = make_stack(
@@ -405,7 +522,8 @@ def pin_universes(num_rings=10, num_axial=196, depleted=False):
                        univs['GTd empty grid (bottom)'],
                        univs['GT empty grid (bottom)'],
                        univs['CR grid (bottom)'],
-                       univs['CR blank grid (bottom)']])
+                       univs['CR blank grid (bottom)']],
+            tree=tree_stacks)
 
         # intermediate grid
         univs['GT CR bank {} dummy grid (intermediate)'.format(b)] = make_stack(
@@ -418,7 +536,8 @@ def pin_universes(num_rings=10, num_axial=196, depleted=False):
                        univs['GTd empty grid (intermediate)'],
                        univs['GT empty grid (intermediate)'],
                        univs['CR grid (intermediate)'],
-                       univs['CR blank grid (intermediate)']])
+                       univs['CR blank grid (intermediate)']],
+            tree=tree_stacks)
 
         # nozzle
         univs['GT CR bank {} dummy nozzle'.format(b)] = make_stack(
@@ -431,7 +550,8 @@ def pin_universes(num_rings=10, num_axial=196, depleted=False):
                        univs['GTd empty nozzle'],
                        univs['GT empty nozzle'],
                        univs['CR nozzle'],
-                       univs['CR blank nozzle']])
+                       univs['CR blank nozzle']],
+            tree=tree_stacks)
 
         # bare
         univs['GT CR bank {} dummy bare'.format(b)] = make_stack(
@@ -444,7 +564,8 @@ def pin_universes(num_rings=10, num_axial=196, depleted=False):
                        univs['GTd empty nozzle'],
                        univs['GT empty nozzle'],
                        univs['CR bare'],
-                       univs['CR blank bare']])
+                       univs['CR blank bare']],
+            tree=tree_stacks)
 
         # final combination of all axial pieces for control rod bank "b"
         univs['GT CR bank {}'.format(b)] = make_stack(
@@ -469,200 +590,222 @@ def pin_universes(num_rings=10, num_axial=196, depleted=False):
                        univs['GT CR bank {} dummy'.format(b)],
                        univs['GT CR bank {} dummy'.format(b)],
                        univs['GT CR bank {} dummy bare'.format(b)],
-                       univs['GT CR bank {} dummy bare'.format(b)]])
-
-
-    #### BURNABLE ABSORBER PIN CELLS
-
-    univs['BA'] = make_pin(
-        'BA',
-        surfaces=[surfs['BA IR 1'],
-                  surfs['BA IR 2'],
-                  surfs['BA IR 3'],
-                  surfs['BA IR 4'],
-                  surfs['BA IR 5'],
-                  surfs['BA IR 6'],
-                  surfs['BA IR 7'],
-                  surfs['BA IR 8']],
-        materials=[mats['Air'],
-                   mats['SS'],
-                   mats['Air'],
-                   mats['BSG'],
-                   mats['Air'],
-                   mats['SS'],
-                   mats['H2O'],
-                   mats['Zr'],
-                   mats['H2O']])
-
-    univs['BA grid (bottom)'] = make_pin(
-        'BA grid (bottom)',
-        surfaces=[surfs['BA IR 1'],
-                  surfs['BA IR 2'],
-                  surfs['BA IR 3'],
-                  surfs['BA IR 4'],
-                  surfs['BA IR 5'],
-                  surfs['BA IR 6'],
-                  surfs['BA IR 7'],
-                  surfs['BA IR 8']],
-        materials=[mats['Air'],
-                   mats['SS'],
-                   mats['Air'],
-                   mats['BSG'],
-                   mats['Air'],
-                   mats['SS'],
-                   mats['H2O'],
-                   mats['Zr'],
-                   mats['H2O']],
-        grid='bottom')
-
-    univs['BA grid (intermediate)'] = make_pin(
-        'BA grid (intermediate)',
-        surfaces=[surfs['BA IR 1'],
-                  surfs['BA IR 2'],
-                  surfs['BA IR 3'],
-                  surfs['BA IR 4'],
-                  surfs['BA IR 5'],
-                  surfs['BA IR 6'],
-                  surfs['BA IR 7'],
-                  surfs['BA IR 8']],
-        materials=[mats['Air'],
-                   mats['SS'],
-                   mats['Air'],
-                   mats['BSG'],
-                   mats['Air'],
-                   mats['SS'],
-                   mats['H2O'],
-                   mats['Zr'],
-                   mats['H2O']],
-        grid='intermediate')
-
-    univs['BA dashpot'] = make_pin(
-        'BA dashpot',
-        surfaces=[surfs['BA IR 1'],
-                  surfs['BA IR 2'],
-                  surfs['BA IR 3'],
-                  surfs['BA IR 4'],
-                  surfs['BA IR 5'],
-                  surfs['BA IR 6'],
-                  surfs['GT dashpot IR'],
-                  surfs['GT dashpot OR']],
-        materials=[mats['Air'],
-                   mats['SS'],
-                   mats['Air'],
-                   mats['BSG'],
-                   mats['Air'],
-                   mats['SS'],
-                   mats['H2O'],
-                   mats['Zr'],
-                   mats['H2O']])
+                       univs['GT CR bank {} dummy bare'.format(b)]],
+            tree=tree_stacks)
 
-    univs['BA dashpot grid (bottom)'] = make_pin(
-        'BA dashpot grid (bottom)',
-        surfaces=[surfs['BA IR 1'],
-                  surfs['BA IR 2'],
-                  surfs['BA IR 3'],
-                  surfs['BA IR 4'],
-                  surfs['BA IR 5'],
-                  surfs['BA IR 6'],
-                  surfs['GT dashpot IR'],
-                  surfs['GT dashpot OR']],
-        materials=[mats['Air'],
-                   mats['SS'],
-                   mats['Air'],
-                   mats['BSG'],
-                   mats['Air'],
-                   mats['SS'],
-                   mats['H2O'],
-                   mats['Zr'],
-                   mats['H2O']],
-        grid='bottom')
-
-    univs['BA dashpot grid (intermediate)'] = make_pin(
-        'BA dashpot grid (intermediate)',
-        surfaces=[surfs['BA IR 1'],
-                  surfs['BA IR 2'],
-                  surfs['BA IR 3'],
-                  surfs['BA IR 4'],
-                  surfs['BA IR 5'],
-                  surfs['BA IR 6'],
-                  surfs['GT dashpot IR'],
-                  surfs['GT dashpot OR']],
-        materials=[mats['Air'],
-                   mats['SS'],
-                   mats['Air'],
-                   mats['BSG'],
-                   mats['Air'],
-                   mats['SS'],
-                   mats['H2O'],
-                   mats['Zr'],
-                   mats['H2O']],
-        grid='intermediate')
-
-    univs['BA blank SS'] = make_pin(
-        'BA blank SS',
-        surfaces=[surfs['BA IR 6'],
-                  surfs['BA IR 7'],
-                  surfs['BA IR 8']],
-        materials=[mats['SS'],
-                   mats['H2O'],
-                   mats['Zr'],
-                   mats['H2O']])
-
-    univs['BA blank SS bare'] = make_pin(
-        'BA blank SS bare',
-        surfaces=[surfs['BA IR 6']],
-        materials=[mats['SS'],
-                   mats['H2O']])
+    for b in ['A', 'B', 'C', 'D', 'SA', 'SB', 'SC', 'SD', 'SE']:
+        names = ['GT CR bank {}{}'.format(b, suffix) for suffix in
+                 (' dummy', ' dummy grid (bottom)',
+                  ' dummy grid (intermediate)', ' dummy nozzle', ' dummy bare',
+                  '')]
+        univs.register_group(names, partial(control_rod_bank, b))
 
-    stack_surfs_BA = [
-        surfs['bot support plate'],
-        surfs['top support plate'],
-        surfs['top lower nozzle'],
-        surfs['top lower thimble'],
-        surfs['grid1bot'],
-        surfs['BA bot'],
-        surfs['grid1top'],
-        surfs['dashpot top'],
-        surfs['grid2bot'],
-        surfs['grid2top'],
-        surfs['grid3bot'],
-        surfs['grid3top'],
-        surfs['grid4bot'],
-        surfs['grid4top'],
-        surfs['top active core'],
-        surfs['grid5bot'],
-        surfs['grid5top'],
-        surfs['top pin plenum'],
-        surfs['top FR'],
-        surfs['bot upper nozzle'],
-        surfs['top upper nozzle']]
 
-    # Stack all axial pieces of control rod tubes together for each bank
+    #### BURNABLE ABSORBER PIN CELLS
 
-    univs['BA stack'] = make_stack(
-        'BA stack', stack_surfs_BA,
-        universes=[univs['water pin'],
-                   univs['water pin'],
-                   univs['water pin'],
-                   univs['GTd empty'],
-                   univs['GTd empty'],
-                   univs['GTd empty grid (bottom)'],
-                   univs['BA dashpot grid (bottom)'],
-                   univs['BA dashpot'],
-                   univs['BA'],
-                   univs['BA grid (intermediate)'],
-                   univs['BA'],
-                   univs['BA grid (intermediate)'],
-                   univs['BA'],
-                   univs['BA grid (intermediate)'],
-                   univs['BA'],
-                   univs['BA blank SS'],
-                   univs['BA blank SS'],
-                   univs['BA blank SS'],
-                   univs['BA blank SS'],
-                   univs['BA blank SS'],
-                   univs['BA blank SS bare'],
-                   univs['water pin']])
+    def burnable_absorbers():
+        univs['BA'] = make_pin(
+            'BA',
+            surfaces=[surfs['BA IR 1'],
+                      surfs['BA IR 2'],
+                      surfs['BA IR 3'],
+                      surfs['BA IR 4'],
+                      surfs['BA IR 5'],
+                      surfs['BA IR 6'],
+                      surfs['BA IR 7'],
+                      surfs['BA IR 8']],
+            materials=[mats['Air'],
+                       mats['SS'],
+                       mats['Air'],
+                       mats['BSG'],
+                       mats['Air'],
+                       mats['SS'],
+                       mats['H2O'],
+                       mats['Zr'],
+                       mats['H2O']])
+
+        univs['BA grid (bottom)'] = make_pin(
+            'BA grid (bottom)',
+            surfaces=[surfs['BA IR 1'],
+                      surfs['BA IR 2'],
+                      surfs['BA IR 3'],
+                      surfs['BA IR 4'],
+                      surfs['BA IR 5'],
+                      surfs['BA IR 6'],
+                      surfs['BA IR 7'],
+                      surfs['BA IR 8']],
+            materials=[mats['Air'],
+                       mats['SS'],
+                       mats['Air'],
+                       mats['BSG'],
+                       mats['Air'],
+                       mats['SS'],
+                       mats['H2O'],
+                       mats['Zr'],
+                       mats['H2O']],
+            grid='bottom', mats=mats, surfs=surfs)
+
+        univs['BA grid (intermediate)'] = make_pin(
+            'BA grid (intermediate)',
+            surfaces=[surfs['BA IR 1'],
+                      surfs['BA IR 2'],
+                      surfs['BA IR 3'],
+                      surfs['BA IR 4'],
+                      surfs['BA IR 5'],
+                      surfs['BA IR 6'],
+                      surfs['BA IR 7'],
+                      surfs['BA IR 8']],
+            materials=[mats['Air'],
+                       mats['SS'],
+                       mats['Air'],
+                       mats['BSG'],
+                       mats['Air'],
+                       mats['SS'],
+                       mats['H2O'],
+                       mats['Zr'],
+                       mats['H2O']],
+            grid='intermediate', mats=mats, surfs=surfs)
+
+        univs['BA dashpot'] = make_pin(
+            'BA dashpot',
+            surfaces=[surfs['BA IR 1'],
+                      surfs['BA IR 2'],
+                      surfs['BA IR 3'],
+                      surfs['BA IR 4'],
+                      surfs['BA IR 5'],
+                      surfs['BA IR 6'],
+                      surfs['GT dashpot IR'],
+                      surfs['GT dashpot OR']],
+            materials=[mats['Air'],
+                       mats['SS'],
+                       mats['Air'],
+                       mats['BSG'],
+                       mats['Air'],
+                       mats['SS'],
+                       mats['H2O'],
+                       mats['Zr'],
+                       mats['H2O']])
+
+        univs['BA dashpot grid (bottom)'] = make_pin(
+            'BA dashpot grid (bottom)',
+            surfaces=[surfs['BA IR 1'],
+                      surfs['BA IR 2'],
+                      surfs['BA IR 3'],
+                      surfs['BA IR 4'],
+                      surfs['BA IR 5'],
+                      surfs['BA IR 6'],
+                      surfs['GT dashpot IR'],
+                      surfs['GT dashpot OR']],
+            materials=[mats['Air'],
+                       mats['SS'],
+                       mats['Air'],
+                       mats['BSG'],
+                       mats['Air'],
+                       mats['SS'],
+                       mats['H2O'],
+                       mats['Zr'],
+                       mats['H2O']],
+            grid='bottom', mats=mats, surfs=surfs)
+
+        univs['BA dashpot grid (intermediate)'] = make_pin(
+            'BA dashpot grid (intermediate)',
+            surfaces=[surfs['BA IR 1'],
+                      surfs['BA IR 2'],
+                      surfs['BA IR 3'],
+                      surfs['BA IR 4'],
+                      surfs['BA IR 5'],
+                      surfs['BA IR 6'],
+                      surfs['GT dashpot IR'],
+                      surfs['GT dashpot OR']],
+            materials=[mats['Air'],
+                       mats['SS'],
+                       mats['Air'],
+                       mats['BSG'],
+                       mats['Air'],
+                       mats['SS'],
+                       mats['H2O'],
+                       mats['Zr'],
+                       mats['H2O']],
+            grid='intermediate', mats=mats, surfs=surfs)
+
+        univs['BA blank SS'] = make_pin(
+            'BA blank SS',
+            surfaces=[surfs['BA IR 6'],
+                      surfs['BA IR 7'],
+                      surfs['BA IR 8']],
+            materials=[mats['SS'],
+                       mats['H2O'],
+                       mats['Zr'],
+                       mats['H2O']])
+
+        univs['BA blank SS bare'] = make_pin(
+            'BA blank SS bare',
+            surfaces=[surfs['BA IR 6']],
+            materials=[mats['SS'],
+                       mats['H2O']])
+
+        stack_surfs_BA = [
+            surfs['bot support plate'],
+            surfs['top support plate'],
+            surfs['top lower nozzle'],
+            surfs['top lower thimble'],
+            surfs['grid1bot'],
+            surfs['BA bot'],
+            surfs['grid1top'],
+            surfs['dashpot top'],
+            surfs['grid2bot'],
+            surfs['grid2top'],
+            surfs['grid3bot'],
+            surfs['grid3top'],
+            surfs['grid4bot'],
+            surfs['grid4top'],
+            surfs['top active core'],
+            surfs['grid5bot'],
+            surfs['grid5top'],
+            surfs['top pin plenum'],
+            surfs['top FR'],
+            surfs['bot upper nozzle'],
+            surfs['top upper nozzle']]
+
+        # Stack all axial pieces of control rod tubes together for each bank
+
+        univs['BA stack'] = make_stack(
+            'BA stack', stack_surfs_BA,
+            universes=[univs['water pin'],
+                       univs['water pin'],
+                       univs['water pin'],
+                       univs['GTd empty'],
+                       univs['GTd empty'],
+                       univs['GTd empty grid (bottom)'],
+                       univs['BA dashpot grid (bottom)'],
+                       univs['BA dashpot'],
+                       univs['BA'],
+                       univs['BA grid (intermediate)'],
+                       univs['BA'],
+                       univs['BA grid (intermediate)'],
+                       univs['BA'],
+                       univs['BA grid (intermediate)'],
+                       univs['BA'],
+                       univs['BA blank SS'],
+                       univs['BA blank SS'],
+                       univs['BA blank SS'],
+                       univs['BA blank SS'],
+                       univs['BA blank SS'],
+                       univs['BA blank SS bare'],
+                       univs['water pin']],
+            tree=tree_stacks)
+
+    univs.register_group(
+        ['BA',
+         'BA grid (bottom)',
+         'BA grid (intermediate)',
+         'BA dashpot',
+         'BA dashpot grid (bottom)',
+         'BA dashpot grid (intermediate)',
+         'BA blank SS',
+         'BA blank SS bare',
+         'BA stack'],
+        burnable_absorbers)
 
 
     # Fuel pin cells
@@ -695,26 +838,54 @@ def pin_universes(num_rings=10, num_axial=196, depleted=False):
                    mats['He'],
                    mats['Zr'],
                    mats['H2O']],
-        grid='intermediate')
+        grid='intermediate', mats=mats, surfs=surfs)
 
 
-    #### 1.6% ENRICHED FUEL PIN CELL
+    #### FUEL PIN CELLS
 
     if num_axial > 1:
         # Determine z position between each fuel pellet, omitting the surfaces
         # corresponding to the very bottom and top of the active fuel length
-        axial_splits = np.linspace(bottom_fuel_stack, top_active_core, num_axial + 1)[1:-1]
+        axial_splits = fuel_axial_planes(num_axial)[1:-1]
         axial_surfs = [openmc.ZPlane(z0=z) for z in axial_splits]
 
     if num_rings > 1:
         # Get z-cylinder surfaces for each ring
         rings = []
+        radii = fuel_ring_radii(num_rings)
         for i in range(1, num_rings):
-            R = sqrt(i*pellet_OR**2/num_rings)
+            R = float(radii[i])
             cyl = openmc.ZCylinder(r=R, name='fuel ring {}'.format(i))
             rings.append(cyl)
 
     def subdivided_fuel(fill):
+        if axial_lattice and num_axial > 1:
+            # Create universe for a single axial slice of UO2 with radial
+            # subdivision
+            if num_rings > 1:
+                ring_cells = [openmc.Cell(fill=fill, region=ring_region)
+                              for ring_region in subdivide(rings)]
+            else:
+                ring_cells = [openmc.Cell(fill=fill)]
+            ring_univ = openmc.Universe(cells=ring_cells)
+
+            # Stack identical slices with a lattice so that the axial slice
+            # containing a point is found from its lattice index
+            dz = (top_active_core - bottom_fuel_stack)/num_axial
+            lattice = openmc.RectLattice()
+            lattice.lower_left = (-pin_pitch/2, -pin_pitch/2, bottom_fuel_stack)
+            lattice.pitch = (pin_pitch, pin_pitch, dz)
+            lattice.universes = np.full((num_axial, 1, 1), ring_univ)
+
+            # The lattice has no outer universe, since instances reached
+            # through it would not be counted in distribcell offsets. The
+            # pin stack containing the lattice only fills the fuel stack
+            # between the planes at the bottom and top of the active fuel,
+            # which coincide with the ends of the lattice, so a point there
+            # is placed by its direction both in the stack and the lattice
+            # and never has an out-of-range lattice index.
+            return lattice
+
         # Create universe for UO2 alone with axial/radial subdivision
         uo2_cells = []
         if num_axial > 1:
@@ -735,13 +906,6 @@ def pin_universes(num_rings=10, num_axial=196, depleted=False):
 
         return openmc.Universe(cells=uo2_cells)
 
-    # If rings/axial segments are present, create a universe for the subdivided
-    # fuel. Otherwise just use a plain material.
-    if num_rings > 1 or num_axial > 1:
-        fuel_fill = subdivided_fuel(mats['UO2 1.6 {}'.format(fuel)])
-    else:
-        fuel_fill = mats['UO2 1.6 {}'.format(fuel)]
-
     outside_pin_surfaces = [surfs['clad IR'], surfs['clad OR']]
     outside_pin_mats = [mats['He'], mats['M5'], mats['H2O']]
 
@@ -754,16 +918,15 @@ def pin_universes(num_rings=10, num_axial=196, depleted=False):
         'Outside pin grid (bottom)',
         surfaces=outside_pin_surfaces,
         materials=outside_pin_mats,
-        grid='bottom')
+        grid='bottom', mats=mats, surfs=surfs)
 
     univs['Outside pin grid (intermediate)'] = make_pin(
         'Outside pin grid (intermediate)',
         surfaces=outside_pin_surfaces,
         materials=outside_pin_mats,
-        grid='intermediate')
-
-    # Stack all axial pieces of 1.6% enriched fuel pin cell
+        grid='intermediate', mats=mats, surfs=surfs)
 
+    # Surfaces separating the axial pieces of the fuel pin cells
     within_fuel_surfs = [
         surfs['grid1bot'],
         surfs['grid1top'],
@@ -776,24 +939,6 @@ def pin_universes(num_rings=10, num_axial=196, depleted=False):
         surfs['grid4top']
     ]
 
-    univs['Fuel pin (1.6%) stack'] = make_pin_stack(
-        'Fuel pin (1.6%) stack',
-        zsurfaces=within_fuel_surfs,
-        universes=[
-            univs['Outside pin'],
-            univs['Outside pin grid (bottom)'],
-            univs['Outside pin'],
-            univs['Outside pin'],
-            univs['Outside pin grid (intermediate)'],
-            univs['Outside pin'],
-            univs['Outside pin grid (intermediate)'],
-            univs['Outside pin'],
-            univs['Outside pin grid (intermediate)'],
-            univs['Outside pin']
-        ],
-        boundary=surfs['pellet OR'],
-        fuel_fill=fuel_fill)
-
     fuel_stack_surfs = [
         surfs['bot support plate'],
         surfs['top support plate'],
@@ -808,112 +953,59 @@ def pin_universes(num_rings=10, num_axial=196, depleted=False):
         surfs['top upper nozzle']
     ]
 
-    univs['Fuel (1.6%) stack'] = make_stack(
-        'Fuel (1.6%) stack',
-        surfaces=fuel_stack_surfs,
-        universes=[univs['water pin'],
-                   univs['SS pin'],
-                   univs['SS pin'],
-                   univs['end plug'],
-                   univs['Fuel pin (1.6%) stack'],
-                   univs['pin plenum'],
-                   univs['pin plenum grid (intermediate)'],
-                   univs['pin plenum'],
-                   univs['end plug'],
-                   univs['water pin'],
-                   univs['SS pin'],
-                   univs['water pin']])
-
-
-    #### 2.4% ENRICHED FUEL PIN CELL
-
-    # If rings/axial segments are present, create a universe for the subdivided
-    # fuel. Otherwise just use a plain material.
-    if num_rings > 1 or num_axial > 1:
-        fuel_fill = subdivided_fuel(mats['UO2 2.4 {}'.format(fuel)])
-    else:
-        fuel_fill = mats['UO2 2.4 {}'.format(fuel)]
-
-    # Stack all axial pieces of 2.4% enriched fuel pin cell
-
-    univs['Fuel pin (2.4%) stack'] = make_pin_stack(
-        'Fuel pin (2.4%) stack',
-        zsurfaces=within_fuel_surfs,
-        universes=[
-            univs['Outside pin'],
-            univs['Outside pin grid (bottom)'],
-            univs['Outside pin'],
-            univs['Outside pin'],
-            univs['Outside pin grid (intermediate)'],
-            univs['Outside pin'],
-            univs['Outside pin grid (intermediate)'],
-            univs['Outside pin'],
-            univs['Outside pin grid (intermediate)'],
-            univs['Outside pin']
-        ],
-        boundary=surfs['pellet OR'],
-        fuel_fill=fuel_fill)
-
-    univs['Fuel (2.4%) stack'] = make_stack(
-        'Fuel (2.4%) stack',
-        surfaces=fuel_stack_surfs,
-        universes=[univs['water pin'],
-                   univs['SS pin'],
-                   univs['SS pin'],
-                   univs['end plug'],
-                   univs['Fuel pin (2.4%) stack'],
-                   univs['pin plenum'],
-                   univs['pin plenum grid (intermediate)'],
-                   univs['pin plenum'],
-                   univs['end plug'],
-                   univs['water pin'],
-                   univs['SS pin'],
-                   univs['water pin']])
-
-
-    #### 3.1% ENRICHED FUEL PIN CELL
-
-    # If rings/axial segments are present, create a universe for the subdivided
-    # fuel. Otherwise just use a plain material.
-    if num_rings > 1 or num_axial > 1:
-        fuel_fill = subdivided_fuel(mats['UO2 3.1 {}'.format(fuel)])
-    else:
-        fuel_fill = mats['UO2 3.1 {}'.format(fuel)]
-
-    # Stack all axial pieces of 3.1% enriched fuel pin cell
-
-    univs['Fuel pin (3.1%) stack'] = make_pin_stack(
-        'Fuel pin (3.1%) stack',
-        zsurfaces=within_fuel_surfs,
-        universes=[
-            univs['Outside pin'],
-            univs['Outside pin grid (bottom)'],
-            univs['Outside pin'],
-            univs['Outside pin'],
-            univs['Outside pin grid (intermediate)'],
-            univs['Outside pin'],
-            univs['Outside pin grid (intermediate)'],
-            univs['Outside pin'],
-            univs['Outside pin grid (intermediate)'],
-            univs['Outside pin']
-        ],
-        boundary=surfs['pellet OR'],
-        fuel_fill=fuel_fill)
-
-    univs['Fuel (3.1%) stack'] = make_stack(
-        'Fuel (3.1%) stack',
-        surfaces=fuel_stack_surfs,
-        universes=[univs['water pin'],
-                   univs['SS pin'],
-                   univs['SS pin'],
-                   univs['end plug'],
-                   univs['Fuel pin (3.1%) stack'],
-                   univs['pin plenum'],
-                   univs['pin plenum grid (intermediate)'],
-                   univs['pin plenum'],
-                   univs['end plug'],
-                   univs['water pin'],
-                   univs['SS pin'],
-                   univs['water pin']])
+    def fuel_stacks(enrichment):
+        # If rings/axial segments are present, create a universe for the
+        # subdivided fuel. Otherwise just use a plain material.
+        uo2 = mats['UO2 {} {}'.format(enrichment, fuel)]
+        if num_rings > 1 or num_axial > 1:
+            fuel_fill = subdivided_fuel(uo2)
+        else:
+            fuel_fill = uo2
+
+        # Stack all axial pieces of the fuel pin cell
+        pin_name = 'Fuel pin ({}%) stack'.format(enrichment)
+        univs[pin_name] = make_pin_stack(
+            pin_name,
+            zsurfaces=within_fuel_surfs,
+            universes=[
+                univs['Outside pin'],
+                univs['Outside pin grid (bottom)'],
+                univs['Outside pin'],
+                univs['Outside pin'],
+                univs['Outside pin grid (intermediate)'],
+                univs['Outside pin'],
+                univs['Outside pin grid (intermediate)'],
+                univs['Outside pin'],
+                univs['Outside pin grid (intermediate)'],
+                univs['Outside pin']
+            ],
+            boundary=surfs['pellet OR'],
+            fuel_fill=fuel_fill,
+            tree=tree_stacks)
+
+        name = 'Fuel ({}%) stack'.format(enrichment)
+        univs[name] = make_stack(
+            name,
+            surfaces=fuel_stack_surfs,
+            universes=[univs['water pin'],
+                       univs['SS pin'],
+                       univs['SS pin'],
+                       univs['end plug'],
+                       univs[pin_name],
+                       univs['pin plenum'],
+                       univs['pin plenum grid (intermediate)'],
+                       univs['pin plenum'],
+                       univs['end plug'],
+                       univs['water pin'],
+                       univs['SS pin'],
+                       univs['water pin']],
+            tree=tree_stacks)
+
+    # Subdividing the fuel makes these by far the largest universes, so each
+    # enrichment is only built when an assembly that contains it is built
+    for enrichment in ['1.6', '2.4', '3.1']:
+        names = ['Fuel pin ({}%) stack'.format(enrichment),
+                 'Fuel ({}%) stack'.format(enrichment)]
+        univs.register_group(names, partial(fuel_stacks, enrichment))
 
     return univs
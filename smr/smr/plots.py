@@ -6,27 +6,46 @@ import openmc
 
 from .surfaces import lowest_extent, highest_extent, lattice_pitch, rpv_OR, \
     pin_pitch
-from .materials import mats
-
-
-# color specifications
-colors = {
-    mats['H2O']: (198, 226, 255),  # light blue
-    mats['In']: (101, 101, 101),  # dgray
-    mats['CS']: (  0,   0,   0),  # carbons black
-    mats['Zr']: (201, 201, 201),  # gray
-    mats['SS']: (  0,   0,   0),  # black
-    mats['Air']: (255, 255, 255),  # white
-    mats['He']: (255, 218, 185),  # light orange
-    mats['BSG']: (  0, 255,   0),  # green
-    mats['AIC']: (255,   0,   0),  # bright red
-    mats['UO2 1.6 fresh']: (142,  35,  35),  # light red
-    mats['UO2 2.4 fresh']: (255, 215,   0),  # gold
-    mats['UO2 3.1 fresh']: (  0,   0, 128)   # dark blue
-}
-
-
-def core_plots():
+from .materials import default_materials
+
+
+def material_colors(mats=None):
+    """Return the colors used to plot each material.
+
+    Parameters
+    ----------
+    mats : dict, optional
+        Materials of the model. Defaults to
+        :func:`smr.materials.default_materials`.
+
+    Returns
+    -------
+    dict
+        Dictionary mapping an openmc.Material to an RGB tuple
+
+    """
+    if mats is None:
+        mats = default_materials()
+
+    return {
+        mats['H2O']: (198, 226, 255),  # light blue
+        mats['In']: (101, 101, 101),  # dgray
+        mats['CS']: (  0,   0,   0),  # carbons black
+        mats['Zr']: (201, 201, 201),  # gray
+        mats['SS']: (  0,   0,   0),  # black
+        mats['Air']: (255, 255, 255),  # white
+        mats['He']: (255, 218, 185),  # light orange
+        mats['BSG']: (  0, 255,   0),  # green
+        mats['AIC']: (255,   0,   0),  # bright red
+        mats['UO2 1.6 fresh']: (142,  35,  35),  # light red
+        mats['UO2 2.4 fresh']: (255, 215,   0),  # gold
+        mats['UO2 3.1 fresh']: (  0,   0, 128)   # dark blue
+    }
+
+
+def core_plots(mats=None):
+    colors = material_colors(mats)
+
     # Create a collection of plots
     plots = openmc.Plots()
 
@@ -96,7 +115,10 @@ def core_plots():
     return plots
 
 
-def assembly_plots(univ):
+def assembly_plots(univ, mats=None):
+    if mats is None:
+        mats = default_materials()
+
     colors = {
         mats['H2O']: (198, 226, 255),  # light blue
         mats['In']: (101, 101, 101),  # dgray
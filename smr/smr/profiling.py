@@ -0,0 +1,228 @@
+"""Measure the time and memory used by each phase of a model build.
+
+Phases are marked with the :func:`phase` context manager. When no profiler is
+active, :func:`phase` does nothing so that it can be left in place in library
+code at no cost. Phases may be nested, in which case the name recorded for
+the inner phase is prefixed with the names of the phases enclosing it, e.g.,
+``'core_geometry/assembly_universes/pin_universes'``.
+
+"""
+
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+_ACTIVE = None
+
+
+def max_rss(children=False):
+    """Return the peak resident set size of this process (or its children).
+
+    Parameters
+    ----------
+    children : bool
+        Whether to return the largest peak of any terminated child process
+        rather than of this process
+
+    Returns
+    -------
+    float or None
+        Peak resident set size in MB, or None if it cannot be determined on
+        this platform
+
+    """
+    if resource is None:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    rss = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    if sys.platform == 'darwin':
+        return rss / 1024**2
+    return rss / 1024
+
+
+class Profiler:
+    """Record of the time and memory used by each phase of a build.
+
+    For each phase, the following are recorded:
+
+    - ``wall_time``: elapsed time in seconds
+    - ``cpu_time``: CPU time of this process in seconds
+    - ``max_rss``: peak resident set size of the process in MB at the end of
+      the phase. This is a high-water mark over the life of the process, so
+      it only identifies the phase responsible when it increases.
+    - ``children_max_rss``: largest peak resident set size in MB of any child
+      process (e.g., processes used to export XML files) that had finished
+      by the end of the phase
+    - ``traced_peak``: peak memory in MB allocated by Python during the phase
+      as reported by tracemalloc, if memory tracing is enabled
+
+    Parameters
+    ----------
+    trace_memory : bool
+        Whether to trace memory allocations with tracemalloc. This gives the
+        peak memory of each individual phase but slows down a build
+        considerably.
+
+    Attributes
+    ----------
+    phases : collections.OrderedDict
+        Dictionary mapping the name of each phase to a dictionary of its
+        measurements, in the order the phases finished
+    counts : collections.OrderedDict
+        Dictionary of sizes associated with the build (e.g., number of cells)
+        recorded with :meth:`count`
+
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.phases = OrderedDict()
+        self.counts = OrderedDict()
+        self._stack = []
+        self._start = None
+
+    def start(self):
+        """Start timing the build and make this the active profiler."""
+        global _ACTIVE
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._start = (time.perf_counter(), time.process_time())
+        _ACTIVE = self
+
+    def stop(self):
+        """Stop profiling and record the build as a whole as ``'total'``."""
+        global _ACTIVE
+        wall, cpu = self._start
+        record = self._measure(wall, cpu)
+        if self.trace_memory and tracemalloc.is_tracing():
+            record['traced_peak'] = tracemalloc.get_traced_memory()[1] / 1024**2
+            tracemalloc.stop()
+        self.phases['total'] = record
+        if _ACTIVE is self:
+            _ACTIVE = None
+
+    def _measure(self, wall, cpu):
+        return OrderedDict([
+            ('wall_time', time.perf_counter() - wall),
+            ('cpu_time', time.process_time() - cpu),
+            ('max_rss', max_rss()),
+            ('children_max_rss', max_rss(children=True))
+        ])
+
+    @contextmanager
+    def phase(self, name):
+        """Measure a phase of the build.
+
+        Parameters
+        ----------
+        name : str
+            Name of the phase
+
+        """
+        path = '/'.join([frame['name'] for frame in self._stack] + [name])
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            # Enclosing phases keep the peak reached so far before it is reset
+            peak = tracemalloc.get_traced_memory()[1]
+            for frame in self._stack:
+                frame['peak'] = max(frame['peak'], peak)
+            if hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+
+        frame = {'name': name, 'peak': 0}
+        self._stack.append(frame)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            record = self._measure(wall, cpu)
+            if tracing:
+                peak = tracemalloc.get_traced_memory()[1]
+                for f in self._stack:
+                    f['peak'] = max(f['peak'], peak)
+                record['traced_peak'] = max(frame['peak'], peak) / 1024**2
+            self.phases[path] = record
+
+    def count(self, name, value):
+        """Record a size associated with the build.
+
+        Parameters
+        ----------
+        name : str
+            What is being counted, e.g., 'cells'
+        value : int
+            Count
+
+        """
+        self.counts[name] = value
+
+    def report(self):
+        """Return the measurements along with information about the build.
+
+        Returns
+        -------
+        dict
+            Report with the command line (``'argv'``), Python and OpenMC
+            versions, the measurements of each phase (``'phases'``) and the
+            recorded counts (``'counts'``)
+
+        """
+        try:
+            import openmc
+            openmc_version = openmc.__version__
+        except ImportError:
+            openmc_version = None
+
+        return OrderedDict([
+            ('argv', sys.argv),
+            ('python', platform.python_version()),
+            ('openmc', openmc_version),
+            ('phases', self.phases),
+            ('counts', self.counts)
+        ])
+
+    def export(self, path):
+        """Write the report to a JSON file.
+
+        Parameters
+        ----------
+        path : str or pathlib.Path
+            Path of the file to write
+
+        """
+        with open(str(path), 'w') as fh:
+            json.dump(self.report(), fh, indent=2)
+
+
+def get_profiler():
+    """Return the active profiler, or None if the build is not being profiled."""
+    return _ACTIVE
+
+
+@contextmanager
+def phase(name):
+    """Measure a phase of the build with the active profiler, if any.
+
+    Parameters
+    ----------
+    name : str
+        Name of the phase
+
+    """
+    if _ACTIVE is None:
+        yield
+    else:
+        with _ACTIVE.phase(name):
+            yield
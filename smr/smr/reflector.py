@@ -11,11 +11,11 @@ converted to actual dimensions by scaling according to the width of an assembly.
 
 import openmc
 
-from .materials import mats
+from .materials import default_materials
 from .surfaces import lattice_pitch
 
 
-def make_reflector(name, parameters):
+def make_reflector(name, parameters, mats=None):
     """Make an assembly-sized heavy neutron reflector block with cooling holes.
 
     Parameters
@@ -25,6 +25,9 @@ def make_reflector(name, parameters):
     parameters : iterable of 3-tuples
         Iterable containing tuple with the (x,y) coordinates of the center and
         the radius of a Z-cylinder and the
+    mats : dict, optional
+        Materials of the model. Defaults to
+        :func:`smr.materials.default_materials`.
 
     Returns
     -------
@@ -32,6 +35,9 @@ def make_reflector(name, parameters):
         Universe containing reflector block
 
     """
+    if mats is None:
+        mats = default_materials()
+
     water_holes = []
     for x, y, r in parameters:
         zcyl = openmc.ZCylinder(x0=x, y0=y, r=r)
@@ -48,15 +54,14 @@ def make_reflector(name, parameters):
     return univ
 
 
-def reflector_universes():
+def reflector_universes(mats=None):
     """Generate universes for SMR heavy neutron reflector blocks.
 
     Parameters
     ----------
-    num_rings : int
-        Number of annual regions in fuel
-    num_axial : int
-        Number of axial subdivisions in fuel
+    mats : dict, optional
+        Materials of the model. Defaults to
+        :func:`smr.materials.default_materials`.
 
     Returns
     -------
@@ -64,6 +69,9 @@ def reflector_universes():
         Dictionary mapping a universe name to a openmc.Universe object
 
     """
+    if mats is None:
+        mats = default_materials()
+
     # Create dictionary to store universes
     univs = {}
 
@@ -126,7 +134,7 @@ def reflector_universes():
         (x6, y6, r1), (x7, y7, r1), (x8, y8, r1), (x9, y9, r1),
         (x1, y10, r1)
     ]
-    univs['NW'] = make_reflector('NW', params)
+    univs['NW'] = make_reflector('NW', params, mats)
 
     # Reflector at (1, 1)
 
@@ -135,7 +143,7 @@ def reflector_universes():
         (lattice_pitch/2 - scale*103, -lattice_pitch/2 + scale*156, r1),
         (lattice_pitch/2 - scale*158, -lattice_pitch/2 + scale*103, r1)
     ]
-    univs['1,1'] = make_reflector('1,1', params)
+    univs['1,1'] = make_reflector('1,1', params, mats)
 
     # Left reflector (4,0)
 
@@ -155,7 +163,7 @@ def reflector_universes():
         (x2, d_y/2, r1), (x2, 3/2*d_y, r1), (x2, -d_y/2, r1), (x2, -3/2*d_y, r1),
         (x3, y3, r1), (x3, -y3, r1)
        ]
-    univs['4,0'] = make_reflector('4,0', params)
+    univs['4,0'] = make_reflector('4,0', params, mats)
 
     # Reflector at (3,0)
 
@@ -176,17 +184,17 @@ def reflector_universes():
     y4 = -lattice_pitch/2 + scale*up4
     params += [(x3, y3, r1), (x4, y4, r1)]
 
-    univs['3,0'] = make_reflector('3,0', params)
+    univs['3,0'] = make_reflector('3,0', params, mats)
 
     # Reflector at (5,0)
     params = [(x, -y, r) for x, y, r in params]
-    univs['5,0'] = make_reflector('5,0', params)
+    univs['5,0'] = make_reflector('5,0', params, mats)
 
     # Reflector at (2, 0)
 
     params = [(-lattice_pitch/2 + scale*(width - 78),
                -lattice_pitch/2 + scale*98, r1)]
-    univs['2,0'] = make_reflector('2,0', params)
+    univs['2,0'] = make_reflector('2,0', params, mats)
 
     ################################################################################
     # Beyond this point, all universes are just copies of the ones previously
@@ -0,0 +1,105 @@
+"""Universes that are only built when they are first requested.
+
+The pin and assembly libraries define many more universes than any one model
+uses, e.g., an assembly variant for every control rod bank and burnable
+absorber pattern. Rather than building all of them up front, each universe
+(or group of universes that are built together) is registered with a function
+that builds it, and that function is only called the first time one of its
+universes is looked up.
+
+"""
+
+from collections import OrderedDict
+from collections.abc import Mapping
+
+
+class LazyUniverses(Mapping):
+    """Dictionary of universes that are built on first access.
+
+    Universes can either be stored directly, as with a normal dictionary, or
+    registered along with a function that builds them. Looking up the keys
+    (e.g., with ``in`` or by iterating) never builds anything, whereas
+    accessing the values (e.g., with :meth:`values` or :meth:`items`) builds
+    every registered universe.
+
+    Attributes
+    ----------
+    built : list of str
+        Names of the universes that have been built or stored so far
+
+    """
+
+    def __init__(self):
+        self._universes = OrderedDict()
+        self._builders = OrderedDict()
+        self._building = set()
+
+    def __setitem__(self, name, universe):
+        self._universes[name] = universe
+
+    def __getitem__(self, name):
+        if name not in self._universes:
+            builder = self._builders.get(name)
+            if builder is None or builder in self._building:
+                raise KeyError(name)
+
+            self._building.add(builder)
+            try:
+                builder()
+            finally:
+                self._building.discard(builder)
+            for key in [k for k, b in self._builders.items() if b is builder]:
+                del self._builders[key]
+
+            if name not in self._universes:
+                raise RuntimeError('Building universe "{}" did not produce '
+                                   'it.'.format(name))
+        return self._universes[name]
+
+    def __contains__(self, name):
+        return name in self._universes or name in self._builders
+
+    def __iter__(self):
+        # Take a snapshot of the names since iterating over values builds the
+        # remaining universes as it goes
+        names = list(self._universes)
+        names.extend(n for n in self._builders if n not in self._universes)
+        return iter(names)
+
+    def __len__(self):
+        return len(self._universes) + sum(
+            1 for name in self._builders if name not in self._universes)
+
+    @property
+    def built(self):
+        return list(self._universes)
+
+    def register(self, name, builder):
+        """Register a function that builds a single universe.
+
+        Parameters
+        ----------
+        name : str
+            Name of the universe
+        builder : callable
+            Function called with no arguments that returns the universe
+
+        """
+        def build():
+            self._universes[name] = builder()
+        self._builders[name] = build
+
+    def register_group(self, names, builder):
+        """Register a function that builds several universes at once.
+
+        Parameters
+        ----------
+        names : iterable of str
+            Names of the universes
+        builder : callable
+            Function called with no arguments that stores each of the
+            universes in this dictionary, i.e., with ``univs[name] = universe``
+
+        """
+        for name in names:
+            self._builders[name] = builder
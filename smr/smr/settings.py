@@ -0,0 +1,93 @@
+"""Instantiate OpenMC Settings for the core and assembly models."""
+
+import openmc
+
+from . import inlet_temperature
+from .surfaces import lattice_pitch, bottom_fuel_stack, top_active_core
+
+
+def make_settings(lower_left, upper_right, particles=10000, batches=200,
+                  inactive=100, multipole=False):
+    """Create settings for an eigenvalue calculation.
+
+    Parameters
+    ----------
+    lower_left : Iterable of float
+        Lower-left corner of the initial source box
+    upper_right : Iterable of float
+        Upper-right corner of the initial source box
+    particles : int
+        Number of particles per batch
+    batches : int
+        Total number of batches
+    inactive : int
+        Number of inactive batches
+    multipole : bool
+        Whether to use multipole cross sections
+
+    Returns
+    -------
+    openmc.Settings
+        Settings for the model
+
+    """
+    # Construct uniform initial source distribution over fissionable zones
+    source = openmc.source.Source(space=openmc.stats.Box(lower_left, upper_right))
+    source.space.only_fissionable = True
+
+    settings = openmc.Settings()
+    settings.batches = batches
+    settings.inactive = inactive
+    settings.particles = particles
+    settings.output = {'tallies': False, 'summary': False}
+    settings.source = source
+    settings.sourcepoint_write = False
+
+    settings.temperature = {
+        'default': inlet_temperature,
+        'method': 'interpolation',
+        'range': (300.0, 1500.0),
+    }
+    if multipole:
+        settings.temperature['multipole'] = True
+        settings.temperature['tolerance'] = 1000
+
+    return settings
+
+
+def core_settings(**kwargs):
+    """Create settings for the full core model.
+
+    Parameters
+    ----------
+    **kwargs
+        Keyword arguments passed to :func:`make_settings`
+
+    Returns
+    -------
+    openmc.Settings
+        Settings for the full core model
+
+    """
+    lower_left = [-7.*lattice_pitch/2., -7.*lattice_pitch/2., bottom_fuel_stack]
+    upper_right = [+7.*lattice_pitch/2., +7.*lattice_pitch/2., top_active_core]
+    return make_settings(lower_left, upper_right, **kwargs)
+
+
+def assembly_settings(**kwargs):
+    """Create settings for the single assembly model.
+
+    Parameters
+    ----------
+    **kwargs
+        Keyword arguments passed to :func:`make_settings`
+
+    Returns
+    -------
+    openmc.Settings
+        Settings for the single assembly model
+
+    """
+    lower_left = (-lattice_pitch/2, -lattice_pitch/2, bottom_fuel_stack)
+    upper_right = (lattice_pitch/2, lattice_pitch/2, top_active_core)
+    return make_settings(lower_left, upper_right, **kwargs)
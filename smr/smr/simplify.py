@@ -0,0 +1,650 @@
+"""Simplify a geometry before it is exported without changing the physics.
+
+Building the model piece by piece leaves behind universes that are identical
+to one another apart from their names and IDs, as well as distinct surfaces
+that coincide. Each of these adds cells, surfaces and lookup tables to
+geometry.xml and to OpenMC's memory footprint.
+
+"""
+
+import numpy as np
+import openmc
+
+from .traversal import _flatten, traverse, invalidate
+
+
+def _freeze(value):
+    """Convert an attribute that may be an array into something hashable."""
+    if value is None:
+        return None
+    return tuple(np.ravel(value).tolist())
+
+
+def surface_key(surface):
+    """Return a key identifying the shape of a surface.
+
+    Parameters
+    ----------
+    surface : openmc.Surface
+        Surface to identify
+
+    Returns
+    -------
+    tuple
+        Type, coefficients and boundary condition of the surface
+
+    """
+    return (surface.type, tuple(sorted(surface.coefficients.items())),
+            surface.boundary_type)
+
+
+def region_key(region, key=surface_key):
+    """Return a key identifying the structure of a region.
+
+    Two regions have the same key if they are built from the same operators
+    applied in the same order to half-spaces of surfaces with the same keys.
+
+    Parameters
+    ----------
+    region : openmc.Region or None
+        Region to identify
+    key : callable
+        Function returning the key of a surface
+
+    Returns
+    -------
+    tuple or None
+        Key of the region
+
+    """
+    if region is None:
+        return None
+    elif isinstance(region, openmc.Halfspace):
+        return (region.side, key(region.surface))
+    elif isinstance(region, openmc.Intersection):
+        return ('&',) + tuple(region_key(r, key) for r in region)
+    elif isinstance(region, openmc.Union):
+        return ('|',) + tuple(region_key(r, key) for r in region)
+    elif isinstance(region, openmc.Complement):
+        return ('~', region_key(region.node, key))
+    raise TypeError('Unknown region type: {}'.format(type(region)))
+
+
+class _Canonicalizer:
+    """Assign the same integer to structurally identical objects.
+
+    The first object seen with a given structure is its representative.
+    Surfaces in ``exclude`` (given by id()) are compared by identity.
+
+    """
+
+    def __init__(self, exclude=()):
+        self.keys = {}
+        self.representatives = []
+        self._memo = {}
+        self._exclude = set(exclude)
+
+    def surface_key(self, surface):
+        if id(surface) in self._exclude:
+            return ('surface', id(surface))
+        return surface_key(surface)
+
+    def _intern(self, key, obj):
+        if key not in self.keys:
+            self.keys[key] = len(self.representatives)
+            self.representatives.append(obj)
+        self._memo[id(obj)] = self.keys[key]
+        return self.keys[key]
+
+    def representative(self, obj):
+        return self.representatives[self._memo[id(obj)]]
+
+    def fill_key(self, fill):
+        if fill is None:
+            return None
+        elif isinstance(fill, openmc.Material):
+            return ('material', fill.id)
+        elif isinstance(fill, openmc.Universe):
+            return ('universe', self.universe(fill))
+        elif isinstance(fill, openmc.Lattice):
+            return ('lattice', self.lattice(fill))
+        else:
+            return ('distribmat',) + tuple(
+                None if m is None else m.id for m in fill)
+
+    def cell(self, cell):
+        if id(cell) in self._memo:
+            return self._memo[id(cell)]
+        key = ('cell', self.fill_key(cell.fill),
+               region_key(cell.region, self.surface_key),
+               _freeze(cell.temperature), _freeze(cell.rotation),
+               _freeze(cell.translation))
+        return self._intern(key, cell)
+
+    def universe(self, universe):
+        if id(universe) in self._memo:
+            return self._memo[id(universe)]
+        cells = sorted(self.cell(c) for c in universe.cells.values())
+        return self._intern(('universe',) + tuple(cells), universe)
+
+    def lattice(self, lattice):
+        if id(lattice) in self._memo:
+            return self._memo[id(lattice)]
+        if isinstance(lattice, openmc.RectLattice):
+            universes = np.asarray(lattice.universes)
+            outer = lattice.outer
+            key = ('rect', _freeze(lattice.lower_left), _freeze(lattice.pitch),
+                   None if outer is None else self.universe(outer),
+                   universes.shape,
+                   tuple(self.universe(u) for u in universes.flat))
+        else:
+            # Other lattices are only ever identical to themselves
+            for u in _flatten(lattice.universes):
+                self.universe(u)
+            key = ('lattice', id(lattice))
+        return self._intern(key, lattice)
+
+
+def halfspaces(region):
+    """Yield each half-space in a region.
+
+    Parameters
+    ----------
+    region : openmc.Region or None
+        Region to search
+
+    Yields
+    ------
+    openmc.Halfspace
+        Each half-space in the region, including those under a complement
+
+    """
+    if isinstance(region, openmc.Halfspace):
+        yield region
+    elif isinstance(region, (openmc.Intersection, openmc.Union)):
+        for node in region:
+            yield from halfspaces(node)
+    elif isinstance(region, openmc.Complement):
+        yield from halfspaces(region.node)
+
+
+def merge_surfaces(geometry, tolerance=1e-10, exclude=()):
+    """Replace coincident surfaces with a single surface.
+
+    Surfaces of the same type and boundary condition whose coefficients all
+    agree to within a tolerance are coincident. Every half-space in a cell
+    region that refers to one of them is rewritten to use the surface with
+    the lowest ID, and the others are dropped from the geometry.
+
+    Parameters
+    ----------
+    geometry : openmc.Geometry
+        Geometry to modify in place
+    tolerance : float
+        Largest absolute difference between coefficients of surfaces that are
+        considered coincident
+    exclude : iterable of openmc.Surface
+        Surfaces that must be kept, e.g., because they will be moved
+        independently of surfaces that currently coincide with them
+
+    Returns
+    -------
+    int
+        Number of surfaces removed from the geometry
+
+    """
+    exclude = {id(s) for s in exclude}
+    sides = [h for cell in traverse(geometry).get_all_cells().values()
+             for h in halfspaces(cell.region)]
+    surfaces = {id(h.surface): h.surface for h in sides}
+    n_before = len({s.id for s in surfaces.values()})
+
+    # Find the surface that replaces each coincident surface
+    survivors = {}
+    replace = {}
+    for surface in sorted(surfaces.values(), key=lambda s: s.id):
+        if id(surface) in exclude:
+            continue
+        names = sorted(surface.coefficients)
+        coeffs = np.array([surface.coefficients[k] for k in names], dtype=float)
+        group = survivors.setdefault(
+            (surface.type, surface.boundary_type, tuple(names)), [])
+        for other, other_coeffs in group:
+            if np.all(np.abs(coeffs - other_coeffs) <= tolerance):
+                replace[id(surface)] = other
+                break
+        else:
+            group.append((surface, coeffs))
+
+    for h in sides:
+        if id(h.surface) in replace:
+            h.surface = replace[id(h.surface)]
+
+    return n_before - len({s.id for s in surfaces.values()
+                           if id(s) not in replace})
+
+
+def _count(geometry):
+    """Count the universes, cells, lattices and surfaces in a geometry."""
+    traversal = traverse(geometry)
+    surfaces = set()
+    for cell in traversal.get_all_cells().values():
+        if cell.region is not None:
+            surfaces.update(cell.region.get_surfaces())
+    return {
+        'universes': len(traversal.graph.universes),
+        'cells': len(traversal.get_all_cells()),
+        'lattices': len(traversal.graph.lattice_cells),
+        'surfaces': len(surfaces)
+    }
+
+
+def deduplicate(geometry, exclude=()):
+    """Merge structurally identical universes, cells and lattices.
+
+    Universes, cells, lattices, regions and surfaces are compared by
+    structure rather than by identity: two surfaces are the same if they have
+    the same type, coefficients and boundary condition; two cells are the
+    same if they have the same fill, region and transformations; and two
+    universes are the same if they contain the same cells. Every reference to
+    a duplicate is replaced by the first object found with the same
+    structure. Names and IDs are ignored, so duplicates are removed from the
+    geometry along with their names. Materials are compared by identity.
+
+    This must be called before cells are differentiated, since merging
+    universes changes the number of instances of the cells within them.
+
+    Parameters
+    ----------
+    geometry : openmc.Geometry
+        Geometry to modify in place
+    exclude : iterable of openmc.Surface
+        Surfaces that are only the same as themselves. Cells bounded by them
+        are never merged with cells bounded by other surfaces, so the
+        surfaces are kept, e.g., so that they can be moved later.
+
+    Returns
+    -------
+    dict
+        Number of universes, cells, lattices and surfaces removed from the
+        geometry
+
+    """
+    before = _count(geometry)
+
+    canon = _Canonicalizer(id(s) for s in exclude)
+    canon.universe(geometry.root_universe)
+
+    # Replace references to duplicates, visiting only what remains
+    visited = set()
+    stack = [geometry.root_universe]
+    while stack:
+        univ = stack.pop()
+        if univ in visited:
+            continue
+        visited.add(univ)
+
+        for cell in univ.cells.values():
+            fill = cell.fill
+            if isinstance(fill, openmc.Universe):
+                cell.fill = canon.representative(fill)
+                stack.append(cell.fill)
+            elif isinstance(fill, openmc.Lattice):
+                lattice = canon.representative(fill)
+                cell.fill = lattice
+                if lattice in visited:
+                    continue
+                visited.add(lattice)
+                if isinstance(lattice, openmc.RectLattice):
+                    universes = np.asarray(lattice.universes)
+                    for idx in np.ndindex(universes.shape):
+                        universes[idx] = canon.representative(universes[idx])
+                    lattice.universes = universes
+                    stack.extend(universes.flat)
+                    if lattice.outer is not None:
+                        lattice.outer = canon.representative(lattice.outer)
+                        stack.append(lattice.outer)
+                else:
+                    stack.extend(_flatten(lattice.universes))
+
+    invalidate(geometry)
+    after = _count(geometry)
+    return {k: before[k] - after[k] for k in before}
+
+
+#### Redundant half-space removal
+
+# Results of simplifying a region that is satisfied everywhere or nowhere
+# within a bounding box
+_ALWAYS = object()
+_NEVER = object()
+
+
+def _infinite():
+    return np.full(3, -np.inf), np.full(3, np.inf)
+
+
+def _intersect(a, b):
+    return np.maximum(a[0], b[0]), np.minimum(a[1], b[1])
+
+
+def _union(a, b):
+    return np.minimum(a[0], b[0]), np.maximum(a[1], b[1])
+
+
+def plane_axis(surface):
+    """Return the axis and position of an axis-aligned plane.
+
+    Parameters
+    ----------
+    surface : openmc.Surface
+        Surface to identify
+
+    Returns
+    -------
+    int or None
+        Index of the axis normal to the plane, or None if the surface is not
+        an x-, y- or z-plane
+    float or None
+        Position of the plane along the axis
+
+    """
+    for axis, (cls, coeff) in enumerate([(openmc.XPlane, 'x0'),
+                                         (openmc.YPlane, 'y0'),
+                                         (openmc.ZPlane, 'z0')]):
+        if isinstance(surface, cls):
+            return axis, surface.coefficients[coeff]
+    return None, None
+
+
+def cylinder_coefficients(surface):
+    """Return the center and radius of a z-cylinder.
+
+    Parameters
+    ----------
+    surface : openmc.Surface
+        Surface to identify
+
+    Returns
+    -------
+    tuple of float or None
+        x- and y-coordinates of the axis and radius of the cylinder, or None if
+        the surface is not a z-cylinder
+
+    """
+    if isinstance(surface, openmc.ZCylinder):
+        c = surface.coefficients
+        return c['x0'], c['y0'], c.get('r', c.get('R'))
+    return None
+
+
+def _distances(box, x0, y0):
+    """Return the smallest and largest distances from an axis to an xy box."""
+    (xmin, ymin, _), (xmax, ymax, _) = box
+    dx_near = max(xmin - x0, 0., x0 - xmax)
+    dy_near = max(ymin - y0, 0., y0 - ymax)
+    dx_far = max(abs(xmin - x0), abs(xmax - x0))
+    dy_far = max(abs(ymin - y0), abs(ymax - y0))
+    return np.hypot(dx_near, dy_near), np.hypot(dx_far, dy_far)
+
+
+def _bounds(region, exclude=frozenset()):
+    """Return a box that contains a region.
+
+    Half-spaces of surfaces in ``exclude`` (given by id()) are treated as
+    unbounded since those surfaces may be moved.
+
+    """
+    box = _infinite()
+    if region is None:
+        return box
+    elif isinstance(region, openmc.Halfspace):
+        if id(region.surface) in exclude:
+            return box
+        axis, position = plane_axis(region.surface)
+        cylinder = cylinder_coefficients(region.surface)
+        if axis is not None:
+            if region.side == '-':
+                box[1][axis] = position
+            else:
+                box[0][axis] = position
+        elif cylinder is not None and region.side == '-':
+            x0, y0, r = cylinder
+            box[0][:2] = (x0 - r, y0 - r)
+            box[1][:2] = (x0 + r, y0 + r)
+        return box
+    elif isinstance(region, openmc.Intersection):
+        for node in region:
+            box = _intersect(box, _bounds(node, exclude))
+        return box
+    elif isinstance(region, openmc.Union):
+        nodes = [_bounds(node, exclude) for node in region]
+        if not nodes:
+            return box
+        box = nodes[0]
+        for b in nodes[1:]:
+            box = _union(box, b)
+        return box
+    elif isinstance(region, openmc.Complement):
+        return _bounds(_complement(region.node), exclude)
+    return box
+
+
+def _complement(region):
+    """Return the complement of a region without using openmc.Complement."""
+    if isinstance(region, openmc.Halfspace):
+        side = '+' if region.side == '-' else '-'
+        return openmc.Halfspace(region.surface, side)
+    elif isinstance(region, openmc.Intersection):
+        return openmc.Union(_complement(node) for node in region)
+    elif isinstance(region, openmc.Union):
+        return openmc.Intersection(_complement(node) for node in region)
+    elif isinstance(region, openmc.Complement):
+        return region.node
+    raise TypeError('Unknown region type: {}'.format(type(region)))
+
+
+def _simplify_halfspace(halfspace, box, exclude):
+    if halfspace.surface.boundary_type != 'transmission' or \
+       id(halfspace.surface) in exclude:
+        return halfspace
+
+    lower, upper = box
+    axis, position = plane_axis(halfspace.surface)
+    cylinder = cylinder_coefficients(halfspace.surface)
+    if axis is not None:
+        below = upper[axis] <= position
+        above = lower[axis] >= position
+        if halfspace.side == '-':
+            inside, outside = below, above
+        else:
+            inside, outside = above, below
+    elif cylinder is not None:
+        x0, y0, r = cylinder
+        near, far = _distances(box, x0, y0)
+        if halfspace.side == '-':
+            inside, outside = far <= r, near >= r
+        else:
+            inside, outside = near >= r, far <= r
+    else:
+        return halfspace
+
+    if inside:
+        return _ALWAYS
+    elif outside:
+        return _NEVER
+    return halfspace
+
+
+def _simplify(region, box, exclude=frozenset()):
+    """Remove half-spaces of a region that are implied within a box.
+
+    The returned region agrees with the original region everywhere within the
+    box, or is _ALWAYS or _NEVER if the region contains all or none of it.
+    Half-spaces of surfaces in ``exclude`` (given by id()) are never removed
+    and never used to remove others.
+
+    """
+    if isinstance(region, openmc.Halfspace):
+        return _simplify_halfspace(region, box, exclude)
+
+    elif isinstance(region, openmc.Complement):
+        return _simplify(_complement(region.node), box, exclude)
+
+    elif isinstance(region, openmc.Intersection):
+        # Each node only needs to hold within the bounds of the others. Nodes
+        # are removed one at a time so that a node is never removed on the
+        # strength of another node that has already been removed.
+        nodes = list(region)
+        i = 0
+        while i < len(nodes):
+            others = box
+            for j, node in enumerate(nodes):
+                if j != i:
+                    others = _intersect(others, _bounds(node, exclude))
+            node = _simplify(nodes[i], others, exclude)
+            if node is _NEVER:
+                return _NEVER
+            elif node is _ALWAYS:
+                del nodes[i]
+            else:
+                nodes[i] = node
+                i += 1
+        if not nodes:
+            return _ALWAYS
+        return nodes[0] if len(nodes) == 1 else openmc.Intersection(nodes)
+
+    elif isinstance(region, openmc.Union):
+        nodes = []
+        for node in region:
+            node = _simplify(node, box, exclude)
+            if node is _ALWAYS:
+                return _ALWAYS
+            elif node is not _NEVER:
+                nodes.append(node)
+        if not nodes:
+            return _NEVER
+        return nodes[0] if len(nodes) == 1 else openmc.Union(nodes)
+
+    raise TypeError('Unknown region type: {}'.format(type(region)))
+
+
+def _num_halfspaces(region):
+    return sum(1 for _ in halfspaces(region))
+
+
+def universe_bounds(geometry, exclude=()):
+    """Determine a box containing every point at which each universe is used.
+
+    A universe filling a cell is only ever reached within the bounds of that
+    cell's region (and of the universe containing the cell), and a universe
+    in a rectangular lattice only within one lattice element. The boxes are
+    given in the local coordinates of each universe.
+
+    Parameters
+    ----------
+    geometry : openmc.Geometry
+        Geometry to determine bounds for
+    exclude : iterable of openmc.Surface
+        Surfaces whose position should not be relied on, e.g., because they
+        will be moved later. Their half-spaces are treated as unbounded.
+
+    Returns
+    -------
+    dict
+        Dictionary mapping each openmc.Universe to a tuple of the lower-left
+        and upper-right corners of its bounding box as numpy.ndarray
+
+    """
+    graph = traverse(geometry).graph
+    exclude = {id(s) for s in exclude}
+    boxes = {}
+
+    def cell_box(cell):
+        if cell.rotation is not None:
+            return _infinite()
+        box = _intersect(universe_box(graph.owner[cell]),
+                         _bounds(cell.region, exclude))
+        if cell.translation is not None:
+            shift = np.asarray(cell.translation, dtype=float)
+            box = (box[0] - shift, box[1] - shift)
+        return box
+
+    def lattice_box(lattice):
+        if not isinstance(lattice, openmc.RectLattice):
+            return _infinite()
+        lower, upper = _infinite()
+        pitch = np.asarray(lattice.pitch, dtype=float)
+        lower[:len(pitch)] = -pitch/2
+        upper[:len(pitch)] = pitch/2
+        if len(pitch) == 2:
+            # Universes in a 2D lattice span the axial extent of the cells
+            # filled with the lattice
+            cells = [cell_box(c) for c in graph.lattice_cells[lattice]]
+            lower[2] = min(b[0][2] for b in cells)
+            upper[2] = max(b[1][2] for b in cells)
+        return lower, upper
+
+    def universe_box(univ):
+        if univ not in boxes:
+            box = None
+            if univ is not graph.root:
+                for container, _ in graph.parents[univ]:
+                    if isinstance(container, openmc.Cell):
+                        b = cell_box(container)
+                    else:
+                        b = lattice_box(container)
+                    box = b if box is None else _union(box, b)
+            boxes[univ] = _infinite() if box is None else box
+        return boxes[univ]
+
+    for univ in graph.universes:
+        universe_box(univ)
+    return boxes
+
+
+def simplify_regions(geometry, exclude=()):
+    """Remove half-spaces from cell regions that the cell's context implies.
+
+    A half-space in a cell region is redundant if every point at which the
+    universe containing the cell is used, given by :func:`universe_bounds`,
+    already lies on the correct side of the surface, taking into account the
+    other half-spaces intersected with it. For example, a half-space of a
+    z-plane below a stack segment or of a cylinder lying entirely outside a
+    lattice element is removed. Only axis-aligned planes and z-cylinders are
+    considered, and surfaces with a boundary condition are always kept.
+
+    Parameters
+    ----------
+    geometry : openmc.Geometry
+        Geometry to modify in place
+    exclude : iterable of openmc.Surface
+        Surfaces that will be moved later. Their half-spaces are kept, and
+        no half-space is removed on the strength of their current position.
+
+    Returns
+    -------
+    int
+        Number of half-spaces removed from cell regions
+
+    """
+    exclude = list(exclude)
+    graph = traverse(geometry).graph
+    boxes = universe_bounds(geometry, exclude)
+    exclude = {id(s) for s in exclude}
+
+    removed = 0
+    for cell, univ in graph.owner.items():
+        if cell.region is None:
+            continue
+        region = _simplify(cell.region, boxes[univ], exclude)
+
+        # Keep cells that span or miss the whole box as they are
+        if region is _ALWAYS or region is _NEVER:
+            continue
+
+        n = _num_halfspaces(cell.region) - _num_halfspaces(region)
+        if n > 0:
+            cell.region = region
+            removed += n
+    return removed
@@ -0,0 +1,204 @@
+"""Instantiate OpenMC Tallies needed for depletion."""
+
+import json
+from collections import OrderedDict
+
+import openmc
+
+from .index import ModelIndex
+from .traversal import traverse
+
+
+_DEPLETION_SCORES = ['(n,p)', '(n,a)', '(n,gamma)',
+                     'fission', '(n,2n)', '(n,3n)', '(n,4n)']
+
+
+def depletion_tallies(geometry, mode, distribmats=None):
+    """Create tallies of the reaction rates needed for depletion.
+
+    Parameters
+    ----------
+    geometry : openmc.Geometry
+        Geometry containing the fuel
+    mode : {'cell', 'mat'}
+        Whether to use distribcells or distribmats for tallies
+    distribmats : dict, optional
+        Material IDs reserved for differentiated cells as returned by
+        :func:`smr.export.distribmat_ids`. Only used for distribmats when the
+        differentiated materials are streamed rather than cloned.
+
+    Returns
+    -------
+    openmc.Tallies
+        Depletion tallies
+
+    """
+    tallies = openmc.Tallies()
+    index = ModelIndex(geometry)
+
+    # Extract all fuel materials
+    materials = index.get_materials('fuel')
+
+    # If using distribcells, create distribcell tally needed for depletion
+    if mode == 'cell':
+        # Extract all cells filled by a fuel material
+        for cell in index.get_fuel_cells():
+            tally = openmc.Tally(name='depletion tally')
+            tally.scores = list(_DEPLETION_SCORES)
+            tally.nuclides = cell.fill.get_nuclides()
+            tally.filters.append(openmc.DistribcellFilter([cell]))
+            tallies.append(tally)
+
+    # If using distribmats, create material tally needed for depletion
+    elif mode == 'mat':
+        tally = openmc.Tally(name='depletion tally')
+        tally.scores = list(_DEPLETION_SCORES)
+        tally.nuclides = materials[0].get_nuclides()
+        if distribmats:
+            # Differentiated materials only exist as reserved IDs
+            bins = [uid for _, ids in distribmats.values() for uid in ids]
+            tally.filters = [openmc.MaterialFilter(bins)]
+        else:
+            tally.filters = [openmc.MaterialFilter(materials)]
+        tallies.append(tally)
+
+    return tallies
+
+
+def merged_depletion_tallies(geometry):
+    """Create as few distribcell tallies as possible for depletion.
+
+    Rather than creating a tally with its own DistribcellFilter for every cell
+    filled with fuel, fuel cells that share a universe and have the same
+    nuclides are combined into a single tally. The tally uses a
+    DistribcellFilter on the one cell that the universe fills, which
+    distinguishes each instance of the universe, together with a CellFilter
+    over the fuel cells within it. Fuel cells whose universe is not used by
+    exactly one cell (e.g., it is placed directly in a lattice) get a tally of
+    their own as before.
+
+    Parameters
+    ----------
+    geometry : openmc.Geometry
+        Geometry containing the fuel
+
+    Returns
+    -------
+    tallies : openmc.Tallies
+        Depletion tallies
+    table : list of dict
+        For each tally, the ID of the tally (``'tally'``), the cell used in
+        its distribcell filter (``'distribcell'``), the IDs of the cells in its
+        cell filter (``'cells'``) and the number of instances of the
+        distribcell (``'instances'``). See :func:`split_merged_results`.
+
+    """
+    graph = traverse(geometry).graph
+    index = ModelIndex(geometry)
+
+    # Group fuel cells by the cell that their universe fills and by nuclides
+    groups = OrderedDict()
+    for cell in index.get_fuel_cells():
+        univ = graph.owner[cell]
+        parents = graph.parents[univ]
+        if len(parents) == 1 and isinstance(parents[0][0], openmc.Cell) \
+                and parents[0][1] == 1:
+            anchor = parents[0][0]
+        else:
+            anchor = None
+        nuclides = tuple(cell.fill.get_nuclides())
+        key = (anchor, nuclides) if anchor is not None else (cell, nuclides)
+        groups.setdefault(key, []).append(cell)
+
+    tallies = openmc.Tallies()
+    table = []
+    for (anchor, nuclides), cells in groups.items():
+        tally = openmc.Tally(name='depletion tally')
+        tally.scores = list(_DEPLETION_SCORES)
+        tally.nuclides = list(nuclides)
+        tally.filters.append(openmc.DistribcellFilter([anchor]))
+        if anchor is not cells[0]:
+            tally.filters.append(openmc.CellFilter(cells))
+        tallies.append(tally)
+
+        table.append({
+            'tally': tally.id,
+            'distribcell': anchor.id,
+            'cells': [c.id for c in cells],
+            'instances': graph.instances(anchor)
+        })
+
+    return tallies, table
+
+
+def count_bins(tallies, geometry):
+    """Count the number of scoring bins in a collection of tallies.
+
+    Parameters
+    ----------
+    tallies : iterable of openmc.Tally
+        Tallies to count bins for
+    geometry : openmc.Geometry
+        Geometry the tallies are defined on, needed to determine the number
+        of instances of a distribcell
+
+    Returns
+    -------
+    int
+        Total number of filter, nuclide and score combinations
+
+    """
+    traversal = traverse(geometry)
+    total = 0
+    for tally in tallies:
+        n = max(len(tally.nuclides), 1) * len(tally.scores)
+        for f in tally.filters:
+            if isinstance(f, openmc.DistribcellFilter):
+                cell = f.bins[0]
+                if not isinstance(cell, openmc.Cell):
+                    cell = traversal.get_all_cells()[cell]
+                n *= traversal.graph.instances(cell)
+            else:
+                n *= len(f.bins)
+        total += n
+    return total
+
+
+def export_tally_map(table, path='tally_map.json'):
+    """Write the table relating merged tally bins to cells to a JSON file.
+
+    Parameters
+    ----------
+    table : list of dict
+        Table as returned by :func:`merged_depletion_tallies`
+    path : str or pathlib.Path
+        Path of the file to write
+
+    """
+    with open(str(path), 'w') as fh:
+        json.dump(table, fh, indent=2)
+
+
+def split_merged_results(entry, values):
+    """Split results of a merged depletion tally back into individual cells.
+
+    Parameters
+    ----------
+    entry : dict
+        Row of the table returned by :func:`merged_depletion_tallies` for
+        the tally
+    values : numpy.ndarray
+        Tally results whose first axis is the filter bin, e.g., the ``mean``
+        attribute of the tally from a statepoint
+
+    Returns
+    -------
+    dict
+        Dictionary mapping a cell ID to an array of results indexed by the
+        distribcell instance of that cell, exactly as would have been tallied
+        with a DistribcellFilter on the cell alone
+
+    """
+    n_cells = len(entry['cells'])
+    values = values.reshape((entry['instances'], n_cells) + values.shape[1:])
+    return {cell_id: values[:, j] for j, cell_id in enumerate(entry['cells'])}
@@ -0,0 +1,259 @@
+"""Memoized traversal of a geometry.
+
+Each call to Geometry.get_all_cells(), get_all_materials() and friends walks
+the entire universe tree again, which for the full core is repeated many
+times over the course of a build. The functions here share a single walk of
+the geometry (see :class:`UniverseGraph`) between all such queries. The
+cached results must be invalidated explicitly with :func:`invalidate`
+whenever cells of the geometry are re-filled, e.g., when materials are
+differentiated.
+
+"""
+
+from collections import OrderedDict, defaultdict
+from weakref import WeakKeyDictionary
+
+import numpy as np
+import openmc
+
+
+_TRAVERSALS = WeakKeyDictionary()
+
+
+def _flatten(universes):
+    """Yield each position of a (possibly ragged) lattice universe array."""
+    if isinstance(universes, np.ndarray):
+        yield from universes.flat
+    else:
+        for item in universes:
+            if isinstance(item, openmc.Universe):
+                yield item
+            else:
+                yield from _flatten(item)
+
+
+class UniverseGraph:
+    """Parent/child relations between the universes of a geometry.
+
+    Parameters
+    ----------
+    geometry : openmc.Geometry
+        Geometry to build the graph for
+
+    Attributes
+    ----------
+    root : openmc.Universe
+        Root universe of the geometry
+    universes : list of openmc.Universe
+        Every universe in the geometry, in the order it was first reached
+    owner : dict
+        Dictionary mapping an openmc.Cell to the universe that contains it
+    parents : dict
+        Dictionary mapping an openmc.Universe to a list of (container, count)
+        tuples where the container is an openmc.Cell or openmc.Lattice filled
+        with the universe and count is the number of times it appears in it
+    lattice_cells : dict
+        Dictionary mapping an openmc.Lattice to the cells that it fills
+
+    """
+
+    def __init__(self, geometry):
+        self.root = geometry.root_universe
+        self.universes = []
+        self.owner = {}
+        self.parents = defaultdict(list)
+        self.lattice_cells = defaultdict(list)
+        self._instances = {}
+
+        visited = set()
+        stack = [self.root]
+        while stack:
+            univ = stack.pop()
+            if univ in visited:
+                continue
+            visited.add(univ)
+            self.universes.append(univ)
+
+            for cell in univ.cells.values():
+                self.owner[cell] = univ
+                fill = cell.fill
+                if isinstance(fill, openmc.Universe):
+                    self.parents[fill].append((cell, 1))
+                    stack.append(fill)
+                elif isinstance(fill, openmc.Lattice):
+                    if fill not in self.lattice_cells:
+                        counts = defaultdict(int)
+                        for u in _flatten(fill.universes):
+                            counts[u] += 1
+                        for u, n in counts.items():
+                            self.parents[u].append((fill, n))
+                            stack.append(u)
+                    self.lattice_cells[fill].append(cell)
+
+    def instances(self, obj):
+        """Return the number of instances of a universe, cell or lattice.
+
+        Parameters
+        ----------
+        obj : openmc.Universe, openmc.Cell, or openmc.Lattice
+            Object in the geometry
+
+        Returns
+        -------
+        int
+            Number of times the object appears in the geometry
+
+        """
+        if isinstance(obj, openmc.Cell):
+            return self.instances(self.owner[obj])
+
+        if obj not in self._instances:
+            if isinstance(obj, openmc.Lattice):
+                count = sum(self.instances(c) for c in self.lattice_cells[obj])
+            elif obj is self.root:
+                count = 1
+            else:
+                count = sum(n*self.instances(parent)
+                            for parent, n in self.parents[obj])
+            self._instances[obj] = count
+        return self._instances[obj]
+
+
+class GeometryTraversal:
+    """Cached results of traversing a geometry.
+
+    The results of each query are computed on first use and returned as-is
+    on subsequent calls, so they should not be modified by the caller.
+
+    Parameters
+    ----------
+    geometry : openmc.Geometry
+        Geometry to traverse
+
+    """
+
+    def __init__(self, geometry):
+        self.geometry = geometry
+        self._graph = None
+        self._cells = None
+        self._material_cells = None
+        self._materials = None
+
+    @property
+    def graph(self):
+        """UniverseGraph of the geometry"""
+        if self._graph is None:
+            self._graph = UniverseGraph(self.geometry)
+        return self._graph
+
+    def get_all_cells(self):
+        """Return all cells in the geometry.
+
+        Returns
+        -------
+        collections.OrderedDict
+            Dictionary mapping cell IDs to openmc.Cell instances, sorted by ID
+
+        """
+        if self._cells is None:
+            cells = sorted(self.graph.owner, key=lambda c: c.id)
+            self._cells = OrderedDict((c.id, c) for c in cells)
+        return self._cells
+
+    def get_all_material_cells(self):
+        """Return all cells in the geometry filled by one or more materials.
+
+        Returns
+        -------
+        collections.OrderedDict
+            Dictionary mapping cell IDs to openmc.Cell instances, sorted by ID
+
+        """
+        if self._material_cells is None:
+            self._material_cells = OrderedDict(
+                (uid, c) for uid, c in self.get_all_cells().items()
+                if c.fill_type in ('material', 'distribmat'))
+        return self._material_cells
+
+    def get_all_materials(self):
+        """Return all materials in the geometry.
+
+        Returns
+        -------
+        collections.OrderedDict
+            Dictionary mapping material IDs to openmc.Material instances,
+            sorted by ID
+
+        """
+        if self._materials is None:
+            materials = {}
+            for cell in self.get_all_material_cells().values():
+                fill = cell.fill
+                for mat in (fill if isinstance(fill, list) else [fill]):
+                    if mat is not None:
+                        materials[mat.id] = mat
+            self._materials = OrderedDict(sorted(materials.items()))
+        return self._materials
+
+    def get_materials_by_name(self, name, case_sensitive=False,
+                              matching=False):
+        """Return materials in the geometry with a given name.
+
+        Parameters
+        ----------
+        name : str
+            The name to search for
+        case_sensitive : bool
+            Whether to distinguish upper and lower case letters in the name
+        matching : bool
+            Whether the names must match completely (True) or only contain
+            the given name (False)
+
+        Returns
+        -------
+        list of openmc.Material
+            Materials matching the name, sorted by ID
+
+        """
+        if not case_sensitive:
+            name = name.lower()
+
+        materials = []
+        for mat in self.get_all_materials().values():
+            mat_name = mat.name if case_sensitive else mat.name.lower()
+            if mat_name == name or (not matching and name in mat_name):
+                materials.append(mat)
+        return materials
+
+
+def traverse(geometry):
+    """Return the (cached) traversal of a geometry.
+
+    Parameters
+    ----------
+    geometry : openmc.Geometry
+        Geometry to traverse
+
+    Returns
+    -------
+    GeometryTraversal
+        Traversal shared by all callers until :func:`invalidate` is called
+
+    """
+    if geometry not in _TRAVERSALS:
+        _TRAVERSALS[geometry] = GeometryTraversal(geometry)
+    return _TRAVERSALS[geometry]
+
+
+def invalidate(geometry):
+    """Discard the cached traversal of a geometry.
+
+    This must be called after cells in the geometry are re-filled.
+
+    Parameters
+    ----------
+    geometry : openmc.Geometry
+        Geometry that was modified
+
+    """
+    _TRAVERSALS.pop(geometry, None)
@@ -0,0 +1,160 @@
+"""Volumes of the burnable regions of subdivided fuel.
+
+Fuel pellets are divided into rings of equal area and axial segments of equal
+height (see :func:`smr.pins.pin_universes`), so the volume of each region is
+known exactly and no stochastic volume calculation is needed to determine it.
+
+"""
+
+from math import pi
+
+import numpy as np
+
+from .simplify import cylinder_coefficients, halfspaces, plane_axis
+from .surfaces import pellet_OR, bottom_fuel_stack, top_active_core
+
+
+def fuel_ring_radii(num_rings):
+    """Return the radii bounding equal-area rings of a fuel pellet.
+
+    Parameters
+    ----------
+    num_rings : int
+        Number of annular regions in fuel
+
+    Returns
+    -------
+    numpy.ndarray
+        Radii in cm from 0 to the pellet outer radius, of length
+        ``num_rings + 1``
+
+    """
+    return np.sqrt(np.arange(num_rings + 1)*pellet_OR**2/num_rings)
+
+
+def fuel_axial_planes(num_axial):
+    """Return the heights bounding axial segments of the active fuel.
+
+    Parameters
+    ----------
+    num_axial : int
+        Number of axial subdivisions in fuel
+
+    Returns
+    -------
+    numpy.ndarray
+        Heights in cm from the bottom to the top of the active fuel, of length
+        ``num_axial + 1``
+
+    """
+    return np.linspace(bottom_fuel_stack, top_active_core, num_axial + 1)
+
+
+def fuel_region_volumes(num_rings, num_axial):
+    """Return the volume of each region of a subdivided fuel pellet stack.
+
+    Parameters
+    ----------
+    num_rings : int
+        Number of annular regions in fuel
+    num_axial : int
+        Number of axial subdivisions in fuel
+
+    Returns
+    -------
+    numpy.ndarray
+        Volume in cm^3 of each region indexed by axial segment (from the
+        bottom) and ring (from the center)
+
+    """
+    areas = pi*np.diff(fuel_ring_radii(num_rings)**2)
+    heights = np.diff(fuel_axial_planes(num_axial))
+    return np.outer(heights, areas)
+
+
+def _index(bounds, value, tolerance=1e-8):
+    """Return the index of the bound matching a value."""
+    i = np.abs(bounds - value).argmin()
+    if abs(bounds[i] - value) > tolerance:
+        raise ValueError('{} does not bound a region of the subdivided '
+                         'fuel.'.format(value))
+    return int(i)
+
+
+def fuel_cell_regions(cells, num_rings, num_axial):
+    """Determine the ring and axial segment of fuel cells.
+
+    The ring and axial segment of each cell are found from the cylinders and
+    z-planes bounding its region.
+
+    Parameters
+    ----------
+    cells : iterable of openmc.Cell
+        Cells filled with fuel, e.g., from
+        :meth:`smr.index.ModelIndex.get_fuel_cells`
+    num_rings : int
+        Number of annular regions in fuel
+    num_axial : int
+        Number of axial subdivisions in fuel
+
+    Returns
+    -------
+    dict
+        Dictionary mapping each openmc.Cell to a tuple of the index of its
+        axial segment (from the bottom) and of its ring (from the center).
+        The axial index is None for a cell without an axial bound, e.g., a
+        ring universe repeated in an axial lattice or fuel that is not
+        subdivided axially.
+
+    """
+    radii = fuel_ring_radii(num_rings)
+    planes = fuel_axial_planes(num_axial)
+
+    regions = {}
+    for cell in cells:
+        ring = num_rings - 1
+        axial = None
+        for halfspace in halfspaces(cell.region):
+            # A region lies below or inside of the bound with the same index
+            # and above or outside of the bound below it
+            offset = 1 if halfspace.side == '-' else 0
+            axis, position = plane_axis(halfspace.surface)
+            cylinder = cylinder_coefficients(halfspace.surface)
+            if axis == 2:
+                axial = _index(planes, position) - offset
+            elif cylinder is not None:
+                ring = _index(radii, cylinder[2]) - offset
+        regions[cell] = (axial, ring)
+    return regions
+
+
+def fuel_cell_volumes(cells, num_rings, num_axial):
+    """Determine the volume of each instance of fuel cells.
+
+    Each cell is located within the subdivided fuel by
+    :func:`fuel_cell_regions`. A cell without an axial bound spans a single
+    axial segment, all of which have the same height. Every instance of a
+    cell has the same volume, which is the volume to give each material the
+    cell is filled with once it is differentiated.
+
+    Parameters
+    ----------
+    cells : iterable of openmc.Cell
+        Cells filled with fuel, e.g., from
+        :meth:`smr.index.ModelIndex.get_fuel_cells`
+    num_rings : int
+        Number of annular regions in fuel
+    num_axial : int
+        Number of axial subdivisions in fuel
+
+    Returns
+    -------
+    dict
+        Dictionary mapping each openmc.Cell to the volume in cm^3 of one of
+        its instances
+
+    """
+    region_volumes = fuel_region_volumes(num_rings, num_axial)
+    regions = fuel_cell_regions(cells, num_rings, num_axial)
+    return {cell: float(region_volumes[0 if axial is None else axial, ring])
+            for cell, (axial, ring) in regions.items()}
@@ -0,0 +1,420 @@
+"""Group instances of the fuel into depletion zones.
+
+Differentiating every instance of every fuel cell gives each ring, axial
+segment and pin of the core its own depletable material, and hence its own
+tally bin and its own set of nuclide densities to solve for. Grouping the
+instances into zones that share a material trades spatial resolution of the
+burnup for far fewer materials. Instances are only ever grouped with others
+of the same fuel, so a zone spanning several enrichments gets a material for
+each.
+
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+import openmc
+
+from .index import ModelIndex
+from .tallies import _DEPLETION_SCORES
+from .traversal import traverse
+from .volumes import fuel_axial_planes, fuel_cell_regions, fuel_cell_volumes
+
+
+SCHEMES = ('assembly', 'ring', 'axial', 'kmeans')
+
+
+def _lattice_elements(lattice):
+    """Yield the universe, center and radial index of each lattice element.
+
+    Elements are visited in the order that OpenMC numbers the instances of the
+    cells within them: x varying fastest, then y from the bottom row, then z.
+
+    """
+    if not isinstance(lattice, openmc.RectLattice):
+        raise TypeError('Only rectangular lattices are supported.')
+    universes = np.asarray(lattice.universes)
+    if universes.ndim == 2:
+        universes = universes[np.newaxis]
+
+    # Universes in a 2D lattice are not shifted axially
+    pitch = np.zeros(3)
+    pitch[:len(lattice.pitch)] = lattice.pitch
+    lower_left = np.zeros(3)
+    lower_left[:len(lattice.lower_left)] = lattice.lower_left
+
+    nz, ny, nx = universes.shape
+    for k in range(nz):
+        for j in range(ny):
+            for i in range(nx):
+                center = lower_left + pitch*(np.array([i, j, k]) + 0.5)
+                yield universes[k, ny - 1 - j, i], center, j*nx + i
+
+
+def _instance_origins(geometry, targets):
+    """Determine where each instance of some universes is placed.
+
+    Only the branches of the geometry leading to one of the universes are
+    walked. The instances of each universe are listed in the order that OpenMC
+    numbers them.
+
+    Returns
+    -------
+    dict
+        Dictionary mapping each universe to a list of tuples of the origin of
+        the instance, whether its axial position is fixed by a 3D lattice and
+        the index of the element of the outermost lattice containing it
+
+    """
+    graph = traverse(geometry).graph
+
+    # Find the universes and lattices that contain one of the targets
+    relevant = set()
+    stack = list(targets)
+    while stack:
+        obj = stack.pop()
+        if obj in relevant:
+            continue
+        relevant.add(obj)
+        if isinstance(obj, openmc.Lattice):
+            stack.extend(graph.owner[c] for c in graph.lattice_cells[obj])
+        else:
+            for container, _ in graph.parents[obj]:
+                if isinstance(container, openmc.Cell):
+                    stack.append(graph.owner[container])
+                else:
+                    stack.append(container)
+
+    origins = {univ: [] for univ in targets}
+
+    def visit(univ, origin, fixed_z, outer):
+        if univ in origins:
+            origins[univ].append((origin, fixed_z, outer))
+        for cell in univ.cells.values():
+            fill = cell.fill
+            # Cells filled with materials, including lists of differentiated
+            # materials (which cannot be hashed), contain no universes
+            if not isinstance(fill, (openmc.Universe, openmc.Lattice)) or \
+                    fill not in relevant:
+                continue
+            shift = origin
+            if cell.translation is not None:
+                shift = origin + np.asarray(cell.translation, dtype=float)
+            if isinstance(fill, openmc.Universe):
+                visit(fill, shift, fixed_z, outer)
+            else:
+                axial = len(fill.pitch) == 3
+                for u, center, i in _lattice_elements(fill):
+                    if u in relevant:
+                        visit(u, shift + center, fixed_z or axial,
+                              i if outer is None else outer)
+
+    visit(graph.root, np.zeros(3), False, None)
+
+    for univ, instances in origins.items():
+        if len(instances) != graph.instances(univ):
+            raise RuntimeError('Found {} of the {} instances of universe {}.'
+                               .format(len(instances), graph.instances(univ),
+                                       univ.id))
+    return origins
+
+
+def _nearest(points, centers, chunk=100000):
+    """Return the index of the center nearest to each point."""
+    labels = np.empty(len(points), dtype=int)
+    for start in range(0, len(points), chunk):
+        p = points[start:start + chunk]
+        d = ((p[:, np.newaxis, :] - centers[np.newaxis])**2).sum(axis=2)
+        labels[start:start + chunk] = d.argmin(axis=1)
+    return labels
+
+
+def _kmeans(points, k, seed, sample=20000, max_iterations=100):
+    """Cluster points with Lloyd's algorithm and k-means++ seeding.
+
+    The centers are found from a random sample of the points, after which
+    every point is assigned to its nearest center.
+
+    """
+    rng = np.random.RandomState(seed)
+    fit = points
+    if len(points) > sample:
+        fit = points[rng.choice(len(points), sample, replace=False)]
+
+    # Choose each initial center with probability proportional to the squared
+    # distance from the nearest center already chosen
+    centers = [fit[rng.randint(len(fit))]]
+    distances = ((fit - centers[0])**2).sum(axis=1)
+    for _ in range(1, k):
+        if distances.sum() == 0.:
+            break
+        center = fit[rng.choice(len(fit), p=distances/distances.sum())]
+        centers.append(center)
+        distances = np.minimum(distances, ((fit - center)**2).sum(axis=1))
+    centers = np.array(centers)
+
+    labels = None
+    for _ in range(max_iterations):
+        new_labels = _nearest(fit, centers)
+        if labels is not None and np.array_equal(labels, new_labels):
+            break
+        labels = new_labels
+        for j in range(len(centers)):
+            members = fit[labels == j]
+            if len(members) > 0:
+                centers[j] = members.mean(axis=0)
+    return _nearest(points, centers)
+
+
+class FuelInstances:
+    """Position and properties of every instance of the fuel cells.
+
+    The instances of all fuel cells are concatenated, with those of each cell
+    in the order of its distribcell instances.
+
+    Parameters
+    ----------
+    geometry : openmc.Geometry
+        Geometry containing the fuel, whose fuel cells have not yet been
+        differentiated
+    num_rings : int
+        Number of annular regions in fuel
+    num_axial : int
+        Number of axial subdivisions in fuel
+
+    Attributes
+    ----------
+    cells : list of openmc.Cell
+        Cells filled with fuel
+    offsets : numpy.ndarray
+        Index of the first instance of each cell, followed by the total number
+        of instances
+    position : numpy.ndarray
+        Center of the pin (x, y) and axial segment (z) of each instance in cm
+    ring : numpy.ndarray
+        Index of the ring of each instance, from the center of the pin
+    axial : numpy.ndarray
+        Index of the axial segment of each instance, from the bottom
+    assembly : numpy.ndarray
+        Index of the element of the core lattice containing each instance
+    enrichment : numpy.ndarray
+        Enrichment of the fuel of each instance in weight percent
+    volume : numpy.ndarray
+        Volume of each instance in cm^3
+
+    """
+
+    def __init__(self, geometry, num_rings, num_axial):
+        graph = traverse(geometry).graph
+        index = ModelIndex(geometry)
+        enrichments = {cell: float(enrichment.rstrip('%'))
+                       for (enrichment, _), cells in index.fuel_cells.items()
+                       for cell in cells}
+        self.cells = index.get_fuel_cells()
+        self.num_rings = num_rings
+        self.num_axial = num_axial
+
+        regions = fuel_cell_regions(self.cells, num_rings, num_axial)
+        volumes = fuel_cell_volumes(self.cells, num_rings, num_axial)
+        origins = _instance_origins(
+            geometry, {graph.owner[c] for c in self.cells})
+        planes = fuel_axial_planes(num_axial)
+        centers = (planes[:-1] + planes[1:])/2
+
+        counts = [graph.instances(c) for c in self.cells]
+        self.offsets = np.concatenate(([0], np.cumsum(counts)))
+        n = self.offsets[-1]
+        self.position = np.empty((n, 3))
+        self.ring = np.empty(n, dtype=int)
+        self.axial = np.empty(n, dtype=int)
+        self.assembly = np.empty(n, dtype=int)
+        self.enrichment = np.empty(n)
+        self.volume = np.empty(n)
+
+        for i, cell in enumerate(self.cells):
+            s = slice(self.offsets[i], self.offsets[i + 1])
+            instances = origins[graph.owner[cell]]
+            origin = np.array([o for o, _, _ in instances])
+            fixed_z = np.array([f for _, f, _ in instances])
+            axial, ring = regions[cell]
+
+            if axial is not None:
+                axial = np.full(len(instances), axial)
+            elif fixed_z.all():
+                # The axial segment is given by the position in the lattice
+                axial = np.searchsorted(planes, origin[:, 2]) - 1
+                axial = np.clip(axial, 0, num_axial - 1)
+            elif num_axial == 1:
+                axial = np.zeros(len(instances), dtype=int)
+            else:
+                raise ValueError('Cannot determine the axial segment of '
+                                 'cell {}.'.format(cell.id))
+
+            self.position[s, :2] = origin[:, :2]
+            self.position[s, 2] = centers[axial]
+            self.ring[s] = ring
+            self.axial[s] = axial
+            self.assembly[s] = [o for _, _, o in instances]
+            self.enrichment[s] = enrichments[cell]
+            self.volume[s] = volumes[cell]
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def zones(self, scheme, num_zones=None, seed=1):
+        """Assign each instance to a depletion zone.
+
+        Parameters
+        ----------
+        scheme : {'assembly', 'ring', 'axial', 'kmeans'}
+            How instances are grouped: 'assembly' groups whole assemblies by
+            their distance from the center of the core, 'ring' groups
+            adjacent rings of every pin (e.g., center and edge for two
+            zones), 'axial' groups adjacent axial segments into bands, and
+            'kmeans' clusters instances by position and enrichment
+        num_zones : int, optional
+            Number of zones. For the 'assembly' scheme, defaults to one zone
+            per assembly.
+        seed : int
+            Seed of the random number generator used for k-means clustering
+
+        Returns
+        -------
+        numpy.ndarray
+            Index of the zone of each instance
+
+        """
+        if scheme == 'assembly':
+            assemblies, inverse = np.unique(self.assembly, return_inverse=True)
+            if num_zones is None or num_zones >= len(assemblies):
+                return inverse
+            # Group assemblies with similar distances from the center
+            first = np.array([np.flatnonzero(inverse == i)[0]
+                              for i in range(len(assemblies))])
+            radius = np.hypot(*self.position[first, :2].T)
+            order = np.argsort(radius, kind='mergesort')
+            group = np.empty(len(assemblies), dtype=int)
+            for i, members in enumerate(np.array_split(order, num_zones)):
+                group[members] = i
+            return group[inverse]
+
+        if num_zones is None:
+            raise ValueError('The number of zones must be given for the "{}" '
+                             'scheme.'.format(scheme))
+        if scheme == 'ring':
+            return self.ring*min(num_zones, self.num_rings)//self.num_rings
+        elif scheme == 'axial':
+            return self.axial*min(num_zones, self.num_axial)//self.num_axial
+        elif scheme == 'kmeans':
+            # Cluster the distinct combinations of position and enrichment,
+            # each scaled to unit variance, rather than every ring of them
+            features = np.column_stack((self.position, self.enrichment))
+            points, inverse = np.unique(features, axis=0, return_inverse=True)
+            std = points.std(axis=0)
+            std[std < 1e-6] = 1.
+            k = min(num_zones, len(points))
+            return _kmeans(points/std, k, seed)[inverse.ravel()]
+        raise ValueError('Unknown zone scheme "{}".'.format(scheme))
+
+    def _material_keys(self, zones):
+        """Return the index of the material each instance is filled with."""
+        source = {}
+        keys = np.empty(len(self), dtype=int)
+        for i, cell in enumerate(self.cells):
+            s = slice(self.offsets[i], self.offsets[i + 1])
+            keys[s] = source.setdefault(cell.fill, len(source))
+        return keys*(zones.max() + 1) + zones
+
+    def num_materials(self, zones):
+        """Return the number of depletable materials needed for some zones.
+
+        Parameters
+        ----------
+        zones : numpy.ndarray
+            Index of the zone of each instance, as returned by :meth:`zones`
+
+        Returns
+        -------
+        int
+            Number of distinct combinations of zone and fuel
+
+        """
+        return len(np.unique(self._material_keys(zones)))
+
+    def differentiate(self, zones):
+        """Fill each fuel cell with the material of the zone of each instance.
+
+        Every instance in the same zone filled with the same fuel shares one
+        clone of that fuel, whose volume is the total volume of those
+        instances.
+
+        Parameters
+        ----------
+        zones : numpy.ndarray
+            Index of the zone of each instance, as returned by :meth:`zones`
+
+        Returns
+        -------
+        list of openmc.Material
+            Material of each zone
+
+        """
+        keys = self._material_keys(zones)
+        unique, inverse = np.unique(keys, return_inverse=True)
+        inverse = inverse.ravel()
+        volumes = np.bincount(inverse, weights=self.volume)
+
+        materials = np.empty(len(unique), dtype=object)
+        for i, cell in enumerate(self.cells):
+            s = slice(self.offsets[i], self.offsets[i + 1])
+            for j in np.unique(inverse[s]):
+                if materials[j] is None:
+                    materials[j] = cell.fill.clone()
+                    materials[j].volume = volumes[j]
+            cell.fill = materials[inverse[s]].tolist()
+        return materials.tolist()
+
+
+def zone_report(instances, scheme, zone_counts, nuclides, seed=1):
+    """Estimate the size of a depletion problem for numbers of zones.
+
+    Parameters
+    ----------
+    instances : FuelInstances
+        Instances of the fuel cells
+    scheme : str
+        Zone scheme (see :meth:`FuelInstances.zones`)
+    zone_counts : iterable of int
+        Numbers of zones to report on
+    nuclides : int
+        Number of nuclides tallied in each material
+    seed : int
+        Seed of the random number generator used for k-means clustering
+
+    Returns
+    -------
+    list of collections.OrderedDict
+        For each number of zones, the number of materials, the number of
+        tally bins, and the estimated memory in bytes of the depletion tally
+        results (three double precision values per bin) and of the nuclide
+        densities of the materials. The first row is for differentiating
+        every instance.
+
+    """
+    scores = len(_DEPLETION_SCORES)
+
+    def row(zones, num_materials):
+        bins = num_materials*nuclides*scores
+        return OrderedDict([
+            ('zones', zones),
+            ('materials', num_materials),
+            ('tally_bins', bins),
+            ('tally_memory', 24*bins),
+            ('material_memory', 12*num_materials*nuclides)
+        ])
+
+    rows = [row(len(instances), len(instances))]
+    for k in zone_counts:
+        zones = instances.zones(scheme, k, seed)
+        rows.append(row(len(np.unique(zones)), instances.num_materials(zones)))
+    return rows
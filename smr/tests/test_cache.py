@@ -0,0 +1,94 @@
+import os
+
+import pytest
+
+pytest.importorskip('openmc')
+
+from smr.cache import BuildCache, BuildManifest, build_key, input_key
+
+
+def write_files(directory, contents):
+    directory.mkdir(exist_ok=True)
+    for name, text in contents.items():
+        (directory / name).write_text(text)
+
+
+def test_build_key():
+    key = build_key({'rings': 10, 'axial': 196})
+    assert key == build_key({'axial': 196, 'rings': 10})
+    assert key != build_key({'rings': 10, 'axial': 49})
+
+
+def test_input_key(tmp_path):
+    script = tmp_path / 'build.py'
+    script.write_text('a = 1\n')
+    key = input_key({'rings': 10}, ['materials'], str(script))
+    assert key == input_key({'rings': 10}, ['materials'], str(script))
+    assert key != input_key({'rings': 10}, ['materials', 'surfaces'],
+                            str(script))
+    assert key != input_key({'rings': 3}, ['materials'], str(script))
+    script.write_text('a = 2\n')
+    assert key != input_key({'rings': 10}, ['materials'], str(script))
+
+
+@pytest.mark.parametrize('link', [True, False])
+def test_store_fetch(tmp_path, link):
+    cache = BuildCache(tmp_path / 'cache', link=link)
+    contents = {'materials.xml': '<materials />', 'geometry.xml': '<g />'}
+    write_files(tmp_path / 'a', contents)
+
+    assert not cache.fetch('abcd', tmp_path / 'b', contents)
+    cache.store('abcd', tmp_path / 'a', contents)
+
+    # Files already in the directory are replaced
+    write_files(tmp_path / 'b', {'materials.xml': 'old'})
+    assert cache.fetch('abcd', tmp_path / 'b', contents)
+    for name, text in contents.items():
+        path = tmp_path / 'b' / name
+        assert path.read_text() == text
+        assert (os.stat(str(path)).st_nlink > 1) == link
+
+    # Missing any file of a build is a miss
+    assert not cache.fetch('abcd', tmp_path / 'c',
+                           list(contents) + ['tallies.xml'])
+
+
+def test_store_fetch_files(tmp_path):
+    cache = BuildCache(tmp_path / 'cache')
+    keys = {'geometry.xml': 'aaaa', 'tallies.xml': 'aaaa',
+            'settings.xml': 'bbbb'}
+    write_files(tmp_path / 'a', {f: f for f in keys})
+    cache.store_files(keys, tmp_path / 'a')
+
+    # Files with the same key are fetched together or not at all
+    (cache.directory / 'aa' / 'aaaa' / 'tallies.xml').unlink()
+    (tmp_path / 'b').mkdir()
+    fetched = cache.fetch_files(dict(keys, **{'plots.xml': 'cccc'}),
+                                tmp_path / 'b')
+    assert fetched == {'settings.xml'}
+    assert not (tmp_path / 'b' / 'geometry.xml').exists()
+
+
+def test_evict(tmp_path):
+    cache = BuildCache(tmp_path / 'cache', max_size=25)
+    write_files(tmp_path / 'a', {'a.xml': 10*'a', 'b.xml': 10*'b'})
+    cache.store('aaaa', tmp_path / 'a', ['a.xml'])
+    cache.store('bbbb', tmp_path / 'a', ['b.xml'])
+    os.utime(str(cache.directory / 'aa' / 'aaaa'), (0, 0))
+    cache.store('cccc', tmp_path / 'a', ['a.xml'])
+    assert [e.name for _, _, e in cache.entries()] == ['bbbb', 'cccc']
+
+
+def test_manifest(tmp_path):
+    write_files(tmp_path, {'materials.xml': '', 'geometry.xml': ''})
+    manifest = BuildManifest(tmp_path)
+    keys = {'materials.xml': 'aaaa', 'geometry.xml': 'bbbb'}
+    assert manifest.stale(keys) == set(keys)
+    manifest.update(keys)
+
+    manifest = BuildManifest(tmp_path)
+    assert manifest.stale(keys) == set()
+    assert manifest.stale(dict(keys, **{'materials.xml': 'cccc'})) == \
+        {'materials.xml'}
+    (tmp_path / 'geometry.xml').unlink()
+    assert manifest.stale(keys) == {'geometry.xml'}
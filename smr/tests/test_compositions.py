@@ -0,0 +1,106 @@
+import io
+import xml.etree.ElementTree as ET
+
+import pytest
+
+np = pytest.importorskip('numpy')
+openmc = pytest.importorskip('openmc')
+
+from smr.compositions import Compositions
+
+
+def toy_compositions(path=None):
+    """Return compositions of two fuels with different nuclides."""
+    fuel = openmc.Material(name='fuel')
+    fuel.set_density('g/cm3', 10.3)
+    fuel.add_nuclide('U235', 0.04)
+    fuel.add_nuclide('U238', 0.96)
+    fuel.add_nuclide('O16', 2.0)
+    gad = openmc.Material(name='gad')
+    gad.set_density('g/cm3', 10.2)
+    gad.add_nuclide('U235', 0.03)
+    gad.add_nuclide('U238', 0.97)
+    gad.add_nuclide('O16', 2.0)
+    gad.add_nuclide('Gd157', 0.05)
+
+    fuel_cell = openmc.Cell()
+    gad_cell = openmc.Cell()
+    distribmats = {fuel_cell: (fuel, range(10, 13)),
+                   gad_cell: (gad, range(13, 15))}
+    volumes = {fuel_cell: 0.5, gad_cell: [0.25, 0.75]}
+    groups = {fuel_cell: ['b', 'a', 'b'], gad_cell: ['a', 'b']}
+    comp = Compositions.from_distribmats(distribmats, volumes, groups, path)
+    return comp
+
+
+def test_groups():
+    comp = toy_compositions()
+    assert comp.nuclides == ['U235', 'U238', 'O16', 'Gd157']
+    assert list(comp.groups) == ['a', 'b']
+    assert comp.ids[comp.groups['a']].tolist() == [11, 13]
+    assert comp.ids[comp.groups['b']].tolist() == [10, 12, 14]
+
+    # The densities of a group are a view of the array
+    view = comp['b']
+    assert np.shares_memory(view, comp.densities)
+    view[:, comp.index['O16']] = 1.
+    assert comp.densities[2:, comp.index['O16']].tolist() == [1., 1., 1.]
+
+
+def test_set_densities():
+    comp = toy_compositions()
+    u235 = comp.index['U235']
+    before = comp.densities.copy()
+
+    comp.set_densities(['U235'], 1., slice(0, 2))
+    assert comp.densities[:2, u235].tolist() == [1., 1.]
+    comp.set_densities(['U235', 'O16'], [[2., 3.], [4., 5.]],
+                       np.array([4, 2]))
+    assert comp.densities[[2, 4], u235].tolist() == [4., 2.]
+    assert comp.densities[[2, 4], comp.index['O16']].tolist() == [5., 3.]
+    comp.set_densities(['Gd157'], [[6.], [7.], [8.]], 'b')
+    assert comp['b'][:, comp.index['Gd157']].tolist() == [6., 7., 8.]
+
+    # Other nuclides are left unchanged
+    u238 = comp.index['U238']
+    np.testing.assert_array_equal(comp.densities[:, u238], before[:, u238])
+
+
+def test_flush_open(tmp_path):
+    path = tmp_path / 'compositions.npy'
+    comp = toy_compositions(path)
+    comp.set_densities(['Gd157'], 0., 'a')
+    comp.flush()
+
+    stored = Compositions.open(path)
+    assert stored.nuclides == comp.nuclides
+    np.testing.assert_array_equal(stored.densities, comp.densities)
+    np.testing.assert_array_equal(stored.ids, comp.ids)
+    np.testing.assert_array_equal(stored.volumes, comp.volumes)
+    np.testing.assert_array_equal(stored.template, comp.template)
+    assert stored.templates == ['fuel', 'gad']
+    assert stored.groups == comp.groups
+    assert isinstance(stored.densities, np.memmap)
+
+
+def test_write_xml():
+    comp = toy_compositions()
+    comp.set_densities(['U235'], 0.5, 'a')
+    fh = io.StringIO()
+    fh.write('<materials>\n')
+    comp.write_xml(fh)
+    fh.write('</materials>\n')
+
+    root = ET.fromstring(fh.getvalue())
+    assert [int(e.get('id')) for e in root] == comp.ids.tolist()
+    for i, element in enumerate(root):
+        template = comp.templates[comp.template[i]]
+        assert element.get('name') == template.name
+        assert float(element.get('volume')) == comp.volumes[i]
+        densities = {n.get('name'): float(n.get('ao'))
+                     for n in element.iter('nuclide')}
+
+        # Only the nuclides of the template of each material are written
+        assert set(densities) == set(template.get_nuclide_atom_densities())
+        for nuc, density in densities.items():
+            assert density == comp.densities[i, comp.index[nuc]]
@@ -0,0 +1,70 @@
+import re
+
+import pytest
+
+pytest.importorskip('openmc')
+
+from smr.control_rods import aro_step, bank_bottom, banks, patch_geometry
+from smr.surfaces import bank_bot, bank_top, make_surfaces, step0H, step102H
+
+
+GEOMETRY = """<?xml version='1.0' encoding='utf-8'?>
+<geometry>
+  <cell id="1" material="1" region="-1 2 -3" universe="1" />
+  <cell id="2" material="2" region="-4 5" universe="1" />
+  <surface coeffs="0.0 0.0 0.5" id="1" type="z-cylinder" />
+  <surface coeffs="{}" id="2" name="CR bank A bottom" type="z-plane" />
+  <surface coeffs="{}" id="3" name="CR bank A top" type="z-plane" />
+  <surface coeffs="120.0" id="4" name="CR bank B bottom" type="z-plane" />
+  <surface coeffs="480.0" id="5" name="CR bank B top" type="z-plane" />
+</geometry>
+""".format(bank_bot, bank_top)
+
+COEFFS = re.compile(r'coeffs="([^"]*)"')
+
+
+def test_bank_bottom():
+    # All rods out reproduces the planes of the model for every bank
+    surfs = make_surfaces()
+    for b in banks:
+        assert bank_bottom(aro_step, b) == pytest.approx(
+            surfs['bank{} bot'.format(b)].z0)
+    assert bank_bottom(0) == pytest.approx(step0H)
+    assert bank_bottom(102) == pytest.approx(step102H)
+    with pytest.raises(ValueError):
+        bank_bottom(aro_step + 1)
+
+
+def test_patch_geometry(tmp_path):
+    path = tmp_path / 'geometry.xml'
+    path.write_text(GEOMETRY)
+    output = tmp_path / 'patched.xml'
+
+    # Withdrawing a bank that is already all rods out does not move it
+    heights = patch_geometry(path, {'A': aro_step}, output)
+    assert heights['A'] == pytest.approx((bank_bot, bank_top))
+
+    heights = patch_geometry(path, {'A': 10}, output)
+    assert heights['A'] == pytest.approx(
+        (bank_bottom(10), bank_bottom(10) + bank_top - bank_bot))
+
+    # Only the coefficients of the planes of bank A change
+    before = GEOMETRY.splitlines()
+    after = output.read_text().splitlines()
+    assert len(after) == len(before)
+    changed = [i for i, (a, b) in enumerate(zip(before, after)) if a != b]
+    assert changed == [5, 6]
+    for i, z0 in zip(changed, heights['A']):
+        assert COEFFS.search(after[i]).group(1) == str(z0)
+        assert COEFFS.sub('', after[i]) == COEFFS.sub('', before[i])
+    assert path.read_text() == GEOMETRY
+
+
+def test_patch_geometry_missing_bank(tmp_path):
+    path = tmp_path / 'geometry.xml'
+    path.write_text(GEOMETRY)
+    with pytest.raises(ValueError):
+        patch_geometry(path, {'C': 10})
+    with pytest.raises(ValueError):
+        patch_geometry(path, {'E': 10})
+    assert path.read_text() == GEOMETRY
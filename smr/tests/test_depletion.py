@@ -0,0 +1,157 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('scipy')
+
+import scipy.linalg
+
+from smr import depletion
+from smr.depletion import (Chain, cram, deplete, integrate, load_checkpoint,
+                           latest_checkpoint)
+
+
+DT = 5*24*60*60
+
+
+@pytest.fixture(scope='module')
+def chain():
+    return Chain.from_xml()
+
+
+def random_problem(chain, num_materials, seed=1):
+    """Return random compositions and reaction rates typical of a PWR."""
+    rng = np.random.RandomState(seed)
+    n0 = rng.uniform(0., 0.02, (num_materials, len(chain)))
+    rates = 10**rng.uniform(-11, -5, (num_materials, len(chain.reactions)))
+    return n0, rates
+
+
+def expm_solution(chain, n0, rates, dt):
+    return np.array([scipy.linalg.expm(chain.burnup_matrix(r).toarray()*dt)
+                     .dot(n) for n, r in zip(n0, rates)])
+
+
+def test_burnup_matrix():
+    lam_a = 1.e-5
+    lam_b = 2.e-6
+    chain = Chain(
+        ['A', 'B', 'C'],
+        [('A', lam_a, [('B', 1.)]),
+         ('B', lam_b, [('C', 0.5), ('X', 0.5)])],
+        [('A', '(n,gamma)', [('C', 1.)]),
+         ('B', 'fission', [('A', 0.1), ('C', 0.2), ('Y', 1.)])])
+    assert chain.reactions == [('A', '(n,gamma)'), ('B', 'fission')]
+
+    rates = np.array([3.e-9, 4.e-8])
+    expected = np.array([
+        [-lam_a - rates[0], 0.1*rates[1], 0.],
+        [lam_a, -lam_b - rates[1], 0.],
+        [rates[0], 0.5*lam_b + 0.2*rates[1], 0.]])
+    matrix = chain.burnup_matrix(rates).toarray()
+    assert matrix == pytest.approx(expected, rel=1e-14, abs=0.)
+
+
+@pytest.mark.parametrize('limit', [depletion.dense_limit, 0],
+                         ids=['dense', 'sparse'])
+def test_cram(chain, monkeypatch, limit):
+    monkeypatch.setattr(depletion, 'dense_limit', limit)
+    n0, rates = random_problem(chain, 5)
+    n1 = cram(chain, chain.burnup_data(rates), n0, DT)
+    expected = expm_solution(chain, n0, rates, DT)
+    for actual, exact in zip(n1, expected):
+        assert np.abs(actual - exact).max() < 1e-10*exact.max()
+
+
+def test_deplete_jobs(chain):
+    n0, rates = random_problem(chain, 7)
+    serial = deplete(chain, n0, rates, DT, batch_size=2)
+    parallel = deplete(chain, n0, rates, DT, jobs=2, batch_size=2)
+    np.testing.assert_array_equal(parallel, serial)
+    assert np.abs(serial - expm_solution(chain, n0, rates, DT)).max() < \
+        1e-10*n0.max()
+
+
+def test_deplete_in_place(chain):
+    n0, rates = random_problem(chain, 7)
+    expected = deplete(chain, n0, rates, DT, batch_size=3)
+    n = n0.copy()
+    result = deplete(chain, n, rates, DT, batch_size=3, out=n)
+    assert result is n
+    np.testing.assert_array_equal(n, expected)
+
+
+class FakeTransport:
+    """Return reaction rates that depend on the compositions, and count calls.
+
+    If `fail_after` is given, an error is raised instead of making that many
+    more solves, as if the run had been interrupted.
+
+    """
+    def __init__(self, chain, fail_after=None):
+        _, self.rates = random_problem(chain, 4)
+        self.calls = []
+        self.fail_after = fail_after
+
+    def __call__(self, n):
+        if self.fail_after is not None and len(self.calls) == self.fail_after:
+            raise KeyboardInterrupt
+        self.calls.append(np.array(n))
+        scale = n.sum(axis=1, keepdims=True)/0.16
+        return 1. + 0.01*len(self.calls), self.rates*scale
+
+
+def test_integrate_restart(chain, tmp_path):
+    n0, _ = random_problem(chain, 4, seed=2)
+    timesteps = [DT, 2*DT, DT]
+
+    reference = FakeTransport(chain)
+    steps = []
+    expected = integrate(reference, chain, n0, timesteps, tmp_path / 'ref',
+                         callback=lambda i, t, k: steps.append((i, t, k)))
+    assert len(reference.calls) == 2*len(timesteps) + 1
+    assert [i for i, _, _ in steps] == [0, 1, 2, 3]
+    assert [t for _, t, _ in steps] == [0., DT, 3*DT, 4*DT]
+
+    # Interrupt the run during the first transport solve of step 2, once the
+    # checkpoint of step 1 has been written
+    directory = tmp_path / 'run'
+    interrupted = FakeTransport(chain, fail_after=4)
+    with pytest.raises(KeyboardInterrupt):
+        integrate(interrupted, chain, n0, timesteps, directory)
+    assert latest_checkpoint(directory).name == 'step0001'
+
+    # Restarting skips the transport solves of steps 0 and 1
+    restarted = FakeTransport(chain)
+    steps = []
+    result = integrate(restarted, chain, n0, timesteps, directory,
+                       callback=lambda i, t, k: steps.append((i, t, k)))
+    assert len(restarted.calls) == len(reference.calls) - 4
+    for actual, expected_n in zip(restarted.calls, reference.calls[4:]):
+        np.testing.assert_array_equal(actual, expected_n)
+    np.testing.assert_array_equal(result, expected)
+    assert [i for i, _, _ in steps] == [1, 2, 3]
+
+    # Without restarting, the checkpoints are removed and every step is run
+    again = FakeTransport(chain)
+    result = integrate(again, chain, n0, timesteps, directory, restart=False)
+    assert len(again.calls) == len(reference.calls)
+    np.testing.assert_array_equal(result, expected)
+
+
+def test_integrate_mismatch(chain, tmp_path):
+    n0, _ = random_problem(chain, 4, seed=2)
+    integrate(FakeTransport(chain), chain, n0, [DT], tmp_path)
+    checkpoint = latest_checkpoint(tmp_path)
+
+    # Checkpoints from a run with other time steps or compositions
+    with pytest.raises(ValueError):
+        integrate(FakeTransport(chain), chain, n0, [2*DT], tmp_path)
+    with pytest.raises(ValueError):
+        integrate(FakeTransport(chain), chain, 2*n0, [DT], tmp_path)
+
+    # Checkpoints written with another depletion chain
+    other = Chain(['A', 'B'], [('A', 1.e-5, [('B', 1.)])], [])
+    with pytest.raises(ValueError):
+        load_checkpoint(checkpoint, other)
+    state = load_checkpoint(checkpoint, chain)
+    assert state['step'] == 1
@@ -0,0 +1,167 @@
+import copy
+import xml.etree.ElementTree as ET
+
+import pytest
+
+openmc = pytest.importorskip('openmc')
+
+from smr.export import (distribmat_ids, export_geometry, export_materials,
+                        patch_materials)
+from smr.instances import count_instances
+from smr.traversal import invalidate, traverse
+
+
+MATERIALS = """<?xml version='1.0' encoding='utf-8'?>
+<materials>
+  <material depletable="true" id="1" name="fuel" volume="0.5">
+    <density units="g/cc" value="10.3" />
+    <nuclide ao="1.0" name="U235" />
+  </material>
+  <material id="7" name="water">
+    <density units="g/cc" value="0.74" />
+    <nuclide ao="2.0" name="H1" />
+    <nuclide ao="1.0" name="O16" />
+  </material>
+  <material id="8" name="water" volume="12.5">
+    <density units="g/cc" value="0.74" />
+    <nuclide ao="2.0" name="H1" />
+    <nuclide ao="1.0" name="O16" />
+  </material>
+  <material id="9" name="steel">
+    <density units="g/cc" value="8.0" />
+    <nuclide ao="1.0" name="Fe56" />
+  </material>
+</materials>
+"""
+
+
+def toy_model():
+    """Return a geometry with a fuel pin in a lattice, and its fuel."""
+    openmc.reset_auto_ids()
+    fuel = openmc.Material(name='fuel')
+    fuel.set_density('g/cm3', 10.3)
+    fuel.add_nuclide('U235', 1.0)
+    water = openmc.Material(name='water')
+    water.set_density('g/cm3', 0.74)
+    water.add_nuclide('H1', 2.0)
+    water.add_nuclide('O16', 1.0)
+
+    fuel_or = openmc.ZCylinder(r=0.4)
+    pin = openmc.Universe(cells=[
+        openmc.Cell(fill=fuel, region=-fuel_or),
+        openmc.Cell(fill=water, region=+fuel_or)
+    ])
+    moderator = openmc.Universe(cells=[openmc.Cell(fill=water)])
+
+    lattice = openmc.RectLattice()
+    lattice.lower_left = (-1., -1.)
+    lattice.pitch = (1., 1.)
+    lattice.universes = [[pin, moderator],
+                         [pin, pin]]
+    root = openmc.Universe(cells=[openmc.Cell(fill=lattice)])
+    return openmc.Geometry(root), fuel
+
+
+def read_materials(path):
+    """Return the ID, name, volume and composition of each material."""
+    materials = {}
+    for element in ET.parse(str(path)).getroot():
+        volume = element.get('volume')
+        materials[int(element.get('id'))] = (
+            element.get('name'),
+            None if volume is None else float(volume),
+            [(n.get('name'), float(n.get('ao')))
+             for n in element.iter('nuclide')]
+        )
+    return materials
+
+
+def read_cell_materials(path):
+    """Return the list of material IDs of each cell filled with materials."""
+    return {int(element.get('id')): element.get('material').split()
+            for element in ET.parse(str(path)).getroot().iter('cell')
+            if element.get('material') is not None}
+
+
+def test_export_distribmats(tmp_path):
+    geometry, fuel = toy_model()
+    count_instances(geometry)
+    fuel_cell, = [c for c in traverse(geometry).get_all_cells().values()
+                  if c.fill is fuel]
+    volume = 0.5
+
+    # Stream the differentiated materials without creating them
+    distribmats = distribmat_ids(geometry, [fuel])
+    all_materials = traverse(geometry).get_all_materials()
+    export_materials(tmp_path / 'materials.xml', all_materials.values(),
+                     distribmats, {fuel_cell: volume})
+    export_geometry(geometry, tmp_path / 'geometry.xml', distribmats)
+    assert not list(tmp_path.glob('*.tmp'))
+
+    # Differentiate the geometry by cloning the fuel for each instance
+    fuel.volume = volume
+    clones = []
+    for i in range(fuel_cell.num_instances):
+        mat = copy.copy(fuel)
+        mat.id = None
+        clones.append(mat)
+    fuel_cell.fill = clones
+    invalidate(geometry)
+    reference = tmp_path / 'reference'
+    reference.mkdir()
+    all_materials = traverse(geometry).get_all_materials()
+    openmc.Materials(all_materials.values()).export_to_xml(
+        str(reference / 'materials.xml'))
+    geometry.export_to_xml(str(reference / 'geometry.xml'))
+
+    materials = read_materials(tmp_path / 'materials.xml')
+    assert materials == read_materials(reference / 'materials.xml')
+    assert fuel.id not in materials
+    assert len(materials) == 1 + fuel_cell.num_instances
+
+    cells = read_cell_materials(tmp_path / 'geometry.xml')
+    assert cells == read_cell_materials(reference / 'geometry.xml')
+    assert cells[fuel_cell.id] == [str(mat.id) for mat in clones]
+
+
+def borated_water():
+    water = openmc.Material(name='water')
+    water.set_density('g/cm3', 0.7)
+    water.add_nuclide('H1', 2.0)
+    water.add_nuclide('O16', 1.0)
+    water.add_nuclide('B10', 1e-4)
+    return water
+
+
+def test_patch_materials(tmp_path):
+    path = tmp_path / 'materials.xml'
+    path.write_text(MATERIALS)
+    output = tmp_path / 'patched.xml'
+    assert patch_materials(path, [borated_water()], output) == 2
+
+    before = ET.fromstring(MATERIALS.split('\n', 1)[1])
+    after = ET.parse(str(output)).getroot()
+    assert len(after) == len(before)
+    for old, new in zip(before, after):
+        # IDs, names and volumes are kept
+        for attribute in ('id', 'name', 'volume'):
+            assert new.get(attribute) == old.get(attribute)
+        nuclides = [n.get('name') for n in new.iter('nuclide')]
+        if old.get('name') == 'water':
+            assert 'B10' in nuclides
+        else:
+            assert ET.tostring(new) == ET.tostring(old)
+
+    # Lines of materials that are not replaced are copied unchanged
+    text = output.read_text()
+    for line in MATERIALS.splitlines()[2:6] + MATERIALS.splitlines()[16:]:
+        assert line in text
+    assert path.read_text() == MATERIALS
+
+
+def test_patch_materials_missing(tmp_path):
+    path = tmp_path / 'materials.xml'
+    path.write_text(MATERIALS.replace('name="water"', 'name="coolant"'))
+    with pytest.raises(ValueError):
+        patch_materials(path, [borated_water()])
+    assert not (tmp_path / 'materials.xml.tmp').exists()
@@ -0,0 +1,69 @@
+import pytest
+
+openmc = pytest.importorskip('openmc')
+
+from smr.instances import count_instances
+from smr.pins import pin_universes
+
+
+def toy_geometry():
+    """Return a geometry with a pin used in a lattice and on its own."""
+    fuel = openmc.Material(name='fuel')
+    water = openmc.Material(name='water')
+
+    fuel_or = openmc.ZCylinder(r=0.4)
+    pin = openmc.Universe(cells=[
+        openmc.Cell(fill=fuel, region=-fuel_or),
+        openmc.Cell(fill=water, region=+fuel_or)
+    ])
+    moderator = openmc.Universe(cells=[openmc.Cell(fill=water)])
+
+    lattice = openmc.RectLattice()
+    lattice.lower_left = (-1.5, -1.5)
+    lattice.pitch = (1., 1.)
+    lattice.universes = [[pin, moderator, pin],
+                         [pin, pin, pin],
+                         [moderator, pin, pin]]
+    assembly = openmc.Universe(cells=[openmc.Cell(fill=lattice)])
+
+    left = openmc.XPlane(x0=-1.5)
+    right = openmc.XPlane(x0=1.5)
+    root = openmc.Universe(cells=[
+        openmc.Cell(fill=assembly, region=-left),
+        openmc.Cell(fill=pin, region=+left & -right),
+        openmc.Cell(fill=assembly, region=+right)
+    ])
+    return openmc.Geometry(root)
+
+
+def test_count_instances():
+    geometry = toy_geometry()
+    cells = geometry.get_all_cells().values()
+    materials = geometry.get_all_materials().values()
+
+    geometry.determine_paths(instances_only=True)
+    expected = [c.num_instances for c in cells]
+    expected_materials = [m.num_instances for m in materials]
+
+    count_instances(geometry)
+    assert [c.num_instances for c in cells] == expected
+    assert [m.num_instances for m in materials] == expected_materials
+    assert sorted(expected) == [1, 1, 1, 2, 4, 15, 15]
+
+
+def test_count_instances_axial_lattice():
+    univs = pin_universes(num_rings=3, num_axial=4, axial_lattice=True)
+    root = openmc.Universe(cells=[
+        openmc.Cell(fill=univs['Fuel (1.6%) stack'])])
+    geometry = openmc.Geometry(root)
+    lattice, = geometry.get_all_lattices().values()
+    assert lattice.outer is None
+
+    cells = geometry.get_all_cells().values()
+    geometry.determine_paths(instances_only=True)
+    expected = [c.num_instances for c in cells]
+
+    count_instances(geometry)
+    assert [c.num_instances for c in cells] == expected
+    for cell in lattice.universes[0, 0, 0].cells.values():
+        assert cell.num_instances == 4
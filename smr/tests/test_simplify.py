@@ -0,0 +1,98 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+openmc = pytest.importorskip('openmc')
+
+from smr.simplify import deduplicate, merge_surfaces, simplify_regions
+
+
+def pin_universe(fuel, water, fuel_radius=0.4):
+    """Return a pin whose regions include two half-spaces that are implied
+    by the lattice element and the axial extent it is used in."""
+    fuel_or = openmc.ZCylinder(r=fuel_radius)
+    bottom = openmc.ZPlane(z0=-5.)
+    outer = openmc.ZCylinder(r=1.)
+    return openmc.Universe(cells=[
+        openmc.Cell(fill=fuel, region=-fuel_or & +bottom),
+        openmc.Cell(fill=water, region=+fuel_or & -outer)
+    ])
+
+
+def toy_geometry(fuel_radii=(0.4, 0.4, 0.4, 0.4)):
+    """Return a 2x2 lattice of pins that are each built separately."""
+    fuel = openmc.Material(name='fuel')
+    water = openmc.Material(name='water')
+    pins = [pin_universe(fuel, water, r) for r in fuel_radii]
+
+    lattice = openmc.RectLattice()
+    lattice.lower_left = (-1., -1.)
+    lattice.pitch = (1., 1.)
+    lattice.universes = [pins[:2], pins[2:]]
+
+    region = (+openmc.XPlane(x0=-1.) & -openmc.XPlane(x0=1.) &
+              +openmc.YPlane(y0=-1.) & -openmc.YPlane(y0=1.) &
+              +openmc.ZPlane(z0=0.) & -openmc.ZPlane(z0=10.))
+    root = openmc.Universe(cells=[openmc.Cell(fill=lattice, region=region)])
+    return openmc.Geometry(root)
+
+
+@pytest.fixture(scope='module')
+def points():
+    rng = np.random.RandomState(1)
+    return rng.uniform((-1., -1., 0.), (1., 1., 10.), (500, 3))
+
+
+def find_cells(geometry, points):
+    return [geometry.find(tuple(p))[-1] for p in points]
+
+
+def test_deduplicate(points):
+    geometry = toy_geometry()
+    materials = [c.fill for c in find_cells(geometry, points)]
+
+    removed = deduplicate(geometry)
+    assert removed['universes'] == 3
+    assert removed['cells'] == 6
+    assert [c.fill for c in find_cells(geometry, points)] == materials
+
+    # Each position of the lattice is now filled with the same pin
+    lattice, = (c.fill for c in geometry.root_universe.cells.values())
+    assert len({id(u) for u in np.ravel(lattice.universes)}) == 1
+
+
+def test_merge_surfaces(points):
+    geometry = toy_geometry((0.4, 0.4 + 1e-12, 0.4, 0.41))
+    cells = find_cells(geometry, points)
+
+    # The three fuel cylinders within the tolerance of one another, the four
+    # bottom planes and the four outer cylinders are each merged
+    assert merge_surfaces(geometry, tolerance=1e-10) == 8
+    assert all(a is b for a, b in zip(find_cells(geometry, points), cells))
+
+    fuel_cells = [c for c in geometry.get_all_cells().values()
+                  if isinstance(c.fill, openmc.Material) and
+                  c.fill.name == 'fuel']
+    cylinders = {id(s): s for c in fuel_cells
+                 for s in c.region.get_surfaces().values()
+                 if s.type == 'z-cylinder'}
+    assert sorted(s.coefficients['r'] for s in cylinders.values()) == \
+        [0.4, 0.41]
+
+
+def test_simplify_regions(points):
+    geometry = toy_geometry()
+    cells = find_cells(geometry, points)
+
+    # The bottom plane and outer cylinder of each pin are implied by the
+    # lattice element and the axial extent of the lattice
+    assert simplify_regions(geometry) == 8
+    assert all(a is b for a, b in zip(find_cells(geometry, points), cells))
+
+
+def test_simplify_regions_exclude():
+    geometry = toy_geometry()
+    planes = {id(s): s for c in geometry.get_all_cells().values()
+              if c.region is not None
+              for s in c.region.get_surfaces().values()
+              if s.type == 'z-plane'}
+    assert simplify_regions(geometry, exclude=planes.values()) == 4
@@ -0,0 +1,89 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('openmc')
+
+from smr.model import SMRModel
+from smr.pins import pin_pitch
+from smr.traversal import traverse
+from smr.zones import FuelInstances, _instance_origins
+
+
+NUM_RINGS = 2
+NUM_AXIAL = 3
+
+
+def fuel_instances():
+    model = SMRModel(NUM_RINGS, NUM_AXIAL)
+    return FuelInstances(model.assembly_geometry(), NUM_RINGS, NUM_AXIAL)
+
+
+@pytest.fixture(scope='module')
+def instances():
+    return fuel_instances()
+
+
+def test_instances(instances):
+    # Each ring and axial segment of each of the 264 fuel pins
+    assert len(instances) == 264*NUM_RINGS*NUM_AXIAL
+    keys = set(zip(instances.assembly, instances.ring, instances.axial))
+    assert len(keys) == len(instances)
+
+    # Pins are centered in the elements of a lattice centered on the origin
+    xy = instances.position[:, :2]/pin_pitch
+    assert np.abs(xy - np.round(xy)).max() < 1e-9
+
+
+def test_zones(instances):
+    np.testing.assert_array_equal(
+        instances.zones('ring', NUM_RINGS), instances.ring)
+    np.testing.assert_array_equal(
+        instances.zones('axial', 2), instances.axial*2//NUM_AXIAL)
+    assert instances.zones('ring', 1).max() == 0
+
+    zones = instances.zones('kmeans', 4, seed=1)
+    assert set(zones.tolist()) == {0, 1, 2, 3}
+    np.testing.assert_array_equal(instances.zones('kmeans', 4, seed=1), zones)
+    # Instances of the same pin at the same height are in the same zone
+    for key in set(zip(instances.assembly, instances.axial)):
+        same = (instances.assembly == key[0]) & (instances.axial == key[1])
+        assert len(set(zones[same].tolist())) == 1
+
+    with pytest.raises(ValueError):
+        instances.zones('ring')
+
+
+def test_differentiate():
+    instances = fuel_instances()
+    zones = instances.zones('axial', 2)
+    num_materials = instances.num_materials(zones)
+    materials = instances.differentiate(zones)
+    assert len(materials) == num_materials
+    assert sum(m.volume for m in materials) == pytest.approx(
+        instances.volume.sum())
+
+    # The instances filled with each material are all in one zone and
+    # together have the volume of the material
+    fills = [mat for cell in instances.cells for mat in cell.fill]
+    assert len(fills) == len(instances)
+    for mat in materials:
+        members = np.array([f is mat for f in fills])
+        assert len(set(zones[members].tolist())) == 1
+        assert instances.volume[members].sum() == pytest.approx(mat.volume)
+
+
+def test_origins_after_differentiate():
+    geometry = SMRModel(NUM_RINGS, NUM_AXIAL).assembly_geometry()
+    instances = FuelInstances(geometry, NUM_RINGS, NUM_AXIAL)
+    graph = traverse(geometry).graph
+    targets = {graph.owner[c] for c in instances.cells}
+    before = _instance_origins(geometry, targets)
+
+    # Cells filled with lists of materials are skipped rather than hashed
+    instances.differentiate(instances.zones('axial', 2))
+    after = _instance_origins(geometry, targets)
+    for univ in targets:
+        assert len(after[univ]) == len(before[univ])
+        for (o1, f1, i1), (o2, f2, i2) in zip(before[univ], after[univ]):
+            np.testing.assert_array_equal(o1, o2)
+            assert (f1, i1) == (f2, i2)